@@ -25,6 +25,21 @@ class Settings(BaseSettings):
     FPL_REQUEST_TIMEOUT: float = 30.0  # 30 seconds for FPL API calls
     FPL_MAX_RETRIES: int = 3
     FPL_RETRY_DELAY: float = 1.0  # Initial delay between retries
+    FPL_HTTP_MAX_CONNECTIONS: int = 20  # Pooled connections to the FPL API
+    FPL_HTTP_MAX_KEEPALIVE: int = 10  # Idle connections kept open for reuse
+    FPL_HTTP_KEEPALIVE_EXPIRY: float = 30.0  # Seconds an idle connection is kept
+    FPL_HTTP2: bool = False  # Use HTTP/2 (requires the optional 'h2' package)
+    FPL_RATE_LIMIT: float = 10.0  # Max outbound FPL API requests/second (per process)
+    FPL_RATE_BURST: int = 10  # Requests allowed back-to-back before the rate applies
+    FPL_RATE_MIN: float = 0.5  # Floor the rate backs off to on 429/5xx
+    FPL_MAX_CONCURRENCY: int = 10  # Max FPL API requests in flight (per process)
+    # Share of the limit above the bulk player-history fetch may use, so other
+    # callers keep some headroom while it runs (values above it have no effect)
+    FPL_HISTORY_RATE_LIMIT: float = 8.0
+    FPL_HISTORY_RATE_BURST: int = 8
+    FPL_HISTORY_MAX_CONCURRENCY: int = 8
+    FPL_SNAPSHOT_PATH: str = "./fpl_snapshot.bin"  # Warm-start snapshot ("" disables)
+    FPL_SNAPSHOT_MAX_AGE: int = 604800  # Ignore snapshots older than 7 days
 
     # ==========================================================================
     # Server Settings
@@ -63,6 +78,13 @@ class Settings(BaseSettings):
     DB_POOL_RECYCLE: int = 1800  # 30 minutes
     DB_ECHO: bool = False  # SQL query logging
 
+    # ==========================================================================
+    # Shared Cache Backend (lets multiple workers share FPL / Claude data)
+    # ==========================================================================
+    CACHE_BACKEND: str = "memory"  # "memory" (per-process), "sqlite" or "redis"
+    CACHE_SQLITE_PATH: str = "./smartplayfpl_cache.db"
+    CACHE_REDIS_URL: str = "redis://localhost:6379/0"
+
     # ==========================================================================
     # Circuit Breaker Settings
     # ==========================================================================
@@ -76,13 +98,20 @@ class Settings(BaseSettings):
     RATE_LIMIT_DEFAULT: str = "100/minute"
     RATE_LIMIT_AI: str = "20/minute"  # More strict for AI endpoints
 
+    # ==========================================================================
+    # Stage 2 Points Models
+    # ==========================================================================
+    POINTS_MODEL_SET: str = "v2"  # ml/models feature set (model_config_<set>.json)
+    POINTS_MODELS: str = "Ridge,RandomForest,XGBoost,LightGBM"  # Comma-separated ensemble members
+    POINTS_LATENCY_BUDGET_MS: float = 250.0  # Slower models are dropped from the ensemble
+
     # ==========================================================================
     # Feature Flags
     # ==========================================================================
     SKIP_KG: bool = False  # Skip Knowledge Graph initialization
     SKIP_SCHEDULER: bool = False  # Skip ML scheduler
 
-    @field_validator("DEBUG", "DB_ECHO", "SKIP_KG", "SKIP_SCHEDULER", mode="before")
+    @field_validator("DEBUG", "DB_ECHO", "SKIP_KG", "SKIP_SCHEDULER", "FPL_HTTP2", mode="before")
     @classmethod
     def parse_bool(cls, v):
         if isinstance(v, bool):
@@ -93,7 +122,10 @@ class Settings(BaseSettings):
 
     @field_validator("PORT", "DB_POOL_SIZE", "DB_MAX_OVERFLOW", "DB_POOL_TIMEOUT",
                      "DB_POOL_RECYCLE", "CB_FAILURE_THRESHOLD", "CB_RECOVERY_TIMEOUT",
-                     "CB_HALF_OPEN_REQUESTS", mode="before")
+                     "CB_HALF_OPEN_REQUESTS", "FPL_HTTP_MAX_CONNECTIONS",
+                     "FPL_HTTP_MAX_KEEPALIVE", "FPL_SNAPSHOT_MAX_AGE", "FPL_RATE_BURST",
+                     "FPL_MAX_CONCURRENCY", "FPL_HISTORY_RATE_BURST",
+                     "FPL_HISTORY_MAX_CONCURRENCY", mode="before")
     @classmethod
     def parse_int(cls, v):
         if isinstance(v, int):
@@ -101,7 +133,9 @@ class Settings(BaseSettings):
         return int(v)
 
     @field_validator("FPL_REQUEST_TIMEOUT", "CLAUDE_REQUEST_TIMEOUT",
-                     "FPL_RETRY_DELAY", mode="before")
+                     "FPL_RETRY_DELAY", "FPL_HTTP_KEEPALIVE_EXPIRY", "FPL_RATE_LIMIT",
+                     "FPL_RATE_MIN", "FPL_HISTORY_RATE_LIMIT", "POINTS_LATENCY_BUDGET_MS",
+                     mode="before")
     @classmethod
     def parse_float(cls, v):
         if isinstance(v, float):
@@ -502,6 +502,43 @@ class DataLineage(Base):
     last_changed_at = Column(DateTime, nullable=True)  # When data actually changed
 
 
+class PlayerGameweekHistory(Base):
+    """
+    Persistent copy of each player's element-summary history.
+
+    One row per player per fixture (a double gameweek has two rows with the
+    same round). Finished gameweeks never change, so score calculation and
+    training only re-fetch players whose history moved since the last sync.
+    """
+    __tablename__ = "player_gameweek_history"
+    __table_args__ = (
+        Index('ix_history_player_round', 'player_id', 'round'),
+    )
+
+    player_id = Column(Integer, primary_key=True)
+    fixture_id = Column(Integer, primary_key=True)
+    round = Column(Integer, nullable=False, index=True)
+    kickoff_time = Column(String(32), nullable=True)
+    minutes = Column(Integer, nullable=False, default=0)
+    total_points = Column(Integer, nullable=False, default=0)
+
+    # True for zero-minute rows inferred from unchanged season totals (no fetch);
+    # replaced by the real row the next time the player is fetched
+    synthetic = Column(Boolean, nullable=False, default=False)
+
+    data = Column(String, nullable=False)  # JSON: the raw element-summary history entry
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class PlayerHistorySync(Base):
+    """Per-player sync state for PlayerGameweekHistory."""
+    __tablename__ = "player_history_sync"
+
+    player_id = Column(Integer, primary_key=True)
+    team_id = Column(Integer, nullable=False)  # a club change forces a re-fetch
+    synced_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+
 # =========================================================================
 # Database initialization
 # =========================================================================
@@ -537,3 +574,84 @@ def clear_old_scores(db, gameweek: int):
     """Clear scores from a specific gameweek (for recalculation)."""
     db.query(MLPlayerScore).filter(MLPlayerScore.gameweek == gameweek).delete()
     db.commit()
+
+
+# Rows per INSERT batch (keeps SQLite under its bound-parameter limit)
+BULK_BATCH_SIZE = int(os.getenv("DB_BULK_BATCH_SIZE", "500"))
+
+
+def bulk_upsert(
+    db,
+    model,
+    rows: list[dict],
+    conflict_columns: list[str],
+    update_where=None,
+    batch_size: int = BULK_BATCH_SIZE,
+) -> dict:
+    """
+    Insert-or-update many rows with Core statements, in batches.
+
+    Uses INSERT ... ON CONFLICT DO UPDATE on SQLite and PostgreSQL (one
+    executemany per batch); other databases delete the conflicting keys and
+    insert. Does not commit, so callers can combine it with other writes in
+    one transaction. Blocking - call via asyncio.to_thread from async code.
+
+    Args:
+        db: Session
+        model: Mapped class to write
+        rows: Column dicts, all with the same keys
+        conflict_columns: Primary key or unique constraint columns
+        update_where: Optional callable(table, excluded) returning a condition
+            an existing row must meet to be updated (otherwise it is kept)
+        batch_size: Rows per statement
+
+    Returns:
+        Write stats: rows, batches, elapsed_seconds, rows_per_second
+    """
+    import time
+
+    start = time.perf_counter()
+    table = model.__table__
+    dialect = db.get_bind().dialect.name
+    batches = 0
+
+    if rows:
+        update_columns = [c for c in rows[0] if c not in conflict_columns]
+        if dialect in ("sqlite", "postgresql"):
+            if dialect == "sqlite":
+                from sqlalchemy.dialects.sqlite import insert
+            else:
+                from sqlalchemy.dialects.postgresql import insert
+            stmt = insert(table)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[table.c[c] for c in conflict_columns],
+                set_={c: stmt.excluded[c] for c in update_columns},
+                where=update_where(table, stmt.excluded) if update_where is not None else None,
+            )
+        else:
+            stmt = table.insert()
+
+        for i in range(0, len(rows), batch_size):
+            batch = rows[i:i + batch_size]
+            if dialect not in ("sqlite", "postgresql"):
+                # Portable fallback: replace the conflicting rows (update_where not applied)
+                from sqlalchemy import tuple_
+                keys = [tuple(row[c] for c in conflict_columns) for row in batch]
+                db.execute(table.delete().where(
+                    tuple_(*(table.c[c] for c in conflict_columns)).in_(keys)
+                ))
+            db.execute(stmt, batch)
+            batches += 1
+
+    elapsed = time.perf_counter() - start
+    stats = {
+        "rows": len(rows),
+        "batches": batches,
+        "elapsed_seconds": round(elapsed, 3),
+        "rows_per_second": round(len(rows) / elapsed) if elapsed > 0 else None,
+    }
+    logger.info(
+        f"Bulk upsert {table.name}: {stats['rows']} rows in {stats['batches']} batches, "
+        f"{stats['elapsed_seconds']}s ({stats['rows_per_second']} rows/s)"
+    )
+    return stats
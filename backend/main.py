@@ -136,8 +136,11 @@ async def lifespan(app: FastAPI):
     # Step 3: Start ML auto-improvement scheduler
     if _init_state["fpl_initialized"] and not os.getenv("SKIP_SCHEDULER"):
         try:
-            async def scheduled_ml_improvement():
-                """Scheduled task for ML model improvement after each gameweek."""
+            from services.job_runner import get_job_runner
+
+            async def run_ml_improvement(job):
+                """ML model improvement cycle (runs on the background job runner)."""
+                result = {}
                 try:
                     from services.fpl_service import fpl_service
                     from services.ml_predictor_service import get_ml_predictor_service
@@ -155,23 +158,30 @@ async def lifespan(app: FastAPI):
                     gw_obj = fpl_service.get_current_gameweek()
                     current_gw = gw_obj.id if hasattr(gw_obj, 'id') else gw_obj
 
+                    result["gameweek"] = current_gw
+
                     # Validate previous GW predictions
                     if current_gw > 1:
                         try:
+                            job.set_stage("validate")
                             validation = await retraining_service.validate_predictions(current_gw - 1)
+                            result["validation_mae"] = validation.get('overall_mae')
                             logger.info(f"GW{current_gw-1} validation: MAE={validation.get('overall_mae', 'N/A')}")
 
                             # Retrain if accuracy dropped
                             if validation.get("needs_retraining"):
+                                job.set_stage("retrain")
                                 retrain_result = await retraining_service.retrain_model(
                                     trigger_type="scheduled"
                                 )
+                                result["retrained_deployed"] = retrain_result.get('deployed')
                                 logger.info(f"Retraining result: deployed={retrain_result.get('deployed')}")
                         except Exception as e:
                             logger.warning(f"Validation failed: {e}")
 
                     # Log predictions for current GW
                     try:
+                        job.set_stage("log_predictions")
                         await retraining_service.log_predictions(current_gw)
                         logger.info(f"Logged predictions for GW{current_gw}")
                     except Exception as e:
@@ -179,6 +189,12 @@ async def lifespan(app: FastAPI):
 
                 except Exception as e:
                     logger.error(f"Scheduled ML improvement failed: {e}")
+                    raise
+                return result
+
+            async def scheduled_ml_improvement():
+                """Scheduled task for ML model improvement after each gameweek."""
+                get_job_runner().submit("ml_improvement", run_ml_improvement, trigger="scheduled")
 
             # Schedule ML improvement:
             # - Every Wednesday at 18:00 UTC (after most GWs finish)
@@ -252,6 +268,20 @@ async def lifespan(app: FastAPI):
         except Exception as e:
             logger.warning(f"Scheduler shutdown error: {e}")
 
+    # Cancel background jobs still queued or running
+    try:
+        from services.job_runner import get_job_runner
+        await get_job_runner().shutdown()
+    except Exception as e:
+        logger.warning(f"Job runner shutdown error: {e}")
+
+    # Close the shared FPL HTTP client (releases pooled keep-alive connections)
+    try:
+        from services.fpl_service import fpl_service
+        await fpl_service.close()
+    except Exception as e:
+        logger.warning(f"FPL client shutdown error: {e}")
+
     logger.info("Shutting down SmartPlayFPL backend...")
 
 # Create FastAPI app
@@ -373,6 +403,13 @@ async def health():
     except ImportError:
         checks["circuit_breakers"] = {"ok": True, "breakers": {}}
 
+    # Outbound FPL API rate limiter (informational - backing off is expected behaviour)
+    try:
+        from middleware.resilience import fpl_rate_limiter
+        checks["fpl_rate_limiter"] = {"ok": True, **fpl_rate_limiter.get_stats()}
+    except ImportError:
+        checks["fpl_rate_limiter"] = {"ok": True}
+
     # Check Scheduler
     scheduler_ok = _init_state.get("scheduler_running", False)
     checks["scheduler"] = {
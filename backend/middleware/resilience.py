@@ -5,17 +5,21 @@ Implements:
 - Circuit Breaker: Prevents cascading failures when external services are down
 - Retry with exponential backoff: Automatic retries for transient failures
 - Request timeout wrapper: Ensures operations don't hang indefinitely
+- Adaptive rate limiter: Keeps outbound traffic to an external API under its limits
 """
 
 import asyncio
 import functools
 import logging
 import time
-from datetime import datetime
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 from enum import Enum
 from typing import Callable, Optional, TypeVar, Any
 from dataclasses import dataclass, field
 
+from config import settings
+
 logger = logging.getLogger("smartplayfpl.resilience")
 
 T = TypeVar("T")
@@ -328,6 +332,217 @@ def timeout_decorator(seconds: float) -> Callable:
     return decorator
 
 
+# =============================================================================
+# ADAPTIVE RATE LIMITER
+# =============================================================================
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header (delta-seconds or HTTP date) into seconds."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class AdaptiveRateLimiter:
+    """
+    Process-wide token bucket plus concurrency cap for one external API.
+
+    Every request acquires a concurrency slot and a token before it is sent.
+    Throttling responses (429 / 5xx) halve the rate (down to ``min_rate``) and
+    a Retry-After header pauses all requests until it expires. While
+    responses are healthy the rate climbs back by ``recovery_step`` per
+    ``recovery_interval`` seconds, up to ``max_rate``.
+
+    Usage:
+        limiter = AdaptiveRateLimiter(name="fpl_api", max_rate=10.0)
+
+        async with limiter.slot() as slot:
+            response = await send(request)
+            slot.record(response.status_code, response.headers.get("Retry-After"))
+    """
+
+    THROTTLE_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+    def __init__(
+        self,
+        name: str,
+        max_rate: float = 10.0,
+        burst: int = 10,
+        max_concurrency: int = 10,
+        min_rate: float = 0.5,
+        backoff_factor: float = 0.5,
+        recovery_step: Optional[float] = None,
+        recovery_interval: float = 1.0,
+        max_retry_after: float = 300.0,
+    ):
+        self.name = name
+        self.max_rate = max_rate
+        self.min_rate = min(min_rate, max_rate)
+        self.burst = max(1, burst)
+        self.max_concurrency = max(1, max_concurrency)
+        self.backoff_factor = backoff_factor
+        self.recovery_step = recovery_step if recovery_step is not None else max_rate / 10
+        self.recovery_interval = recovery_interval
+        self.max_retry_after = max_retry_after
+
+        self._rate = max_rate
+        self._tokens = float(self.burst)
+        self._last_refill = time.monotonic()
+        self._last_adjustment = self._last_refill
+        self._last_backoff = float("-inf")
+        self._blocked_until = 0.0
+        self._in_flight = 0
+        self._waiting = 0
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._token_lock: Optional[asyncio.Lock] = None
+
+        self._stats = {
+            "requests": 0,
+            "throttle_events": 0,
+            "retry_after_pauses": 0,
+            "rate_decreases": 0,
+            "rate_increases": 0,
+            "total_wait_seconds": 0.0,
+            "max_wait_seconds": 0.0,
+            "last_throttle_status": None,
+            "last_throttle_at": None,
+        }
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.burst, self._tokens + (now - self._last_refill) * self._rate)
+        self._last_refill = now
+
+    async def acquire(self) -> None:
+        """Wait for a concurrency slot and a token (and any Retry-After pause)."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._token_lock = asyncio.Lock()
+
+        start = time.monotonic()
+        self._waiting += 1
+        try:
+            await self._semaphore.acquire()
+            try:
+                # One waiter at a time takes tokens, so they are handed out in FIFO order
+                async with self._token_lock:
+                    while True:
+                        now = time.monotonic()
+                        self._refill(now)
+                        if now < self._blocked_until:
+                            await asyncio.sleep(self._blocked_until - now)
+                        elif self._tokens >= 1:
+                            self._tokens -= 1
+                            break
+                        else:
+                            await asyncio.sleep((1 - self._tokens) / self._rate)
+            except BaseException:
+                self._semaphore.release()
+                raise
+        finally:
+            self._waiting -= 1
+
+        self._in_flight += 1
+        self._stats["requests"] += 1
+        waited = time.monotonic() - start
+        self._stats["total_wait_seconds"] += waited
+        self._stats["max_wait_seconds"] = max(self._stats["max_wait_seconds"], waited)
+
+    def release(self) -> None:
+        """Give back the concurrency slot taken by ``acquire``."""
+        self._in_flight -= 1
+        self._semaphore.release()
+
+    def record(self, status_code: int, retry_after: Optional[str] = None) -> None:
+        """Adjust the rate from a response's status code and Retry-After header."""
+        now = time.monotonic()
+        if status_code in self.THROTTLE_STATUSES:
+            self._stats["throttle_events"] += 1
+            self._stats["last_throttle_status"] = status_code
+            self._stats["last_throttle_at"] = time.time()
+
+            # Back off at most once per interval, so a burst of failures from
+            # requests sent at the old rate doesn't collapse it to min_rate
+            if now - self._last_backoff >= self.recovery_interval:
+                new_rate = max(self.min_rate, self._rate * self.backoff_factor)
+                if new_rate < self._rate:
+                    self._stats["rate_decreases"] += 1
+                    logger.warning(
+                        f"Rate limiter '{self.name}': HTTP {status_code}, "
+                        f"rate {self._rate:.2f} -> {new_rate:.2f} req/s"
+                    )
+                self._rate = new_rate
+                self._tokens = min(self._tokens, 1.0)
+                self._last_backoff = now
+                self._last_adjustment = now
+
+            delay = parse_retry_after(retry_after)
+            if delay:
+                delay = min(delay, self.max_retry_after)
+                if now + delay > self._blocked_until:
+                    self._blocked_until = now + delay
+                    self._stats["retry_after_pauses"] += 1
+                    logger.warning(f"Rate limiter '{self.name}': pausing {delay:.1f}s (Retry-After)")
+            return
+
+        if self._rate < self.max_rate and now - self._last_adjustment >= self.recovery_interval:
+            self._rate = min(self.max_rate, self._rate + self.recovery_step)
+            self._last_adjustment = now
+            self._stats["rate_increases"] += 1
+
+    def slot(self) -> "_RateLimitSlot":
+        """Async context manager that acquires on entry and releases on exit."""
+        return _RateLimitSlot(self)
+
+    def get_stats(self) -> dict:
+        """Get limiter statistics for monitoring."""
+        now = time.monotonic()
+        requests = self._stats["requests"]
+        return {
+            "name": self.name,
+            "current_rate": round(self._rate, 3),
+            "max_rate": self.max_rate,
+            "min_rate": self.min_rate,
+            "burst": self.burst,
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self._in_flight,
+            "queue_depth": self._waiting,
+            "paused_for_seconds": round(max(0.0, self._blocked_until - now), 2),
+            **self._stats,
+            "total_wait_seconds": round(self._stats["total_wait_seconds"], 3),
+            "max_wait_seconds": round(self._stats["max_wait_seconds"], 3),
+            "avg_wait_seconds": round(self._stats["total_wait_seconds"] / requests, 4) if requests else 0.0,
+        }
+
+
+class _RateLimitSlot:
+    """One acquired limiter slot; call ``record`` with the response status."""
+
+    def __init__(self, limiter: AdaptiveRateLimiter):
+        self._limiter = limiter
+
+    async def __aenter__(self) -> "_RateLimitSlot":
+        await self._limiter.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> bool:
+        self._limiter.release()
+        return False
+
+    def record(self, status_code: int, retry_after: Optional[str] = None) -> None:
+        self._limiter.record(status_code, retry_after)
+
+
 # =============================================================================
 # PRE-CONFIGURED CIRCUIT BREAKERS
 # =============================================================================
@@ -347,3 +562,27 @@ claude_circuit = circuit_registry.get_or_create(
     recovery_timeout=120,
     half_open_requests=2,
 )
+
+
+# =============================================================================
+# PRE-CONFIGURED RATE LIMITERS
+# =============================================================================
+
+# Shared by every outbound FPL API request in this process
+fpl_rate_limiter = AdaptiveRateLimiter(
+    name="fpl_api",
+    max_rate=settings.FPL_RATE_LIMIT,
+    burst=settings.FPL_RATE_BURST,
+    max_concurrency=settings.FPL_MAX_CONCURRENCY,
+    min_rate=settings.FPL_RATE_MIN,
+)
+
+# Bulk player-history fetches (PredictorService.fetch_history_records). Their
+# requests also pass fpl_rate_limiter, so this is a share of its budget.
+fpl_history_rate_limiter = AdaptiveRateLimiter(
+    name="fpl_history",
+    max_rate=settings.FPL_HISTORY_RATE_LIMIT,
+    burst=settings.FPL_HISTORY_RATE_BURST,
+    max_concurrency=settings.FPL_HISTORY_MAX_CONCURRENCY,
+    min_rate=settings.FPL_RATE_MIN,
+)
@@ -0,0 +1,348 @@
+"""
+Benchmark: Vectorized vs Per-Player Scoring
+===========================================
+
+Runs PredictorService._calculate_player_scores (vectorized) and
+reference_scores (the original per-player loop, kept here) on the bootstrap
+and gameweek histories saved in ml/data, checks that both give identical
+scores and reports timings.
+
+Usage:
+    cd backend
+    python ml/benchmark_player_scoring.py [--repeat 5] [--double-gameweeks 2]
+
+--double-gameweeks N adds a second fixture in N recent rounds for half the
+teams, so players get same-round history rows (the tie case in the sort).
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services.predictor_service import CAPTAIN_BONUSES, POSITION_WEIGHTS, PredictorService  # noqa: E402
+
+DATA_DIR = Path(__file__).parent / "data"
+POSITION_MAP = {1: 'GKP', 2: 'DEF', 3: 'MID', 4: 'FWD'}
+
+
+def load_players() -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Players and teams prepared as PredictorService._fetch_fpl_data does."""
+    with open(DATA_DIR / "bootstrap_data.json") as f:
+        data = json.load(f)
+    players_df = pd.DataFrame(data['elements'])
+    teams_df = pd.DataFrame(data['teams'])
+    players_df['team_name'] = players_df['team'].map(dict(zip(teams_df['id'], teams_df['short_name'])))
+    players_df['position'] = players_df['element_type'].map(POSITION_MAP)
+    return players_df, teams_df
+
+
+def load_history(players_df: pd.DataFrame, double_gameweeks: int, rng: random.Random) -> pd.DataFrame:
+    """Saved element-summary histories, optionally with synthetic double gameweeks."""
+    history = pd.read_csv(DATA_DIR / "player_gw_histories.csv")
+    if not double_gameweeks:
+        return history
+
+    last_round = int(history['round'].max())
+    rounds = rng.sample(range(max(1, last_round - 6), last_round + 1), double_gameweeks)
+    teams = rng.sample(sorted(players_df['team'].unique()), len(players_df['team'].unique()) // 2)
+    player_team = dict(zip(players_df['id'], players_df['team']))
+
+    extra = history[
+        history['round'].isin(rounds) & history['player_id'].map(player_team).isin(teams)
+    ].copy()
+    # Second fixture with different returns, so which row sorts first matters
+    donors = history.sample(len(extra), random_state=rng.randrange(2**31), replace=True)
+    for col in ('minutes', 'total_points', 'expected_goals', 'expected_assists'):
+        extra[col] = donors[col].to_numpy()
+    extra['fixture'] += 10_000
+    return pd.concat([history, extra], ignore_index=True)
+
+
+def fake_fixtures(service: PredictorService, teams_df: pd.DataFrame, rng: random.Random) -> None:
+    """Random next-5-GW fixture runs for every team."""
+    names = dict(zip(teams_df['id'], teams_df['short_name']))
+    for team_id in teams_df['id']:
+        fixtures = []
+        for gw in range(5):
+            opponent_id = rng.choice([t for t in names if t != team_id])
+            fixtures.append({
+                'gw': gw + 1,
+                'opponent_id': opponent_id,
+                'opponent': names[opponent_id],
+                'fdr': rng.randint(1, 5),
+                'is_home': rng.random() < 0.5,
+            })
+        service._team_fixture_data[team_id] = fixtures
+        service._team_fixture_scores[team_id] = service._calculate_fixture_score(fixtures)
+        service._team_fixture_now_scores[team_id] = service._calculate_fixture_now_score(fixtures)
+
+
+def time_it(fn, repeat: int) -> float:
+    """Best wall time of ``repeat`` runs, in seconds."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def recent_games(player_history: pd.DataFrame) -> pd.DataFrame:
+    """A player's last five games, most recent first."""
+    return player_history.sort_values('round', ascending=False).head(5)
+
+
+def nailedness_score(player_history: pd.DataFrame, status: str, chance_of_playing: Optional[float]) -> float:
+    """Calculate nailedness score (0-10)."""
+    if len(player_history) > 0:
+        recent = recent_games(player_history)
+        avg_minutes = recent['minutes'].mean()
+        base_score = min(10, avg_minutes / 9)
+
+        games_started = (recent['minutes'] >= 60).sum()
+        if games_started == 5:
+            base_score = min(10, base_score + 0.5)
+    else:
+        base_score = 0
+
+    # Availability adjustment
+    if status in ('i', 's', 'u'):  # Injured, suspended, unavailable
+        base_score *= 0.0
+    elif status == 'd':  # Doubtful
+        base_score *= (chance_of_playing or 50) / 100
+    elif chance_of_playing is not None and chance_of_playing < 100:
+        base_score *= chance_of_playing / 100
+
+    return base_score
+
+
+def form_xg_score(player_history: pd.DataFrame) -> float:
+    """Calculate xG-based form score (0-10)."""
+    if len(player_history) == 0:
+        return 0
+
+    recent = recent_games(player_history)
+    played = recent[recent['minutes'] > 0]
+
+    if len(played) == 0:
+        return 0
+
+    xg = played['expected_goals'].astype(float).mean() if 'expected_goals' in played else 0
+    xa = played['expected_assists'].astype(float).mean() if 'expected_assists' in played else 0
+    return max(0, min(10, (xg + xa) * 10))
+
+
+def form_pts_score(player_history: pd.DataFrame) -> float:
+    """Calculate points-based form score (0-10)."""
+    if len(player_history) == 0:
+        return 0
+
+    avg_points = recent_games(player_history)['total_points'].mean()
+    return max(0, min(10, avg_points * 1.5))
+
+
+def position_fixture_score(base_score: float, position: str) -> float:
+    """Team fixture score adjusted for position (defenders benefit more from easy fixtures)."""
+    if position in ['GKP', 'DEF']:
+        if base_score > 5:
+            return min(10, base_score * 1.1)
+        return max(0, base_score * 0.9)
+    return max(0, min(10, base_score))
+
+
+def captain_score(
+    final_score: float,
+    is_penalty_taker: bool,
+    is_set_piece_taker: bool,
+    is_home: bool,
+    next_fdr: int,
+    position: str,
+    fixture_now_score: float = 5.0,
+    fixture_score: float = 5.0,
+) -> tuple[float, list[str]]:
+    """Captain-specific score with bonuses, and the bonuses applied."""
+    bonuses_applied = []
+
+    # Goalkeepers shouldn't be captained (very rare hauls)
+    if position == 'GKP':
+        return round(final_score * 0.3, 2), ['GKP penalty']
+
+    # Weight fixture_now (next GW only) over the 5-GW fixture score
+    fixture_adjustment = (fixture_now_score - fixture_score) / 10
+    score = final_score * (1 + fixture_adjustment * 0.15)
+
+    if abs(fixture_adjustment) > 0.1:
+        bonuses_applied.append('fixture_now_boost' if fixture_adjustment > 0 else 'fixture_now_penalty')
+
+    if is_penalty_taker:
+        score *= CAPTAIN_BONUSES['penalty_taker']
+        bonuses_applied.append('penalty_taker')
+    if is_set_piece_taker:
+        score *= CAPTAIN_BONUSES['set_piece_taker']
+        bonuses_applied.append('set_piece_taker')
+    if is_home:
+        score *= CAPTAIN_BONUSES['home_game']
+        bonuses_applied.append('home_game')
+    if next_fdr <= 2:
+        score *= CAPTAIN_BONUSES['easy_fixture']
+        bonuses_applied.append('easy_fixture')
+
+    return round(score, 2), bonuses_applied
+
+
+def reference_scores(service: PredictorService, players_df: pd.DataFrame) -> Dict[int, Dict[str, Any]]:
+    """
+    Per-player implementation of PredictorService._calculate_player_scores.
+
+    Slow (filters and sorts the history frame once per player) but easy to
+    follow; the vectorized version is checked against it.
+    """
+    history = service._history_df
+    scores: Dict[int, Dict[str, Any]] = {}
+
+    for _, player in players_df.iterrows():
+        player_id = player['id']
+        team_id = player['team']
+        position = player['position']
+
+        if history is not None and len(history) > 0:
+            player_history = history[history['player_id'] == player_id]
+        else:
+            player_history = pd.DataFrame()
+
+        nailedness = nailedness_score(
+            player_history,
+            player.get('status', 'a'),
+            player.get('chance_of_playing_next_round')
+        )
+        form_xg = form_xg_score(player_history)
+        form_pts = form_pts_score(player_history)
+        fixture = position_fixture_score(service._team_fixture_scores.get(team_id, 5.0), position)
+        fixture_now = position_fixture_score(service._team_fixture_now_scores.get(team_id, 5.0), position)
+
+        weights = POSITION_WEIGHTS.get(position, POSITION_WEIGHTS['MID'])
+        final_score = (
+            weights['nailedness'] * nailedness +
+            weights['form_xg'] * form_xg +
+            weights['form_pts'] * form_pts +
+            weights['fixture'] * fixture
+        )
+        final_score = max(0, min(10, final_score))
+
+        team_fixtures = service._team_fixture_data.get(team_id, [])
+        next_fixture = team_fixtures[0] if team_fixtures else None
+
+        if len(player_history) > 0:
+            recent = recent_games(player_history)
+            avg_minutes = float(recent['minutes'].mean())
+            avg_points = float(recent['total_points'].mean())
+        else:
+            avg_minutes = 0.0
+            avg_points = 0.0
+
+        penalties_order = player.get('penalties_order', None)
+        is_penalty_taker = penalties_order is not None and penalties_order == 1
+        set_piece_order = player.get('corners_and_indirect_freekicks_order', None)
+        is_set_piece_taker = set_piece_order is not None and set_piece_order <= 2
+
+        next_home = next_fixture['is_home'] if next_fixture else False
+        next_fdr = next_fixture['fdr'] if next_fixture else 3
+
+        captain, captain_bonuses = captain_score(
+            final_score=final_score,
+            is_penalty_taker=is_penalty_taker,
+            is_set_piece_taker=is_set_piece_taker,
+            is_home=next_home,
+            next_fdr=next_fdr,
+            position=position,
+            fixture_now_score=fixture_now,
+            fixture_score=fixture,
+        )
+
+        scores[player_id] = {
+            'name': player['web_name'],
+            'full_name': f"{player.get('first_name', '')} {player.get('second_name', '')}".strip(),
+            'team': player['team_name'],
+            'team_id': team_id,
+            'position': position,
+            'price': player['now_cost'] / 10,
+            'ownership': float(player.get('selected_by_percent', 0)),
+            'status': player.get('status', 'a'),
+            'news': player.get('news', ''),
+            'nailedness_score': round(nailedness, 2),
+            'form_xg_score': round(form_xg, 2),
+            'form_pts_score': round(form_pts, 2),
+            'fixture_score': round(fixture, 2),
+            'fixture_now_score': round(fixture_now, 2),
+            'final_score': round(final_score, 2),
+            'captain_score': captain,
+            'captain_bonuses': captain_bonuses,
+            'is_penalty_taker': is_penalty_taker,
+            'is_set_piece_taker': is_set_piece_taker,
+            'avg_minutes': round(avg_minutes, 1),
+            'avg_points': round(avg_points, 1),
+            'total_points': player.get('total_points', 0),
+            'form': float(player.get('form', 0)),
+            'next_opponent': next_fixture['opponent'] if next_fixture else '',
+            'next_fdr': next_fdr,
+            'next_home': next_home,
+        }
+
+    service._assign_ranks(scores)
+    return scores
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per implementation (best is reported)")
+    parser.add_argument("--double-gameweeks", type=int, default=2, help="Synthetic double gameweeks to add")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    players_df, teams_df = load_players()
+    service = PredictorService()
+    service._history_df = load_history(players_df, args.double_gameweeks, rng)
+    fake_fixtures(service, teams_df, rng)
+
+    print("=" * 60)
+    print("PLAYER SCORING BENCHMARK")
+    print("=" * 60)
+    print(f"Players: {len(players_df)}, history rows: {len(service._history_df)}")
+    print()
+
+    reference = reference_scores(service, players_df)
+    vectorized = service._calculate_player_scores(players_df)
+
+    mismatches = [pid for pid in reference if reference[pid] != vectorized.get(pid)]
+    if set(vectorized) != set(reference):
+        mismatches.append("player set differs")
+    if mismatches:
+        print(f"❌ {len(mismatches)} players differ, e.g.:")
+        for pid in mismatches[:5]:
+            ref, vec = reference.get(pid, {}), vectorized.get(pid, {})
+            diff = {k: (ref.get(k), vec.get(k)) for k in ref if ref.get(k) != vec.get(k)}
+            print(f"   {pid}: {diff}")
+    else:
+        print(f"✅ Scores identical for all {len(reference)} players")
+    print()
+
+    loop_time = time_it(lambda: reference_scores(service, players_df), args.repeat)
+    vector_time = time_it(lambda: service._calculate_player_scores(players_df), args.repeat)
+    print(f"Per-player loop: {loop_time * 1000:8.1f} ms")
+    print(f"Vectorized:      {vector_time * 1000:8.1f} ms")
+    print(f"Speedup:         {loop_time / vector_time:8.1f}x")
+
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Benchmark: Batched Stage 2 Points Inference
+===========================================
+
+Scores the saved bootstrap and gameweek histories (ml/data) with
+PredictorService, then serves the Stage 2 points models on that snapshot
+through PointsModelService and reports:
+
+- Feature drift: mean and spread of each served feature against the
+  training scaler's mean/scale (large shifts mean a feature is built
+  differently online than it was for training).
+- Parity: batched predictions vs one model call per player.
+- Latency: feature build, each model, the blended total against the
+  latency budget, and a cached repeat.
+
+Usage:
+    cd backend
+    python ml/benchmark_points_models.py [--repeat 5] [--model-set v2]
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmark_player_scoring import fake_fixtures, load_history, load_players  # noqa: E402
+from services.points_model_service import PointsModelService, build_points_features  # noqa: E402
+from services.predictor_service import PredictorService  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs (best is reported)")
+    parser.add_argument("--model-set", default=None, help="Feature set (default: POINTS_MODEL_SET)")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    players_df, teams_df = load_players()
+    predictor = PredictorService()
+    predictor._history_df = load_history(players_df, 0, rng)
+    fake_fixtures(predictor, teams_df, rng)
+    predictor._publish(predictor._calculate_player_scores(players_df), gameweek=1)
+
+    service = PointsModelService(model_set=args.model_set)
+    ensemble = service._get_ensemble()
+
+    print("=" * 60)
+    print(f"STAGE 2 POINTS MODELS ({ensemble.model_set})")
+    print("=" * 60)
+    print(f"Players: {len(predictor.snapshot)}, models: {', '.join(ensemble.models)}")
+    for name, reason in ensemble.missing.items():
+        print(f"  (skipped {name}: {reason})")
+    print()
+
+    # Feature drift against the training scaler
+    snapshot = predictor.snapshot
+    ids, frame = build_points_features(
+        snapshot.scores, snapshot.history, snapshot.team_fixtures, snapshot.recent_aggregates,
+    )
+    X = frame[ensemble.features].to_numpy(dtype=float)
+    scaled = ensemble.scaler.transform(X)
+    print("Feature drift (served mean / std in training-scaler units):")
+    for i, name in enumerate(ensemble.features):
+        mean, std = scaled[:, i].mean(), scaled[:, i].std()
+        flag = "  <-" if abs(mean) > 0.5 or not 0.4 < std < 2.5 else ""
+        print(f"  {name:28s} {mean:+6.2f} / {std:5.2f}{flag}")
+    print()
+
+    # Batched vs per-player model calls
+    max_diff = 0.0
+    for name, model in ensemble.models.items():
+        batch = np.asarray(model.predict(scaled), dtype=float).reshape(-1)
+        single = np.array([np.asarray(model.predict(scaled[i:i + 1])).reshape(-1)[0] for i in range(len(scaled))])
+        max_diff = max(max_diff, float(np.max(np.abs(batch - single))))
+    identical = max_diff < 1e-9
+    print(f"{'✅' if identical else '❌'} Batched == per-player predictions (max diff {max_diff:.1e})")
+    print()
+
+    # Latency (fresh cache each run; the cost estimates carry over as in serving)
+    best = None
+    for _ in range(args.repeat):
+        service._cache.clear()
+        result = service.predict(predictor)
+        if best is None or result.timings_ms['total'] < best.timings_ms['total']:
+            best = result
+    start = time.perf_counter()
+    service.predict(predictor)
+    cached_ms = (time.perf_counter() - start) * 1000
+
+    print("Latency (best run):")
+    for name, ms in best.timings_ms.items():
+        print(f"  {name:14s} {ms:8.1f} ms")
+    print(f"  {'cached':14s} {cached_ms:8.3f} ms")
+    print(f"  budget         {service.latency_budget_ms:8.1f} ms")
+    for name, reason in best.skipped.items():
+        print(f"  skipped {name}: {reason}")
+    print()
+
+    top = sorted(best.points.items(), key=lambda item: item[1], reverse=True)[:5]
+    print("Top expected points:")
+    for player_id, points in top:
+        entry = predictor.snapshot.scores[player_id]
+        print(f"  {entry['name']:16s} {entry['position']}  {points:5.2f}")
+
+    within_budget = best.timings_ms['total'] <= service.latency_budget_ms
+    sys.exit(0 if identical and within_budget else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Benchmark: Batched vs Per-Player Stage 1 Inference
+==================================================
+
+Runs MLPredictorService P(plays) prediction for every player in the saved
+bootstrap (ml/data/bootstrap_data.json) two ways - predict_p_plays once per
+player (the old predict_all_players loop) and predict_p_plays_batch - checks
+that both give the same probabilities and reports per-run latency, plus a
+full predict_all_players run.
+
+Usage:
+    cd backend
+    python ml/benchmark_stage1_inference.py [--repeat 5] [--gameweek 14]
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from models import Player  # noqa: E402
+from services.fixture_matrix import FixtureMatrix  # noqa: E402
+from services.ml_predictor_service import MLPredictorService  # noqa: E402
+
+DATA_DIR = Path(__file__).parent / "data"
+POSITION_MAP = {1: 'GKP', 2: 'DEF', 3: 'MID', 4: 'FWD'}
+
+
+def load_players() -> list[Player]:
+    """Players parsed as FPLService does."""
+    with open(DATA_DIR / "bootstrap_data.json") as f:
+        data = json.load(f)
+    teams = {t['id']: t['short_name'] for t in data['teams']}
+    return [
+        Player(**{
+            **{k: v for k, v in p.items() if k in Player.model_fields},
+            'team_name': teams.get(p['team']),
+            'position': POSITION_MAP.get(p['element_type'], "???"),
+            'news': p['news'] or "",
+        })
+        for p in data['elements']
+    ]
+
+
+class StubFPLService:
+    """Just enough of FPLService for predict_all_players."""
+
+    def __init__(self, players: list[Player], gameweek: int):
+        self._players = players
+        self._gameweek = gameweek
+
+    def get_all_players(self) -> list[Player]:
+        return self._players
+
+    def get_current_gameweek(self) -> int:
+        return self._gameweek
+
+    async def get_fixture_matrix(self) -> FixtureMatrix:
+        return FixtureMatrix()
+
+
+def time_it(fn, repeat: int) -> float:
+    """Best wall time of ``repeat`` runs, in seconds."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per implementation (best is reported)")
+    parser.add_argument("--gameweek", type=int, default=14)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    players = load_players()
+    service = MLPredictorService()
+    if not service._models_loaded:
+        print("❌ Stage 1 model not found in ml/models")
+        sys.exit(1)
+
+    service.set_services(StubFPLService(players, args.gameweek))
+    rng = random.Random(args.seed)
+    home = {p.team: rng.random() < 0.5 for p in players}
+
+    async def update_fixture_data():
+        service._team_is_home = home
+
+    service.update_fixture_data = update_fixture_data
+    modelled = sum(service._p_plays_from_status(p) is None for p in players)
+
+    print("=" * 60)
+    print("STAGE 1 INFERENCE BENCHMARK")
+    print("=" * 60)
+    print(f"Players: {len(players)}, scored by the model: {modelled}")
+    print()
+
+    loop = [service.predict_p_plays(p, args.gameweek) for p in players]
+    batch = service.predict_p_plays_batch(players, args.gameweek)
+    max_diff = max(abs(a - b) for a, b in zip(loop, batch))
+    # The forest averages its trees in parallel threads, so sums can differ in the last bit
+    identical = max_diff < 1e-9 and [round(p, 3) for p in loop] == [round(p, 3) for p in batch]
+    if identical:
+        print(f"✅ Same P(plays) for all {len(players)} players (max diff {max_diff:.1e})")
+    else:
+        print(f"❌ P(plays) differ (max diff {max_diff:.1e})")
+    print()
+
+    loop_time = time_it(lambda: [service.predict_p_plays(p, args.gameweek) for p in players], args.repeat)
+    batch_time = time_it(lambda: service.predict_p_plays_batch(players, args.gameweek), args.repeat)
+    full_time = time_it(lambda: asyncio.run(service.predict_all_players()), args.repeat)
+    print(f"Per-player P(plays):  {loop_time * 1000:8.1f} ms")
+    print(f"Batched P(plays):     {batch_time * 1000:8.1f} ms")
+    print(f"Speedup:              {loop_time / batch_time:8.1f}x")
+    print(f"predict_all_players:  {full_time * 1000:8.1f} ms (batched)")
+
+    sys.exit(0 if identical else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+Export the Stage 1 Random Forest to NumPy Arrays
+================================================
+
+Converts ml/models/stage1_random_forest.pkl and scaler_stage1.pkl into the
+array format served by services/forest_runtime.py (ml/models/stage1_forest/),
+then checks it against scikit-learn and compares load cost:
+
+- Parity: predict_proba of the array forest vs the sklearn pipeline on
+  feature rows built from the saved bootstrap at several gameweeks, random
+  rows around the scaler's mean, and rows sitting exactly on split
+  thresholds. Probabilities must match exactly.
+- Load: wall time and resident memory of loading each format in a fresh
+  interpreter, and whether scikit-learn had to be imported.
+
+Run after retraining Stage 1 (ml/regenerate_models.py does this itself).
+
+Usage:
+    cd backend
+    python ml/export_stage1_forest.py [--check-only] [--random-rows 20000]
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services.forest_runtime import export_forest, load_forest  # noqa: E402
+
+MODELS_DIR = Path(__file__).parent / "models"
+EXPORT_DIR = MODELS_DIR / "stage1_forest"
+
+# Loads one format in a fresh interpreter and reports time, RSS growth and sklearn import
+LOAD_PROBE = """
+import json, sys, time
+sys.path.insert(0, {backend!r})
+import numpy as np
+
+def rss_kb():
+    with open("/proc/self/status") as f:
+        return next(int(line.split()[1]) for line in f if line.startswith("VmRSS"))
+
+before = rss_kb()
+start = time.perf_counter()
+if {fmt!r} == "pickle":
+    import joblib
+    model = joblib.load({models!r} + "/stage1_random_forest.pkl")
+    scaler = joblib.load({models!r} + "/scaler_stage1.pkl")
+else:
+    # By file path, so the services package (FPL client, httpx) isn't counted
+    import importlib.util
+    spec = importlib.util.spec_from_file_location("forest_runtime", {backend!r} + "/services/forest_runtime.py")
+    runtime = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(runtime)
+    exported = runtime.load_forest({models!r} + "/stage1_forest")
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "rss_kb": rss_kb() - before, "sklearn": "sklearn" in sys.modules}}))
+"""
+
+
+def sklearn_proba(model, scaler, X: np.ndarray) -> np.ndarray:
+    return model.predict_proba(scaler.transform(pd.DataFrame(X, columns=scaler.feature_names_in_)))
+
+
+def parity_rows(model, scaler, random_rows: int, seed: int) -> dict[str, np.ndarray]:
+    """Unscaled feature matrices to compare on."""
+    from benchmark_stage1_inference import load_players
+    from services.ml_predictor_service import MLPredictorService
+
+    rng = np.random.default_rng(seed)
+    service = MLPredictorService()
+    players = load_players()
+    service._team_is_home = {p.team: bool(rng.random() < 0.5) for p in players}
+    bootstrap = np.array([
+        service._build_stage1_features(player, gw) for gw in (1, 2, 8, 14, 30, 38) for player in players
+    ], dtype=float)
+
+    random = rng.normal(scaler.mean_, scaler.scale_ * 1.5, size=(random_rows, len(scaler.mean_)))
+
+    # Rows whose scaled value lands exactly on a split threshold (the <= edge)
+    trees = [e.tree_ for e in model.estimators_[:10]]
+    splits = [(f, t) for tree in trees for f, t in zip(tree.feature, tree.threshold) if f >= 0]
+    picks = rng.choice(len(splits), size=min(2000, len(splits)), replace=False)
+    edge_scaled = rng.normal(0, 1, size=(len(picks), len(scaler.mean_)))
+    for row, i in enumerate(picks):
+        feature, threshold = splits[i]
+        edge_scaled[row, feature] = np.float32(threshold)
+    edge = edge_scaled * scaler.scale_ + scaler.mean_
+
+    return {"bootstrap": bootstrap, "random": random, "threshold edges": edge}
+
+
+def check_parity(model, scaler, random_rows: int, seed: int) -> bool:
+    exported = load_forest(str(EXPORT_DIR))
+    ok = True
+    for name, X in parity_rows(model, scaler, random_rows, seed).items():
+        expected = sklearn_proba(model, scaler, X)
+        actual = exported.forest.predict_proba(exported.scaler.transform(X))
+        same = np.array_equal(expected, actual)
+        max_diff = float(np.max(np.abs(expected - actual)))
+        print(f"  {'✅' if same else '❌'} {name:16s} {len(X):6d} rows, max diff {max_diff:.1e}")
+        ok &= same or max_diff < 1e-12
+    return ok
+
+
+def probe_load(fmt: str) -> dict:
+    code = LOAD_PROBE.format(backend=str(Path(__file__).resolve().parent.parent), models=str(MODELS_DIR), fmt=fmt)
+    out = subprocess.run([sys.executable, "-W", "ignore", "-c", code], capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--check-only", action="store_true", help="Skip the export, only verify the existing one")
+    parser.add_argument("--random-rows", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    model = joblib.load(MODELS_DIR / "stage1_random_forest.pkl")
+    scaler = joblib.load(MODELS_DIR / "scaler_stage1.pkl")
+    features = joblib.load(MODELS_DIR / "stage1_features.pkl")
+
+    print("=" * 60)
+    print("STAGE 1 FOREST EXPORT")
+    print("=" * 60)
+    if not args.check_only:
+        meta = export_forest(str(EXPORT_DIR), model, scaler, features)
+        size = sum(f.stat().st_size for f in EXPORT_DIR.iterdir())
+        print(f"Exported {meta['n_trees']} trees / {meta['n_nodes']} nodes to {EXPORT_DIR} ({size / 1e6:.2f} MB)")
+    print()
+
+    print("Parity with scikit-learn:")
+    ok = check_parity(model, scaler, args.random_rows, args.seed)
+    print()
+
+    print("Load (fresh interpreter):")
+    for fmt, label in (("pickle", "joblib pickles"), ("arrays", "array export")):
+        stats = probe_load(fmt)
+        print(
+            f"  {label:15s} {stats['seconds'] * 1000:7.1f} ms, +{stats['rss_kb'] / 1024:5.1f} MB RSS, "
+            f"sklearn imported: {stats['sklearn']}"
+        )
+
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,11 +3,12 @@
 Regenerate ML Models for Squad Builder Integration
 
 This script regenerates the Stage 1 (P(plays)) and Stage 2 (points) models
-using the existing cleaned and feature-engineered data.
+using the cleaned data, with features built by the feature store.
 """
 
 import os
 import pickle
+import sys
 import joblib
 import pandas as pd
 import numpy as np
@@ -23,33 +24,23 @@ SCRIPT_DIR = Path(__file__).parent
 DATA_DIR = SCRIPT_DIR / "data"
 MODELS_DIR = SCRIPT_DIR / "models"
 
-# Stage 1 features (for P(plays) prediction)
-STAGE1_FEATURES = [
-    'games_so_far', 'is_DEF', 'is_FWD', 'is_GKP', 'is_MID', 'is_home',
-    'mins_per_game', 'minutes_avg_last5', 'minutes_lag1', 'minutes_lag2',
-    'nailedness_score', 'selected_pct', 'start_rate_overall',
-    'starts_lag1', 'starts_lag2', 'starts_rate_last3', 'starts_rate_last5',
-    'value_millions'
-]
-
-# Stage 2 features (for points prediction)
-STAGE2_FEATURES = [
-    'games_so_far', 'is_DEF', 'is_FWD', 'is_GKP', 'is_MID', 'is_home',
-    'mins_per_game', 'minutes_avg_last5', 'nailedness_score',
-    'selected_pct', 'start_rate_overall', 'value_millions',
-    'points_avg_last5', 'bps_avg_last5', 'ict_index_avg_last5',
-    'expected_goals_avg_last5', 'expected_assists_avg_last5'
-]
+sys.path.insert(0, str(SCRIPT_DIR.parent))
+from services.feature_store import STAGE1_FEATURES, STAGE2_FEATURES, build_features, get_feature_store  # noqa: E402
+from services.forest_runtime import export_forest  # noqa: E402
 
 
 def load_data():
-    """Load the feature-engineered data."""
-    data_path = DATA_DIR / "feature_engineered_data.csv"
+    """Build the per-gameweek features from the cleaned data (services/feature_store.py)."""
+    data_path = DATA_DIR / "cleaned_data.csv"
     if not data_path.exists():
         raise FileNotFoundError(f"Data file not found: {data_path}")
 
-    df = pd.read_csv(data_path)
-    print(f"Loaded {len(df)} rows from {data_path.name}")
+    # cleaned_data.csv already has value in £m
+    history = pd.read_csv(data_path).rename(columns={'value': 'price'})
+    df = build_features(history)
+    store = get_feature_store()
+    store.save(df, source=data_path.name)
+    print(f"Built {len(df)} feature rows from {data_path.name} (saved to {store.path})")
     return df
 
 
@@ -57,7 +48,7 @@ def prepare_stage1_data(df):
     """Prepare data for Stage 1 model (P(plays) classifier)."""
     # Target: whether player played (>=1 minute)
     if 'target_played' in df.columns:
-        y = df['target_played'].values
+        y = df['target_played'].astype(int).values
     else:
         y = (df['minutes'] > 0).astype(int).values
 
@@ -198,6 +189,10 @@ def save_models(stage1_model, stage1_scaler, stage1_features,
     joblib.dump(stage1_features, MODELS_DIR / 'stage1_features.pkl')
     print(f"Saved Stage 1 model to {MODELS_DIR}/stage1_random_forest.pkl")
 
+    # Array export served by MLPredictorService (see services/forest_runtime.py)
+    export_forest(str(MODELS_DIR / 'stage1_forest'), stage1_model, stage1_scaler, stage1_features)
+    print(f"Exported Stage 1 arrays to {MODELS_DIR}/stage1_forest")
+
     # Save Stage 2
     joblib.dump(stage2_model, MODELS_DIR / 'stage2_ridge.pkl')
     joblib.dump(stage2_scaler, MODELS_DIR / 'scaler_stage2.pkl')
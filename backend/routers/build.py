@@ -62,6 +62,7 @@ class MLPredictionResponse(BaseModel):
     fixture_score: float  # Fixture difficulty score (0-100)
     is_available: bool
     availability_reason: str
+    expected_points: Optional[float] = None  # Stage 2 points models (expected FPL points)
 
 
 class PlayerResponse(BaseModel):
@@ -382,7 +383,8 @@ def squad_player_to_response(player: SquadPlayer) -> PlayerResponse:
             form_score_pts=player.ml_prediction.form_score_pts,
             fixture_score=player.ml_prediction.fixture_score,
             is_available=player.ml_prediction.is_available,
-            availability_reason=player.ml_prediction.availability_reason
+            availability_reason=player.ml_prediction.availability_reason,
+            expected_points=player.ml_prediction.expected_points,
         )
 
     return PlayerResponse(
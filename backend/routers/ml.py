@@ -12,6 +12,7 @@ Provides endpoints for:
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import List, Dict, Optional, Any
+import asyncio
 import logging
 
 from services.ml_service import get_ml_service, ModelCoefficients, ModelPrediction
@@ -424,6 +425,57 @@ async def get_model_versions(limit: int = 10):
     }
 
 
+@router.get("/registry")
+async def get_model_registry_status():
+    """
+    List the model artifacts in ml/models.
+
+    Shows every version of each artifact, which one is serving and
+    which are currently loaded.
+    """
+    from services.model_registry import get_model_registry
+
+    registry = get_model_registry()
+
+    def scan():
+        registry.refresh()
+        return registry.describe()
+
+    models = await asyncio.to_thread(scan)
+    return {
+        "success": True,
+        "count": len(models),
+        "models": models
+    }
+
+
+@router.post("/registry/{name}/deploy")
+async def deploy_model_artifact(name: str, version: Optional[str] = None):
+    """
+    Hot-swap the serving version of a model artifact.
+
+    The new version is loaded before it replaces the old one, so requests
+    keep being served throughout. Without a version, the serving version is
+    reloaded from disk (e.g. after a retrain rewrote it in place).
+    """
+    from services.model_registry import get_model_registry, ModelNotFoundError
+
+    try:
+        artifact = await asyncio.to_thread(get_model_registry().deploy, name, version)
+    except ModelNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        logger.error(f"Deploying {name}@{version} failed: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+    return {
+        "success": True,
+        "name": artifact.name,
+        "version": artifact.version,
+        "kind": artifact.kind,
+    }
+
+
 @router.get("/accuracy")
 async def get_accuracy_reports(model_version: Optional[str] = None, limit: int = 10):
     """
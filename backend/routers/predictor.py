@@ -8,12 +8,14 @@ Scores are pre-calculated and stored in database for fast retrieval.
 from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
 from typing import List, Dict, Optional, Any
+import asyncio
 import logging
 from sqlalchemy.orm import Session
-from datetime import datetime
 
-from services.predictor_service import get_predictor_service
-from database import get_db, MLPlayerScore as DBMLPlayerScore, CalculationLog, init_db
+from services.job_runner import get_job_runner
+from services.points_model_service import get_points_model_service
+from services.predictor_service import ScoreIndex, get_predictor_service
+from database import get_db, MLPlayerScore as DBMLPlayerScore, init_db
 
 logger = logging.getLogger(__name__)
 
@@ -75,6 +77,59 @@ class CalculateResponse(BaseModel):
     gameweek: int
     elapsed_seconds: float
     last_update: str
+    snapshot_version: Optional[int] = None  # in-memory score snapshot published by this run
+    history_fetch: Optional[dict] = None  # fetched/failed players, retries, timing
+    db_write: Optional[dict] = None  # rows, batches, rows_per_second of the score upsert
+    changes: Optional[dict] = None  # what an incremental refresh found changed (None for full runs)
+    points_model: Optional[dict] = None  # Stage 2 ensemble run for the new snapshot (models, weights, timings)
+
+
+class JobStageTiming(BaseModel):
+    """Timing of one stage of a background job."""
+    name: str
+    started_at: str
+    elapsed_seconds: Optional[float] = None  # None while the stage is running
+
+
+class JobResponse(BaseModel):
+    """State of a background job (e.g. a score calculation)."""
+    job_id: str
+    kind: str
+    status: str  # queued, running, succeeded, failed, cancelled
+    trigger: str
+    deduplicated: bool = False  # True when an in-flight job was returned instead of a new one
+    submitted_at: str
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    elapsed_seconds: Optional[float] = None
+    stage: Optional[str] = None
+    progress: Optional[Dict[str, int]] = None  # done/total within the current stage
+    stages: List[JobStageTiming] = []
+    result: Optional[Dict[str, Any]] = None  # CalculateResponse fields for score calculations
+    error: Optional[str] = None
+
+
+class PlayerExpectedPoints(BaseModel):
+    """Stage 2 expected points for a player, next to the SmartPlay score."""
+    player_id: int
+    name: str
+    team: str
+    position: str
+    price: float
+    final_score: float
+    expected_points: float  # Blended ensemble prediction
+    by_model: Dict[str, float]  # Each model's prediction
+
+
+class ExpectedPointsResponse(BaseModel):
+    """Stage 2 expected points for one score snapshot."""
+    snapshot_version: int
+    gameweek: Optional[int]
+    model_set: str
+    weights: Dict[str, float]  # Ensemble weights of the models that ran
+    skipped: Dict[str, str]  # Models left out and why
+    timings_ms: Dict[str, float]
+    players: List[PlayerExpectedPoints]
 
 
 class TopPlayersResponse(BaseModel):
@@ -87,6 +142,17 @@ class TopPlayersResponse(BaseModel):
 # Endpoints
 # =========================================================================
 
+def _snapshot_index() -> Optional[ScoreIndex]:
+    """
+    Ranked index of the in-memory score snapshot.
+
+    None until this process has calculated scores; list endpoints then fall
+    back to querying the latest scores in the database.
+    """
+    snapshot = get_predictor_service().snapshot
+    return snapshot.index if len(snapshot) else None
+
+
 @router.get("/status", response_model=PredictorStatusResponse)
 async def get_predictor_status(db: Session = Depends(get_db)):
     """Get the current status of the ML predictor service."""
@@ -113,59 +179,47 @@ async def get_predictor_status(db: Session = Depends(get_db)):
         )
 
 
-@router.post("/calculate", response_model=CalculateResponse)
-async def calculate_scores(db: Session = Depends(get_db)):
+@router.post("/calculate", response_model=JobResponse, status_code=202)
+async def calculate_scores(incremental: bool = False):
     """
-    Calculate/refresh ML scores for all players and save to database.
+    Queue a recalculation of ML scores for all players.
+
+    With incremental=true the fresh FPL data is diffed against the inputs of
+    the current scores: only players whose fixtures, availability, history
+    or profile changed are rescored (then everyone is re-ranked), and only
+    players with new history rows are synced. The result's "changes" field
+    says what moved.
 
-    This runs the full prediction pipeline:
+    This runs the full prediction pipeline as a background job:
     1. Fetch FPL data
     2. Calculate fixture difficulty
     3. Fetch player histories
     4. Calculate component and final scores
     5. Save to database
 
-    Takes ~1-2 minutes to complete.
+    Returns the job immediately; poll GET /jobs/{job_id} for its stage,
+    progress, stage timings and final stats. If a calculation of the same
+    mode (full or incremental) is already queued or running, that job is
+    returned (deduplicated=true) rather than starting another; a full run
+    requested during an incremental one is queued behind it.
     """
-    predictor = get_predictor_service()
-    start_time = datetime.utcnow()
+    job, created = get_predictor_service().submit_calculation(trigger="api", incremental=incremental)
+    return JobResponse(**job.to_dict(), deduplicated=not created)
 
-    try:
-        # Calculate scores and save to database
-        result = await predictor.calculate_scores(db=db)
-
-        # Log the calculation
-        log_entry = CalculationLog(
-            gameweek=result["gameweek"],
-            players_scored=result["players_scored"],
-            elapsed_seconds=result["elapsed_seconds"],
-            success=True,
-            error_message=None,
-            started_at=start_time,
-            completed_at=datetime.utcnow(),
-        )
-        db.add(log_entry)
-        db.commit()
 
-        return CalculateResponse(**result)
+@router.get("/jobs", response_model=List[JobResponse])
+async def list_jobs(kind: Optional[str] = None, limit: int = 20):
+    """Recent background jobs (most recent first), optionally of one kind."""
+    return [JobResponse(**job.to_dict()) for job in get_job_runner().list(kind, limit)]
 
-    except Exception as e:
-        logger.error(f"Score calculation failed: {e}")
-
-        # Log the failed calculation
-        log_entry = CalculationLog(
-            gameweek=0,
-            players_scored=0,
-            elapsed_seconds=(datetime.utcnow() - start_time).total_seconds(),
-            success=False,
-            error_message=str(e),
-            started_at=start_time,
-            completed_at=datetime.utcnow(),
-        )
-        db.add(log_entry)
-        db.commit()
 
-        raise HTTPException(status_code=500, detail=str(e))
+@router.get("/jobs/{job_id}", response_model=JobResponse)
+async def get_job(job_id: str):
+    """Status, progress, stage timings and result of a background job."""
+    job = get_job_runner().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return JobResponse(**job.to_dict())
 
 
 @router.get("/player/{player_id}", response_model=PlayerScore)
@@ -216,6 +270,11 @@ async def get_all_scores(
         position: Filter by position (GKP, DEF, MID, FWD)
         min_score: Minimum final_score to include
     """
+    index = _snapshot_index()
+    if index is not None:
+        positions = [position.upper()] if position else None
+        return [PlayerScore(**e) for e in index.top_by_final(limit, positions, min_score)]
+
     # Get latest gameweek
     latest_score = db.query(DBMLPlayerScore).order_by(DBMLPlayerScore.calculated_at.desc()).first()
 
@@ -255,6 +314,13 @@ async def get_top_by_position(position: str, limit: int = 10, db: Session = Depe
     if position not in ['GKP', 'DEF', 'MID', 'FWD']:
         raise HTTPException(status_code=400, detail=f"Invalid position: {position}")
 
+    index = _snapshot_index()
+    if index is not None:
+        return TopPlayersResponse(
+            position=position,
+            players=[PlayerScore(**e) for e in index.top_by_final(limit, [position])],
+        )
+
     # Get latest gameweek
     latest_score = db.query(DBMLPlayerScore).order_by(DBMLPlayerScore.calculated_at.desc()).first()
 
@@ -286,6 +352,14 @@ async def get_captain_picks(limit: int = 10, db: Session = Depends(get_db)):
     - Attacking positions (MID/FWD preferred)
     - Good overall score
     """
+    index = _snapshot_index()
+    if index is not None:
+        candidates = index.top_by_final(
+            limit, ['MID', 'FWD'],
+            where=lambda e: e['nailedness_score'] >= 8 and e['status'] == 'a',
+        )
+        return [PlayerScore(**e) for e in candidates]
+
     # Get latest gameweek
     latest_score = db.query(DBMLPlayerScore).order_by(DBMLPlayerScore.calculated_at.desc()).first()
 
@@ -315,6 +389,10 @@ async def get_differential_picks(max_ownership: float = 10.0, limit: int = 10, d
         max_ownership: Maximum ownership percentage (default 10%)
         limit: Number of players to return
     """
+    index = _snapshot_index()
+    if index is not None:
+        return [PlayerScore(**e) for e in index.differentials(max_ownership, limit)]
+
     # Get latest gameweek
     latest_score = db.query(DBMLPlayerScore).order_by(DBMLPlayerScore.calculated_at.desc()).first()
 
@@ -344,6 +422,10 @@ async def get_value_picks(max_price: float = 7.0, limit: int = 10, db: Session =
         max_price: Maximum price in millions (default £7.0m)
         limit: Number of players to return
     """
+    index = _snapshot_index()
+    if index is not None:
+        return [PlayerScore(**e) for e in index.value_picks(max_price, limit)]
+
     # Get latest gameweek
     latest_score = db.query(DBMLPlayerScore).order_by(DBMLPlayerScore.calculated_at.desc()).first()
 
@@ -367,6 +449,58 @@ async def get_value_picks(max_price: float = 7.0, limit: int = 10, db: Session =
     return [PlayerScore.from_orm(score) for score in scores]
 
 
+@router.get("/expected-points", response_model=ExpectedPointsResponse)
+async def get_expected_points(position: Optional[str] = None, limit: int = 50):
+    """
+    Get Stage 2 expected points from the trained points models.
+
+    Predicted for every player once per score snapshot (usually already done
+    by the calculation job) and served from cache.
+
+    Args:
+        position: Optional position filter (GKP, DEF, MID, FWD)
+        limit: Number of players to return, highest expected points first
+    """
+    predictor = get_predictor_service()
+    if not predictor.is_initialized:
+        raise HTTPException(
+            status_code=400,
+            detail="Predictor not initialized. Call POST /calculate first."
+        )
+
+    try:
+        predictions = await asyncio.to_thread(get_points_model_service().predict, predictor)
+    except Exception as e:
+        logger.error(f"Stage 2 points prediction failed: {e}")
+        raise HTTPException(status_code=503, detail=f"Points models unavailable: {e}")
+
+    scores = predictor.snapshot.scores
+    ids = [pid for pid in predictions.points if pid in scores and (not position or scores[pid]['position'] == position.upper())]
+    ids.sort(key=lambda pid: predictions.points[pid], reverse=True)
+
+    return ExpectedPointsResponse(
+        snapshot_version=predictions.snapshot_version,
+        gameweek=predictions.gameweek,
+        model_set=predictions.model_set,
+        weights={name: round(w, 4) for name, w in predictions.weights.items()},
+        skipped=predictions.skipped,
+        timings_ms=predictions.timings_ms,
+        players=[
+            PlayerExpectedPoints(
+                player_id=pid,
+                name=scores[pid]['name'],
+                team=scores[pid]['team'],
+                position=scores[pid]['position'],
+                price=scores[pid]['price'],
+                final_score=scores[pid]['final_score'],
+                expected_points=predictions.points[pid],
+                by_model={name: points[pid] for name, points in predictions.by_model.items()},
+            )
+            for pid in ids[:limit]
+        ],
+    )
+
+
 class AlternativePlayer(BaseModel):
     """Alternative player suggestion with SmartPlay score."""
     player_id: int
@@ -1,5 +1,6 @@
 """Team analysis router."""
 
+import asyncio
 import logging
 import httpx
 from fastapi import APIRouter, HTTPException, Depends, Request
@@ -25,7 +26,7 @@ from models import (
     DecisionQualityResponse,
     SquadAnalysisResponse,
 )
-from services.fpl_service import fpl_service
+from services.fpl_service import fpl_service, gather_or_cancel
 from services.crowd_insights_service import CrowdInsightsService
 from services.transfer_workflow_service import TransferWorkflowService
 from services.decision_quality_service import decision_quality_service
@@ -48,37 +49,24 @@ async def get_team_analysis(team_id: int):
     This is the main endpoint that powers the Team Analysis page.
     """
     try:
-        # Fetch manager info
-        manager = await fpl_service.get_manager_info(team_id)
-
         # Get current gameweek
         current_gw = fpl_service.get_current_gameweek()
         if not current_gw:
             raise HTTPException(status_code=500, detail="Could not determine current gameweek")
 
-        # Try to fetch picks for current gameweek, fallback to manager's last played GW
-        # This handles the case where the deadline for next GW hasn't passed yet
-        # and picks don't exist for the upcoming gameweek
-        picks_gw = current_gw.id
-        try:
-            picks = await fpl_service.get_manager_picks(team_id, picks_gw)
-        except httpx.HTTPStatusError as e:
-            if e.response.status_code == 404 and manager.current_event:
-                # Picks don't exist for next GW, use last played GW
-                picks_gw = manager.current_event
-                picks = await fpl_service.get_manager_picks(team_id, picks_gw)
-            else:
-                raise
-        
-        # Fetch manager's history to get bank/value
+        # Fetch manager info, picks and live GW points concurrently. Picks fall
+        # back to the manager's last played GW when the deadline for the next
+        # GW hasn't passed yet and picks don't exist for it.
+        gw_data = await fpl_service.get_manager_gameweek(team_id, current_gw.id)
+        manager = gw_data.manager
+        picks = gw_data.picks
+        picks_gw = gw_data.gameweek
+        gw_points_map = gw_data.live_points
+
+        # History (bank/value) and leagues come from the same cached team fetch
         history = await fpl_service.get_manager_history(team_id)
         latest_history = history[-1] if history else None
-        
-        # Fetch leagues
         leagues = await fpl_service.get_manager_leagues(team_id)
-
-        # Fetch live GW points for all players (use the same GW as picks)
-        gw_points_map = await fpl_service.get_live_gameweek_points(picks_gw)
         
         # Build squad data
         starting = []
@@ -224,41 +212,46 @@ async def get_rival_intelligence(team_id: int, max_rivals: int = 20):
     Analyzes the user's squad vs their mini-league rivals.
     """
     try:
-        # Get manager info and leagues
-        manager = await fpl_service.get_manager_info(team_id)
-        leagues = await fpl_service.get_manager_leagues(team_id)
-
         # Get current gameweek
         current_gw = fpl_service.get_current_gameweek()
         if not current_gw:
             raise HTTPException(status_code=500, detail="Could not determine current gameweek")
 
-        # Get user's picks with fallback to last played GW
-        user_picks, picks_gw = await fpl_service.get_manager_picks_with_fallback(team_id, current_gw.id)
+        # Get manager info, leagues and the user's picks (with fallback to last played GW) concurrently
+        manager, leagues, (user_picks, picks_gw) = await gather_or_cancel(
+            fpl_service.get_manager_info(team_id),
+            fpl_service.get_manager_leagues(team_id),
+            fpl_service.get_manager_picks_with_fallback(team_id, current_gw.id),
+        )
         user_player_ids = {p.element for p in user_picks}
         
+        # Fetch standings for the top 3 leagues concurrently; one failing league doesn't fail the rest
+        top_leagues = leagues[:3]
+        standings_results = await asyncio.gather(
+            *(fpl_service.get_league_standings(league.id, limit=20) for league in top_leagues),
+            return_exceptions=True,
+        )
+
         # Build league standings
         league_standings: list[LeagueStanding] = []
         all_rival_ids: set[int] = set()
         
-        for league in leagues[:3]:  # Limit to top 3 leagues
-            try:
-                standings = await fpl_service.get_league_standings(league.id, limit=20)
-                
-                # Find user's position and get rivals
-                for entry in standings:
-                    if entry["entry"] != team_id:
-                        all_rival_ids.add(entry["entry"])
-                
-                league_standings.append(LeagueStanding(
-                    league_id=league.id,
-                    league_name=league.name,
-                    rank=league.entry_rank or 0,
-                    total_entries=None,
-                ))
-            except Exception as e:
-                logger.warning(f"Failed to fetch standings for league {league.id}: {e}")
+        for league, standings in zip(top_leagues, standings_results):
+            if isinstance(standings, Exception):
+                logger.warning(f"Failed to fetch standings for league {league.id}: {standings}")
                 continue
+
+            # Find user's position and get rivals
+            for entry in standings:
+                if entry["entry"] != team_id:
+                    all_rival_ids.add(entry["entry"])
+            
+            league_standings.append(LeagueStanding(
+                league_id=league.id,
+                league_name=league.name,
+                rank=league.entry_rank or 0,
+                total_entries=None,
+            ))
         
         # Limit rivals
         rival_ids = list(all_rival_ids)[:max_rivals]
@@ -683,6 +676,11 @@ async def get_player_planner(team_id: int, num_gameweeks: int = 5):
         # Get manager's picks with fallback to last played GW
         picks, picks_gw = await fpl_service.get_manager_picks_with_fallback(team_id, current_gw.id)
 
+        # Fixtures for the whole squad in one lookup
+        fixtures_by_player = await fpl_service.get_players_fixtures(
+            [pick.element for pick in picks], num_gameweeks
+        )
+
         # Build player entries
         players: list[PlayerPlannerEntry] = []
         
@@ -691,8 +689,7 @@ async def get_player_planner(team_id: int, num_gameweeks: int = 5):
             if not player:
                 continue
             
-            # Get fixtures for this player's team
-            fixtures_data = await fpl_service.get_player_fixtures(player.id, num_gameweeks)
+            fixtures_data = fixtures_by_player.get(player.id, [])
             fixtures = [
                 FixtureInfo(
                     gameweek=f["gameweek"],
@@ -750,14 +747,14 @@ async def get_players_fdr(player_ids: str, gameweeks: int = 5):
             return {"playersFDR": []}
         
         results = []
+        fixtures_by_player = await fpl_service.get_players_fixtures(ids, gameweeks)
         
         for player_id in ids:
             player = fpl_service.get_player(player_id)
             if not player:
                 continue
             
-            # Get fixtures for this player
-            fixtures_data = await fpl_service.get_player_fixtures(player_id, gameweeks)
+            fixtures_data = fixtures_by_player.get(player_id)
             
             if not fixtures_data:
                 continue
@@ -917,22 +914,11 @@ async def get_gw_review(team_id: int):
         if not current_gw:
             raise HTTPException(status_code=500, detail="Could not determine current gameweek")
 
-        # Get manager info
-        manager = await fpl_service.get_manager_info(team_id)
-
-        # Try to fetch picks for current gameweek, fallback to manager's last played GW
-        picks_gw = current_gw.id
-        try:
-            picks = await fpl_service.get_manager_picks(team_id, picks_gw)
-        except httpx.HTTPStatusError as e:
-            if e.response.status_code == 404 and manager.current_event:
-                picks_gw = manager.current_event
-                picks = await fpl_service.get_manager_picks(team_id, picks_gw)
-            else:
-                raise
-
-        # Get live GW points
-        gw_points_map = await fpl_service.get_live_gameweek_points(picks_gw)
+        # Get manager info, picks (with fallback to last played GW) and live GW points concurrently
+        gw_data = await fpl_service.get_manager_gameweek(team_id, current_gw.id)
+        manager = gw_data.manager
+        picks = gw_data.picks
+        gw_points_map = gw_data.live_points
 
         # Get manager history to find bench points
         history = await fpl_service.get_manager_history(team_id)
@@ -1023,14 +1009,11 @@ async def get_gw_review_ai(request: Request, team_id: int):
         if not current_gw:
             raise HTTPException(status_code=500, detail="Could not determine current gameweek")
 
-        # Get manager info
-        manager = await fpl_service.get_manager_info(team_id)
-
-        # Get manager's picks with fallback to last played GW
-        picks, picks_gw = await fpl_service.get_manager_picks_with_fallback(team_id, current_gw.id)
-
-        # Get live GW points (use the fallback GW)
-        gw_points_map = await fpl_service.get_live_gameweek_points(picks_gw)
+        # Get manager info, picks (with fallback to last played GW) and live GW points concurrently
+        gw_data = await fpl_service.get_manager_gameweek(team_id, current_gw.id)
+        manager = gw_data.manager
+        picks = gw_data.picks
+        gw_points_map = gw_data.live_points
 
         # Get manager history to find bench points
         history = await fpl_service.get_manager_history(team_id)
@@ -1717,9 +1700,9 @@ async def get_sell_analysis(request: Request, team_id: int):
 
         # Parallel data fetching for performance
         picks_task = fpl_service.get_manager_picks_with_fallback(team_id, current_gw.id)
-        fixtures_task = fpl_service.get_fixtures()
+        fixtures_task = fpl_service.get_fixture_matrix()
 
-        (picks, picks_gw), fixtures = await asyncio.gather(picks_task, fixtures_task)
+        (picks, picks_gw), fixture_matrix = await asyncio.gather(picks_task, fixtures_task)
         squad_player_ids = [p.element for p in picks]
 
         # Get all players data (sync, already cached in memory)
@@ -1735,20 +1718,14 @@ async def get_sell_analysis(request: Request, team_id: int):
                 p = players_dict[pid]
 
                 # Get upcoming fixtures for this player's team
-                team_fixtures = [
-                    f for f in fixtures
-                    if (f.team_h == p.team or f.team_a == p.team) and f.event and f.event > current_gw.id
-                ][:5]
+                team_fixtures = fixture_matrix.upcoming(p.team, current_gw.id + 1, limit=5)
 
                 fixture_info = []
                 total_fdr = 0
                 for f in team_fixtures:
-                    is_home = f.team_h == p.team
-                    opponent_id = f.team_a if is_home else f.team_h
-                    opponent_name = team_names.get(opponent_id, "???")
-                    fdr = f.team_h_difficulty if is_home else f.team_a_difficulty
-                    total_fdr += fdr
-                    fixture_info.append(f"{opponent_name}({'H' if is_home else 'A'})")
+                    opponent_name = team_names.get(f.opponent_id, "???")
+                    total_fdr += f.fdr
+                    fixture_info.append(f"{opponent_name}({'H' if f.is_home else 'A'})")
 
                 squad_players.append({
                     "id": p.id,
@@ -1871,7 +1848,7 @@ async def get_buy_analysis(
                 })
 
         # Get fixtures for building available players list
-        fixtures = await fpl_service.get_fixtures()
+        fixture_matrix = await fpl_service.get_fixture_matrix()
 
         # Build available players list (non-squad players in needed positions)
         available_players = []
@@ -1889,20 +1866,14 @@ async def get_buy_analysis(
                 continue
 
             # Get upcoming fixtures for this player's team
-            team_fixtures = [
-                f for f in fixtures
-                if (f.team_h == p.team or f.team_a == p.team) and f.event and f.event > current_gw.id
-            ][:5]
+            team_fixtures = fixture_matrix.upcoming(p.team, current_gw.id + 1, limit=5)
 
             fixture_info = []
             total_fdr = 0
             for f in team_fixtures:
-                is_home = f.team_h == p.team
-                opponent_id = f.team_a if is_home else f.team_h
-                opponent_name = team_names.get(opponent_id, "???")
-                fdr = f.team_h_difficulty if is_home else f.team_a_difficulty
-                total_fdr += fdr
-                fixture_info.append(f"{opponent_name}({'H' if is_home else 'A'})")
+                opponent_name = team_names.get(f.opponent_id, "???")
+                total_fdr += f.fdr
+                fixture_info.append(f"{opponent_name}({'H' if f.is_home else 'A'})")
 
             available_players.append({
                 "id": p.id,
@@ -0,0 +1,560 @@
+"""
+Caching primitives for SmartPlayFPL.
+
+BoundedCache is a W-TinyLFU style in-process cache:
+- New entries land in a small LRU "window" so bursts of fresh keys are cached
+- Entries leaving the window compete with the main region's LRU victim and are
+  only admitted if they have been requested more often (frequency sketch)
+- Entries expire after a TTL and are purged proactively, not just on read
+- Size is bounded by entry count and (optionally) approximate memory
+
+CacheBackend is a key/value store with TTLs that can be shared between
+worker processes:
+- InProcessCacheBackend: plain dict, per process (default)
+- SQLiteCacheBackend: file-backed, shared by all workers on one host
+- RedisCacheBackend: Redis protocol (Redis, Valkey, KeyDB...), shared across hosts
+"""
+
+import logging
+import pickle
+import sqlite3
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Hashable, Iterator, Optional
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Redis is optional - only needed for CACHE_BACKEND=redis
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+
+def approx_sizeof(obj: Any, _seen: Optional[set] = None) -> int:
+    """Approximate deep memory footprint of an object in bytes."""
+    if _seen is None:
+        _seen = set()
+    obj_id = id(obj)
+    if obj_id in _seen:
+        return 0
+    _seen.add(obj_id)
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, (str, bytes, bytearray, int, float, bool)) or obj is None:
+        return size
+    if isinstance(obj, dict):
+        size += sum(approx_sizeof(k, _seen) + approx_sizeof(v, _seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(approx_sizeof(item, _seen) for item in obj)
+    elif hasattr(obj, "__dict__"):
+        # Dataclasses and pydantic models keep their fields in __dict__
+        size += approx_sizeof(vars(obj), _seen)
+    return size
+
+
+class FrequencySketch:
+    """
+    Count-min sketch of key access frequency with periodic aging.
+
+    Counters saturate at 15 and are halved after every ``sample_size``
+    increments, so the sketch tracks recent popularity rather than all-time.
+    """
+
+    DEPTH = 4
+    MAX_COUNT = 15
+
+    def __init__(self, capacity: int):
+        width = 16
+        while width < capacity * 4:
+            width *= 2
+        self._mask = width - 1
+        self._rows = [[0] * width for _ in range(self.DEPTH)]
+        self._sample_size = max(10 * capacity, 100)
+        self._additions = 0
+
+    def _indexes(self, key: Hashable) -> Iterator[tuple[list[int], int]]:
+        h = hash(key)
+        for i, row in enumerate(self._rows):
+            yield row, hash((h, i)) & self._mask
+
+    def increment(self, key: Hashable) -> None:
+        for row, idx in self._indexes(key):
+            if row[idx] < self.MAX_COUNT:
+                row[idx] += 1
+        self._additions += 1
+        if self._additions >= self._sample_size:
+            self._age()
+
+    def frequency(self, key: Hashable) -> int:
+        return min(row[idx] for row, idx in self._indexes(key))
+
+    def _age(self) -> None:
+        for row in self._rows:
+            for i, count in enumerate(row):
+                row[i] = count >> 1
+        self._additions //= 2
+
+
+@dataclass
+class _Entry:
+    value: Any
+    expires_at: float
+    size: int
+
+
+class BoundedCache:
+    """
+    TTL cache bounded by entry count and approximate memory (W-TinyLFU).
+
+    Usage:
+        cache = BoundedCache("teams", max_entries=1000, ttl=600)
+        cache.set(team_id, data)
+        data = cache.get(team_id)  # None if missing or expired
+    """
+
+    WINDOW_FRACTION = 0.1  # Share of capacity reserved for the admission window
+    PURGE_INTERVAL = 60    # Seconds between proactive expiry sweeps
+
+    def __init__(
+        self,
+        name: str,
+        max_entries: int,
+        ttl: float,
+        max_bytes: Optional[int] = None,
+    ):
+        self.name = name
+        self.max_entries = max(1, max_entries)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+
+        self._window_capacity = max(1, int(self.max_entries * self.WINDOW_FRACTION))
+        self._main_capacity = max(1, self.max_entries - self._window_capacity)
+        self._window: OrderedDict[Hashable, _Entry] = OrderedDict()
+        self._main: OrderedDict[Hashable, _Entry] = OrderedDict()
+        self._sketch = FrequencySketch(self.max_entries)
+        self._bytes = 0
+        self._last_purge = time.time()
+
+        # Statistics
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.rejections = 0
+
+    def __len__(self) -> int:
+        return len(self._window) + len(self._main)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self._peek(key) is not None
+
+    def keys(self) -> list:
+        return list(self._main.keys()) + list(self._window.keys())
+
+    def _segment_of(self, key: Hashable) -> Optional[OrderedDict]:
+        if key in self._window:
+            return self._window
+        if key in self._main:
+            return self._main
+        return None
+
+    def _peek(self, key: Hashable) -> Optional[_Entry]:
+        segment = self._segment_of(key)
+        if segment is None:
+            return None
+        entry = segment[key]
+        if entry.expires_at <= time.time():
+            self._remove(segment, key)
+            self.expirations += 1
+            return None
+        return entry
+
+    def _remove(self, segment: OrderedDict, key: Hashable) -> None:
+        entry = segment.pop(key)
+        self._bytes -= entry.size
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Get a live entry (None if missing or expired) and record the access."""
+        self._sketch.increment(key)
+        entry = self._peek(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._segment_of(key).move_to_end(key)
+        return entry.value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Insert or replace an entry, evicting according to the admission policy."""
+        now = time.time()
+        if now - self._last_purge >= self.PURGE_INTERVAL:
+            self.purge_expired()
+
+        entry = _Entry(value=value, expires_at=now + (ttl or self.ttl), size=approx_sizeof(value))
+        segment = self._segment_of(key)
+        if segment is not None:
+            self._remove(segment, key)
+            segment[key] = entry
+            self._bytes += entry.size
+        else:
+            self._window[key] = entry
+            self._bytes += entry.size
+            if len(self._window) > self._window_capacity:
+                self._promote_from_window()
+        self._enforce_memory_bound()
+
+    def resize(self, key: Hashable) -> None:
+        """Re-estimate an entry's memory after its value was mutated in place."""
+        segment = self._segment_of(key)
+        if segment is None:
+            return
+        entry = segment[key]
+        new_size = approx_sizeof(entry.value)
+        self._bytes += new_size - entry.size
+        entry.size = new_size
+        self._enforce_memory_bound()
+
+    def _promote_from_window(self) -> None:
+        """Move the window's LRU entry into main if it beats main's LRU victim."""
+        candidate_key, candidate = self._window.popitem(last=False)
+        if len(self._main) < self._main_capacity:
+            self._main[candidate_key] = candidate
+            return
+
+        victim_key = next(iter(self._main))
+        if self._sketch.frequency(candidate_key) > self._sketch.frequency(victim_key):
+            self._remove(self._main, victim_key)
+            self.evictions += 1
+            self._main[candidate_key] = candidate
+        else:
+            self._bytes -= candidate.size
+            self.rejections += 1
+
+    def _enforce_memory_bound(self) -> None:
+        if self.max_bytes is None:
+            return
+        while self._bytes > self.max_bytes and len(self) > 1:
+            segment = self._main if self._main else self._window
+            self._remove(segment, next(iter(segment)))
+            self.evictions += 1
+
+    def purge_expired(self) -> int:
+        """Drop all expired entries. Returns the number removed."""
+        now = time.time()
+        removed = 0
+        for segment in (self._window, self._main):
+            for key in [k for k, e in segment.items() if e.expires_at <= now]:
+                self._remove(segment, key)
+                removed += 1
+        self.expirations += removed
+        self._last_purge = now
+        if removed:
+            logger.debug(f"Cache '{self.name}': purged {removed} expired entries")
+        return removed
+
+    def clear(self) -> int:
+        """Remove everything. Returns the number of entries removed."""
+        count = len(self)
+        self._window.clear()
+        self._main.clear()
+        self._bytes = 0
+        return count
+
+    def get_stats(self) -> dict:
+        """Get cache statistics."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self),
+            "max_entries": self.max_entries,
+            "approx_bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "rejections": self.rejections,
+        }
+
+
+# =============================================================================
+# SHARED CACHE BACKENDS
+# =============================================================================
+
+class CacheBackend(ABC):
+    """
+    Key/value store with per-entry TTL.
+
+    Shared backends serialize values with pickle, so only store data this
+    application produced (never untrusted input) and keep values picklable.
+    """
+
+    name: str = "base"
+    shared: bool = False  # True if other worker processes see the same data
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Any]:
+        """Get a value, or None if missing or expired."""
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        """Store a value for ``ttl`` seconds."""
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Remove a single key."""
+
+    @abstractmethod
+    def delete_prefix(self, prefix: str) -> int:
+        """Remove all keys starting with ``prefix``. Returns the number removed."""
+
+    @abstractmethod
+    def count(self, prefix: str = "", include_expired: bool = False) -> int:
+        """Count keys starting with ``prefix``."""
+
+    def clear(self) -> int:
+        """Remove everything stored by this application."""
+        return self.delete_prefix("")
+
+    def get_stats(self) -> dict:
+        """Get backend statistics."""
+        return {"backend": self.name, "shared": self.shared, "entries": self.count()}
+
+
+@dataclass
+class CacheEntry:
+    """A cached value with expiry timestamp."""
+    data: Any
+    expires_at: float
+    created_at: float
+
+
+class InProcessCacheBackend(CacheBackend):
+    """Per-process dict backend with oldest-first eviction when full."""
+
+    name = "memory"
+    shared = False
+
+    def __init__(self, max_entries: Optional[int] = None, evict_batch: int = 50):
+        self._store: dict[str, CacheEntry] = {}
+        self._max_entries = max_entries
+        self._evict_batch = evict_batch
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._store.get(key)
+        if entry is None:
+            return None
+        if time.time() > entry.expires_at:
+            del self._store[key]
+            return None
+        return entry.data
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        if self._max_entries and key not in self._store and len(self._store) >= self._max_entries:
+            self._evict()
+        now = time.time()
+        self._store[key] = CacheEntry(data=value, expires_at=now + ttl, created_at=now)
+
+    def _evict(self) -> None:
+        """Drop expired entries, then the oldest ones if still full."""
+        now = time.time()
+        for key in [k for k, e in self._store.items() if e.expires_at < now]:
+            del self._store[key]
+        if len(self._store) >= self._max_entries:
+            oldest = sorted(self._store.items(), key=lambda x: x[1].created_at)[:self._evict_batch]
+            for key, _ in oldest:
+                del self._store[key]
+            logger.debug(f"Evicted {len(oldest)} oldest cache entries")
+
+    def delete(self, key: str) -> None:
+        self._store.pop(key, None)
+
+    def delete_prefix(self, prefix: str) -> int:
+        keys = [k for k in self._store if k.startswith(prefix)]
+        for key in keys:
+            del self._store[key]
+        return len(keys)
+
+    def count(self, prefix: str = "", include_expired: bool = False) -> int:
+        now = time.time()
+        return sum(
+            1 for k, e in self._store.items()
+            if k.startswith(prefix) and (include_expired or e.expires_at > now)
+        )
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """
+    SQLite file backend shared by all worker processes on the same host.
+
+    Uses WAL mode so readers never block the writer, and one connection per
+    thread. Expired rows are purged periodically on write.
+    """
+
+    name = "sqlite"
+    shared = True
+
+    PURGE_EVERY = 200  # Writes between expired-row sweeps
+
+    def __init__(self, path: str):
+        self._path = path
+        self._local = threading.local()
+        self._writes = 0
+        self._conn()  # Fail fast if the file can't be opened
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self._path, timeout=5.0, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache_entries ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _prefix_range(prefix: str) -> tuple[str, str]:
+        return prefix, prefix + "\uffff"
+
+    def get(self, key: str) -> Optional[Any]:
+        row = self._conn().execute(
+            "SELECT value FROM cache_entries WHERE key = ? AND expires_at > ?",
+            (key, time.time()),
+        ).fetchone()
+        return pickle.loads(row[0]) if row else None
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO cache_entries (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, blob, time.time() + ttl),
+        )
+        self._writes += 1
+        if self._writes % self.PURGE_EVERY == 0:
+            conn.execute("DELETE FROM cache_entries WHERE expires_at <= ?", (time.time(),))
+
+    def delete(self, key: str) -> None:
+        self._conn().execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+
+    def delete_prefix(self, prefix: str) -> int:
+        cursor = self._conn().execute(
+            "DELETE FROM cache_entries WHERE key >= ? AND key < ?", self._prefix_range(prefix)
+        )
+        return cursor.rowcount
+
+    def count(self, prefix: str = "", include_expired: bool = False) -> int:
+        low, high = self._prefix_range(prefix)
+        if include_expired:
+            row = self._conn().execute(
+                "SELECT COUNT(*) FROM cache_entries WHERE key >= ? AND key < ?", (low, high)
+            ).fetchone()
+        else:
+            row = self._conn().execute(
+                "SELECT COUNT(*) FROM cache_entries WHERE key >= ? AND key < ? AND expires_at > ?",
+                (low, high, time.time()),
+            ).fetchone()
+        return row[0]
+
+    def get_stats(self) -> dict:
+        return {**super().get_stats(), "path": self._path}
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Redis-protocol backend shared across workers and hosts.
+
+    All keys are namespaced so clear() never touches other applications'
+    data. Expiry is handled by the server.
+    """
+
+    name = "redis"
+    shared = True
+
+    NAMESPACE = "smartplayfpl:"
+
+    def __init__(self, url: str):
+        if not REDIS_AVAILABLE:
+            raise RuntimeError("redis package is not installed")
+        self._client = redis.Redis.from_url(url, socket_timeout=2.0, socket_connect_timeout=2.0)
+        self._client.ping()  # Fail fast if the server is unreachable
+
+    def _key(self, key: str) -> str:
+        return self.NAMESPACE + key
+
+    def _scan(self, prefix: str) -> Iterator[bytes]:
+        pattern = self._key(prefix).replace("*", "\\*").replace("?", "\\?").replace("[", "\\[")
+        return self._client.scan_iter(match=pattern + "*", count=500)
+
+    def get(self, key: str) -> Optional[Any]:
+        blob = self._client.get(self._key(key))
+        return pickle.loads(blob) if blob is not None else None
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        self._client.set(self._key(key), blob, px=max(1, int(ttl * 1000)))
+
+    def delete(self, key: str) -> None:
+        self._client.delete(self._key(key))
+
+    def delete_prefix(self, prefix: str) -> int:
+        removed = 0
+        batch = []
+        for key in self._scan(prefix):
+            batch.append(key)
+            if len(batch) >= 500:
+                removed += self._client.delete(*batch)
+                batch = []
+        if batch:
+            removed += self._client.delete(*batch)
+        return removed
+
+    def count(self, prefix: str = "", include_expired: bool = False) -> int:
+        return sum(1 for _ in self._scan(prefix))
+
+
+def create_cache_backend(kind: Optional[str] = None) -> CacheBackend:
+    """
+    Create the cache backend selected by CACHE_BACKEND.
+
+    Falls back to the in-process backend (with a warning) if the shared
+    backend can't be initialized, so a misconfigured cache never takes the
+    API down.
+    """
+    kind = (kind or settings.CACHE_BACKEND).lower()
+    try:
+        if kind == "sqlite":
+            return SQLiteCacheBackend(settings.CACHE_SQLITE_PATH)
+        if kind == "redis":
+            return RedisCacheBackend(settings.CACHE_REDIS_URL)
+    except Exception as e:
+        logger.warning(f"Cache backend '{kind}' unavailable ({e}) - falling back to in-process cache")
+        return InProcessCacheBackend()
+
+    if kind != "memory":
+        logger.warning(f"Unknown CACHE_BACKEND '{kind}' - using in-process cache")
+    return InProcessCacheBackend()
+
+
+_cache_backend: Optional[CacheBackend] = None
+
+
+def get_cache_backend() -> CacheBackend:
+    """Get the process-wide cache backend (created on first use)."""
+    global _cache_backend
+    if _cache_backend is None:
+        _cache_backend = create_cache_backend()
+        logger.info(f"Cache backend: {_cache_backend.name} (shared={_cache_backend.shared})")
+    return _cache_backend
@@ -3,13 +3,12 @@
 import hashlib
 import json
 import logging
-import time
 from typing import Optional, Any
-from dataclasses import dataclass
 
 import anthropic
 
 from config import settings
+from services.cache import CacheBackend, InProcessCacheBackend, get_cache_backend
 from models import (
     Player,
     CrowdInsightPlayer,
@@ -114,17 +113,13 @@ def _sanitize_ai_text_field(text: str) -> str:
 # RESPONSE CACHE WITH TTL
 # =============================================================================
 
-@dataclass
-class CacheEntry:
-    """A cached response with expiry timestamp."""
-    data: Any
-    expires_at: float
-    created_at: float
-
-
 class ClaudeResponseCache:
     """
-    In-memory cache for Claude API responses with TTL expiry.
+    Cache for Claude API responses with TTL expiry.
+
+    Storage is delegated to a CacheBackend: the in-process backend by
+    default, or a shared backend (CACHE_BACKEND=sqlite/redis) so every worker
+    reuses the same AI responses.
 
     Cache strategy:
     - crowd_insights: 30 min TTL (market data changes slowly)
@@ -143,9 +138,14 @@ class ClaudeResponseCache:
         "gw_performance": 60 * 60,      # 60 minutes
     }
 
-    def __init__(self, max_entries: int = 500):
-        self._cache: dict[str, CacheEntry] = {}
+    KEY_PREFIX = "claude:"
+
+    def __init__(self, max_entries: int = 500, backend: Optional[CacheBackend] = None):
         self._max_entries = max_entries
+        if backend is None:
+            shared = get_cache_backend()
+            backend = shared if shared.shared else InProcessCacheBackend(max_entries=max_entries)
+        self._backend = backend
         self._hits = 0
         self._misses = 0
         self._api_calls_saved = 0
@@ -157,100 +157,66 @@ class ClaudeResponseCache:
         # Create hash of the parameters to keep key length manageable
         param_str = json.dumps(sorted_items, sort_keys=True, default=str)
         param_hash = hashlib.md5(param_str.encode()).hexdigest()[:16]
-        return f"{endpoint}:{param_hash}"
+        return f"{self.KEY_PREFIX}{endpoint}:{param_hash}"
 
     def get(self, endpoint: str, **kwargs) -> Optional[Any]:
         """Retrieve cached response if valid."""
         key = self._generate_key(endpoint, **kwargs)
-        entry = self._cache.get(key)
-
-        if entry is None:
-            self._misses += 1
-            return None
+        try:
+            data = self._backend.get(key)
+        except Exception as e:
+            logger.warning(f"Cache backend read failed for {endpoint}: {e}")
+            data = None
 
-        # Check expiry
-        if time.time() > entry.expires_at:
-            del self._cache[key]
+        if data is None:
             self._misses += 1
             return None
 
         self._hits += 1
         self._api_calls_saved += 1
-        logger.info(f"Cache HIT for {endpoint} (age: {int(time.time() - entry.created_at)}s, saved API call)")
-        return entry.data
+        logger.info(f"Cache HIT for {endpoint} (saved API call)")
+        return data
 
     def set(self, endpoint: str, data: Any, **kwargs) -> None:
         """Store response in cache with TTL."""
-        # Evict expired entries if cache is full
-        if len(self._cache) >= self._max_entries:
-            self._evict_expired()
-
-        # If still full, evict oldest entries
-        if len(self._cache) >= self._max_entries:
-            self._evict_oldest(count=50)
-
         key = self._generate_key(endpoint, **kwargs)
         ttl = self.TTL_CONFIG.get(endpoint, 30 * 60)  # Default 30 min
-        now = time.time()
-
-        self._cache[key] = CacheEntry(
-            data=data,
-            expires_at=now + ttl,
-            created_at=now,
-        )
+        try:
+            self._backend.set(key, data, ttl)
+        except Exception as e:
+            logger.warning(f"Cache backend write failed for {endpoint}: {e}")
+            return
         logger.debug(f"Cached {endpoint} response (TTL: {ttl//60} min)")
 
-    def _evict_expired(self) -> int:
-        """Remove all expired entries."""
-        now = time.time()
-        expired_keys = [k for k, v in self._cache.items() if v.expires_at < now]
-        for key in expired_keys:
-            del self._cache[key]
-        if expired_keys:
-            logger.debug(f"Evicted {len(expired_keys)} expired cache entries")
-        return len(expired_keys)
-
-    def _evict_oldest(self, count: int = 50) -> None:
-        """Evict oldest entries to make room."""
-        sorted_entries = sorted(
-            self._cache.items(),
-            key=lambda x: x[1].created_at
-        )
-        for key, _ in sorted_entries[:count]:
-            del self._cache[key]
-        logger.debug(f"Evicted {count} oldest cache entries")
-
     def invalidate(self, endpoint: Optional[str] = None) -> int:
         """Invalidate cache entries. If endpoint is None, invalidate all."""
         if endpoint is None:
-            count = len(self._cache)
-            self._cache.clear()
+            count = self._backend.delete_prefix(self.KEY_PREFIX)
             logger.info(f"Invalidated all {count} cache entries")
             return count
 
         # Invalidate specific endpoint
-        keys_to_remove = [k for k in self._cache.keys() if k.startswith(f"{endpoint}:")]
-        for key in keys_to_remove:
-            del self._cache[key]
-        logger.info(f"Invalidated {len(keys_to_remove)} cache entries for {endpoint}")
-        return len(keys_to_remove)
+        count = self._backend.delete_prefix(f"{self.KEY_PREFIX}{endpoint}:")
+        logger.info(f"Invalidated {count} cache entries for {endpoint}")
+        return count
 
     def get_stats(self) -> dict:
         """Get cache statistics."""
-        now = time.time()
-        valid_entries = sum(1 for e in self._cache.values() if e.expires_at > now)
+        total_entries = self._backend.count(self.KEY_PREFIX, include_expired=True)
+        valid_entries = self._backend.count(self.KEY_PREFIX)
         total_requests = self._hits + self._misses
         hit_rate = (self._hits / total_requests * 100) if total_requests > 0 else 0
 
         return {
-            "total_entries": len(self._cache),
+            "total_entries": total_entries,
             "valid_entries": valid_entries,
-            "expired_entries": len(self._cache) - valid_entries,
+            "expired_entries": total_entries - valid_entries,
             "hits": self._hits,
             "misses": self._misses,
             "hit_rate_pct": round(hit_rate, 1),
             "api_calls_saved": self._api_calls_saved,
             "max_entries": self._max_entries,
+            "backend": self._backend.name,
         }
 
 
@@ -0,0 +1,332 @@
+"""
+Per-gameweek feature store.
+
+Every model feature is computed for all (player, gameweek) rows at once, with
+group-wise shifts and rolling windows over each player's history, so the
+training matrix and the rows served online come from the same code:
+
+- build_features() takes gameweek history (element-summary rows, or the
+  cleaned training CSV) and, optionally, one upcoming row per player with the
+  next fixture. A row only sees earlier rows of the same player (shift(1)
+  before every window, as in ml/fpl_ml_pipeline.ipynb), so a history row is a
+  training example and the upcoming row is exactly what the model is served
+  for the next gameweek.
+- FeatureStore persists a built frame column by column - Parquet when pyarrow
+  is installed, else one .npy file per column, memory-mapped on load - and
+  keeps the online frame for the current history and fixtures cached.
+
+value_millions and selected_pct keep the units the shipped Stage 1/2 models
+were trained on: price in £m / 10 and selections / 100.
+"""
+
+import json
+import logging
+import os
+import shutil
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+POSITIONS = ('GKP', 'DEF', 'MID', 'FWD')
+DEFAULT_FDR = 3.0
+
+# Stage 1 features (P(plays)), in the order the models were trained with
+STAGE1_FEATURES = [
+    'games_so_far', 'is_DEF', 'is_FWD', 'is_GKP', 'is_MID', 'is_home',
+    'mins_per_game', 'minutes_avg_last5', 'minutes_lag1', 'minutes_lag2',
+    'nailedness_score', 'selected_pct', 'start_rate_overall',
+    'starts_lag1', 'starts_lag2', 'starts_rate_last3', 'starts_rate_last5',
+    'value_millions'
+]
+
+# Stage 2 features (points)
+STAGE2_FEATURES = [
+    'games_so_far', 'is_DEF', 'is_FWD', 'is_GKP', 'is_MID', 'is_home',
+    'mins_per_game', 'minutes_avg_last5', 'nailedness_score',
+    'selected_pct', 'start_rate_overall', 'value_millions',
+    'points_avg_last5', 'bps_avg_last5', 'ict_index_avg_last5',
+    'expected_goals_avg_last5', 'expected_assists_avg_last5'
+]
+
+# Column -> lags of it (value from N rows ago)
+LAGS = {'points': (1, 2), 'minutes': (1, 2), 'starts': (1, 2)}
+
+# Columns averaged over the previous 3 and 5 rows
+ROLLING_COLUMNS = ('points', 'minutes', 'bps', 'ict_index', 'expected_goals', 'expected_assists', 'starts')
+ROLLING_WINDOWS = (3, 5)
+
+# Source column aliases: element-summary history / cleaned training data
+ALIASES = {
+    'player_id': ('player_id', 'element'),
+    'gameweek': ('gameweek', 'round'),
+    'points': ('points', 'total_points'),
+    'is_home': ('is_home', 'was_home'),
+}
+NUMERIC_COLUMNS = ('minutes', 'starts', 'bps', 'ict_index', 'expected_goals', 'expected_assists', 'selected')
+
+
+def _normalize(frame: pd.DataFrame) -> pd.DataFrame:
+    """Canonical column names and types; price in £m (FPL value is in tenths)."""
+    df = pd.DataFrame(index=frame.index)
+    for name, candidates in ALIASES.items():
+        source = next((c for c in candidates if c in frame), None)
+        df[name] = frame[source] if source is not None else np.nan
+    for name in NUMERIC_COLUMNS:
+        df[name] = pd.to_numeric(frame[name], errors='coerce') if name in frame else np.nan
+
+    if 'price' in frame:
+        df['price'] = pd.to_numeric(frame['price'], errors='coerce')
+    elif 'value' in frame:
+        df['price'] = pd.to_numeric(frame['value'], errors='coerce') / 10
+    else:
+        df['price'] = np.nan
+
+    for name in ('position', 'team', 'opponent_team', 'fdr', 'kickoff_time', 'fixture'):
+        df[name] = frame[name] if name in frame else np.nan
+    df['points'] = pd.to_numeric(df['points'], errors='coerce')
+    df['is_home'] = df['is_home'].astype(float).fillna(0).astype(int)
+    return df
+
+
+def build_features(
+    history: pd.DataFrame,
+    upcoming: Optional[pd.DataFrame] = None,
+    team_fdr: Optional[Mapping[int, float]] = None,
+) -> pd.DataFrame:
+    """
+    Compute every feature for all (player, gameweek) rows.
+
+    Args:
+        history: Gameweek rows (player_id/element, gameweek/round, minutes,
+            starts, points/total_points, bps, ict_index, expected_goals,
+            expected_assists, value or price, selected, was_home/is_home,
+            opponent_team, optional position and fdr)
+        upcoming: Optional next-fixture row per player (player_id, is_home,
+            fdr, price, position; selected defaults to the last known value)
+        team_fdr: Opponent team id -> FDR for history rows without an fdr
+
+    Returns:
+        One row per input row, ordered by player and gameweek and indexed
+        by the row's position in history (upcoming rows after it), with the
+        feature columns, targets (target_played, target_points; NaN on
+        upcoming rows) and an is_upcoming flag
+    """
+    df = _normalize(history).reset_index(drop=True)
+    df['is_upcoming'] = False
+    if upcoming is not None and len(upcoming):
+        next_rows = _normalize(upcoming)
+        last_gw = pd.to_numeric(df['gameweek'], errors='coerce').max()
+        next_rows['gameweek'] = (0 if pd.isna(last_gw) else last_gw) + 1
+        next_rows['is_upcoming'] = True
+        df = pd.concat([df, next_rows], ignore_index=True)
+
+    df = df.dropna(subset=['player_id', 'gameweek'])
+    df['player_id'] = df['player_id'].astype(int)
+    df['gameweek'] = df['gameweek'].astype(int)
+    # Double gameweeks: both fixtures in kickoff order, the upcoming row last
+    df = df.sort_values(['player_id', 'gameweek', 'is_upcoming', 'kickoff_time', 'fixture'], kind='mergesort')
+
+    opponent_fdr = df['opponent_team'].map(dict(team_fdr or {}))
+    df['fdr'] = pd.to_numeric(df['fdr'], errors='coerce').fillna(opponent_fdr).fillna(DEFAULT_FDR)
+
+    by_player = df.groupby('player_id', sort=False)
+    # Selections are only known up to the last finished gameweek
+    df['selected'] = by_player['selected'].ffill()
+
+    out = {}
+    for column, lags in LAGS.items():
+        for lag in lags:
+            out[f'{column}_lag{lag}'] = by_player[column].shift(lag).fillna(0)
+
+    # Mean of the previous N rows (rolling(N, min_periods=1) after shift(1)),
+    # summed from group-wise shifts: the windows are short, and pandas'
+    # group-wise rolling builds its window bounds one player at a time
+    columns = list(ROLLING_COLUMNS)
+    total = np.zeros((len(df), len(columns)))
+    count = np.zeros((len(df), len(columns)))
+    for lag in range(1, max(ROLLING_WINDOWS) + 1):
+        shifted = by_player[columns].shift(lag).to_numpy(dtype=float)
+        known = ~np.isnan(shifted)
+        total += np.where(known, shifted, 0.0)
+        count += known
+        if lag in ROLLING_WINDOWS:
+            with np.errstate(invalid='ignore', divide='ignore'):
+                means = np.where(count > 0, total / count, 0.0)
+            for i, column in enumerate(columns):
+                out[f'{column}_avg_last{lag}'] = pd.Series(means[:, i], index=df.index)
+            out[f'starts_rate_last{lag}'] = out[f'starts_avg_last{lag}']
+
+    games_so_far = by_player.cumcount()
+    starts_so_far = by_player['starts'].shift(1).groupby(df['player_id']).cumsum().fillna(0)
+    cumulative_mins = by_player['minutes'].shift(1).groupby(df['player_id']).cumsum().fillna(0)
+    out['games_so_far'] = games_so_far
+    out['starts_so_far'] = starts_so_far
+    out['cumulative_mins'] = cumulative_mins
+    out['start_rate_overall'] = (starts_so_far / (games_so_far + 1)).fillna(0)
+    out['mins_per_game'] = (cumulative_mins / (games_so_far + 1)).fillna(0)
+
+    # Nailedness: start rate plus minutes and price ranked within the gameweek
+    mins_rank = out['mins_per_game'].groupby(df['gameweek']).rank(pct=True)
+    value_rank = df['price'].groupby(df['gameweek']).rank(pct=True)
+    out['nailedness_score'] = (
+        0.5 * out['start_rate_overall'] + 0.3 * mins_rank + 0.2 * value_rank
+    ).fillna(0)
+
+    for position in POSITIONS:
+        out[f'is_{position}'] = (df['position'] == position).astype(int)
+    out['is_home'] = df['is_home']
+    out['fdr'] = df['fdr']
+    out['value_millions'] = df['price'] / 10
+    out['selected_pct'] = df['selected'].fillna(0) / 100
+
+    features = pd.DataFrame(out, index=df.index)
+    targets = pd.DataFrame({
+        'target_played': (df['minutes'] > 0).astype(float).where(~df['is_upcoming']),
+        'target_points': df['points'].where(~df['is_upcoming']),
+    })
+    keys = df[['player_id', 'gameweek', 'is_upcoming', 'position', 'team', 'opponent_team', 'minutes', 'points']]
+    return pd.concat([keys, features, targets], axis=1)
+
+
+def latest_rows(frame: pd.DataFrame, player_ids: Optional[Sequence[int]] = None) -> pd.DataFrame:
+    """The last row of each player (the upcoming one when present), indexed by player_id."""
+    latest = frame.groupby('player_id', sort=False).tail(1).set_index('player_id')
+    if player_ids is not None:
+        latest = latest.reindex(list(player_ids)).dropna(subset=['gameweek'])
+    return latest
+
+
+class FeatureStore:
+    """Built feature frames: columnar persistence and the cached online frame."""
+
+    DEFAULT_PATH = os.path.join(os.path.dirname(__file__), "..", "ml", "data", "feature_store")
+    PARQUET_FILE = "features.parquet"
+    META_FILE = "meta.json"
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = os.path.realpath(path or self.DEFAULT_PATH)
+        self._lock = threading.Lock()
+        self._online_key = None
+        self._online_history: Optional[pd.DataFrame] = None
+        self._online_frame: Optional[pd.DataFrame] = None
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def save(self, frame: pd.DataFrame, path: Optional[str] = None, source: str = "") -> Dict[str, Any]:
+        """
+        Write a built frame to a directory, replacing what was there.
+
+        Returns:
+            The written metadata
+        """
+        path = path or self.path
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        os.makedirs(path)
+
+        if PYARROW_AVAILABLE:
+            storage = "parquet"
+            frame.to_parquet(os.path.join(path, self.PARQUET_FILE), index=False)
+        else:
+            storage = "npy"
+            for column in frame.columns:
+                values = frame[column].to_numpy()
+                if values.dtype == object:
+                    # Strings and mixed columns: fixed-width unicode, NaN as ""
+                    values = frame[column].fillna("").astype(str).to_numpy(dtype=str)
+                np.save(os.path.join(path, f"{column}.npy"), np.ascontiguousarray(values), allow_pickle=False)
+
+        meta = {
+            "format": FORMAT_VERSION,
+            "storage": storage,
+            "columns": list(frame.columns),
+            "n_rows": len(frame),
+            "n_players": int(frame['player_id'].nunique()),
+            "gameweeks": [int(frame['gameweek'].min()), int(frame['gameweek'].max())] if len(frame) else [],
+            "source": source,
+            "built_at": datetime.utcnow().isoformat(),
+        }
+        with open(os.path.join(path, self.META_FILE), "w") as f:
+            json.dump(meta, f, indent=2)
+        logger.info(f"Saved feature store ({len(frame)} rows, {storage}) to {path}")
+        return meta
+
+    def load(self, path: Optional[str] = None, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Read a saved frame, optionally only some of its columns."""
+        path = path or self.path
+        with open(os.path.join(path, self.META_FILE)) as f:
+            meta = json.load(f)
+        if meta.get("format") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported feature store format: {meta.get('format')}")
+
+        columns = columns or meta["columns"]
+        if meta["storage"] == "parquet":
+            if not PYARROW_AVAILABLE:
+                raise ImportError("pyarrow is required to read a Parquet feature store")
+            return pd.read_parquet(os.path.join(path, self.PARQUET_FILE), columns=columns)
+
+        data = {}
+        for column in columns:
+            values = np.load(os.path.join(path, f"{column}.npy"), mmap_mode="r", allow_pickle=False)
+            data[column] = values.astype(object) if values.dtype.kind == "U" else values
+        return pd.DataFrame(data)
+
+    def training_matrix(self, features: Sequence[str], target: str, path: Optional[str] = None) -> pd.DataFrame:
+        """Saved history rows with the given features and target (no upcoming rows)."""
+        frame = self.load(path, columns=['player_id', 'gameweek', 'is_upcoming', 'minutes', *features, target])
+        return frame[~frame['is_upcoming'].astype(bool)].reset_index(drop=True)
+
+    # ------------------------------------------------------------------
+    # Online
+    # ------------------------------------------------------------------
+
+    def online(
+        self,
+        history: pd.DataFrame,
+        upcoming: pd.DataFrame,
+        team_fdr: Optional[Mapping[int, float]] = None,
+    ) -> pd.DataFrame:
+        """
+        Latest feature row per player for the next gameweek.
+
+        Rebuilt only when the history object or the upcoming fixtures change;
+        history DataFrames are replaced, never mutated, when they refresh.
+        """
+        key = (
+            pd.util.hash_pandas_object(upcoming, index=False).sum(),
+            tuple(sorted((team_fdr or {}).items())),
+        )
+        with self._lock:
+            if self._online_frame is not None and self._online_history is history and self._online_key == key:
+                return self._online_frame
+
+        frame = latest_rows(build_features(history, upcoming, team_fdr))
+        with self._lock:
+            self._online_history, self._online_key, self._online_frame = history, key, frame
+        return frame
+
+
+# Singleton instance
+_feature_store: Optional[FeatureStore] = None
+
+
+def get_feature_store() -> FeatureStore:
+    """Get the singleton feature store."""
+    global _feature_store
+    if _feature_store is None:
+        _feature_store = FeatureStore()
+    return _feature_store
@@ -0,0 +1,198 @@
+"""
+Team x gameweek fixture difficulty matrix.
+
+Built once per fixtures refresh (FPLService._set_fixtures) and shared by every
+service that looks at fixture difficulty, so they all read the same numbers
+instead of each re-scanning the fixture list.
+
+The dense arrays are indexed [team row, gameweek, slot]: the gameweek axis is
+the gameweek number itself (index 0 is unused) and a team's fixtures within a
+gameweek fill slots in kickoff order. An FDR of 0 marks an empty slot, so a
+gameweek with no filled slot is a blank and one with two or more a double.
+"""
+
+import bisect
+from dataclasses import dataclass, field
+from typing import Iterable, Optional, Sequence
+
+import numpy as np
+
+from models import Fixture
+
+DEFAULT_FDR = 3
+
+# Gameweeks behind the short-term team FDR used for squad building and predictions
+FDR_WINDOW_GAMEWEEKS = 3
+
+
+@dataclass(frozen=True)
+class TeamFixture:
+    """One fixture from a team's point of view."""
+    gameweek: int
+    fixture_id: int
+    opponent_id: int
+    is_home: bool
+    fdr: int
+    finished: bool
+
+
+@dataclass
+class FixtureMatrix:
+    """Dense team x gameweek grid of fixtures with window queries."""
+    team_ids: list[int] = field(default_factory=list)
+    num_gameweeks: int = 0
+    fdr: np.ndarray = field(default_factory=lambda: np.zeros((0, 1, 1), dtype=np.int8))
+    is_home: np.ndarray = field(default_factory=lambda: np.zeros((0, 1, 1), dtype=bool))
+    opponent: np.ndarray = field(default_factory=lambda: np.zeros((0, 1, 1), dtype=np.int16))
+    finished: np.ndarray = field(default_factory=lambda: np.zeros((0, 1, 1), dtype=bool))
+    counts: np.ndarray = field(default_factory=lambda: np.zeros((0, 1), dtype=np.int8))
+    # Per-team fixture lists in gameweek order, for cheap "next N" lookups
+    _rows: dict[int, int] = field(default_factory=dict)
+    _by_team: dict[int, list[TeamFixture]] = field(default_factory=dict)
+    _team_events: dict[int, list[int]] = field(default_factory=dict)
+
+    @classmethod
+    def build(cls, fixtures: Iterable[Fixture]) -> "FixtureMatrix":
+        """Build the matrix from fixtures; unscheduled fixtures (no gameweek) are skipped."""
+        # Stable sort keeps API (kickoff) order within a double gameweek
+        scheduled = sorted((f for f in fixtures if f.event), key=lambda f: f.event)
+        if not scheduled:
+            return cls()
+
+        by_team: dict[int, list[TeamFixture]] = {}
+        for f in scheduled:
+            for team_id, opponent_id, is_home, fdr in (
+                (f.team_h, f.team_a, True, f.team_h_difficulty),
+                (f.team_a, f.team_h, False, f.team_a_difficulty),
+            ):
+                by_team.setdefault(team_id, []).append(TeamFixture(
+                    gameweek=f.event,
+                    fixture_id=f.id,
+                    opponent_id=opponent_id,
+                    is_home=is_home,
+                    fdr=fdr or DEFAULT_FDR,
+                    finished=bool(f.finished),
+                ))
+
+        team_ids = sorted(by_team)
+        num_gameweeks = max(f.event for f in scheduled)
+        slots = max(
+            sum(1 for tf in team_fixtures if tf.gameweek == gw)
+            for team_fixtures in by_team.values()
+            for gw in {tf.gameweek for tf in team_fixtures}
+        )
+        shape = (len(team_ids), num_gameweeks + 1, slots)
+        matrix = cls(
+            team_ids=team_ids,
+            num_gameweeks=num_gameweeks,
+            fdr=np.zeros(shape, dtype=np.int8),
+            is_home=np.zeros(shape, dtype=bool),
+            opponent=np.zeros(shape, dtype=np.int16),
+            finished=np.zeros(shape, dtype=bool),
+            counts=np.zeros(shape[:2], dtype=np.int8),
+            _rows={team_id: row for row, team_id in enumerate(team_ids)},
+            _by_team=by_team,
+            _team_events={team_id: [tf.gameweek for tf in tfs] for team_id, tfs in by_team.items()},
+        )
+        for team_id, team_fixtures in by_team.items():
+            row = matrix._rows[team_id]
+            for tf in team_fixtures:
+                slot = matrix.counts[row, tf.gameweek]
+                matrix.fdr[row, tf.gameweek, slot] = tf.fdr
+                matrix.is_home[row, tf.gameweek, slot] = tf.is_home
+                matrix.opponent[row, tf.gameweek, slot] = tf.opponent_id
+                matrix.finished[row, tf.gameweek, slot] = tf.finished
+                matrix.counts[row, tf.gameweek] += 1
+        return matrix
+
+    # ------------------------------------------------------------------
+    # Per-team lookups
+    # ------------------------------------------------------------------
+
+    def upcoming(
+        self,
+        team_id: int,
+        start_gw: int,
+        num_gameweeks: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> list[TeamFixture]:
+        """
+        A team's fixtures from ``start_gw`` on, in gameweek order.
+
+        Args:
+            team_id: Team ID
+            start_gw: First gameweek to include
+            num_gameweeks: Gameweeks to cover (default: rest of the season)
+            limit: Maximum number of fixtures to return
+        """
+        events = self._team_events.get(team_id)
+        if not events:
+            return []
+        start = bisect.bisect_left(events, start_gw)
+        end = len(events) if num_gameweeks is None else bisect.bisect_left(events, start_gw + num_gameweeks)
+        if limit is not None:
+            end = min(end, start + limit)
+        return self._by_team[team_id][start:end]
+
+    def fixture_count(self, team_id: int, gameweek: int) -> int:
+        """Number of fixtures a team has in a gameweek (0 = blank, 2+ = double)."""
+        row = self._rows.get(team_id)
+        if row is None or not 0 < gameweek <= self.num_gameweeks:
+            return 0
+        return int(self.counts[row, gameweek])
+
+    def is_blank(self, team_id: int, gameweek: int) -> bool:
+        return self.fixture_count(team_id, gameweek) == 0
+
+    def is_double(self, team_id: int, gameweek: int) -> bool:
+        return self.fixture_count(team_id, gameweek) >= 2
+
+    # ------------------------------------------------------------------
+    # Window queries (all teams at once)
+    # ------------------------------------------------------------------
+
+    def weighted_fdr(
+        self,
+        start_gw: int,
+        weights: Sequence[float],
+        finished: Optional[bool] = None,
+    ) -> dict[int, float]:
+        """
+        Weighted average FDR per team over the gameweeks starting at ``start_gw``.
+
+        Every fixture in gameweek ``start_gw + i`` gets ``weights[i]``, so a
+        double gameweek counts twice and a blank not at all. Teams with no
+        fixture in the window are left out.
+
+        Args:
+            start_gw: First gameweek of the window
+            weights: One weight per gameweek in the window
+            finished: Only finished (True) or unfinished (False) fixtures; None for all
+        """
+        start = max(start_gw, 1)
+        end = min(start_gw + len(weights), self.num_gameweeks + 1)
+        if end <= start or not self.team_ids:
+            return {}
+
+        fdr = self.fdr[:, start:end, :].astype(float)
+        mask = fdr > 0
+        if finished is not None:
+            mask &= self.finished[:, start:end, :] == finished
+        w = np.asarray(weights, dtype=float)[start - start_gw:end - start_gw][None, :, None] * mask
+        total_weight = w.sum(axis=(1, 2))
+        total = (fdr * w).sum(axis=(1, 2))
+
+        return {
+            team_id: float(total[row] / total_weight[row])
+            for row, team_id in enumerate(self.team_ids)
+            if total_weight[row] > 0
+        }
+
+    def mean_fdr(
+        self,
+        start_gw: int,
+        num_gameweeks: int,
+        finished: Optional[bool] = None,
+    ) -> dict[int, float]:
+        """Average FDR per team over ``num_gameweeks`` gameweeks from ``start_gw``."""
+        return self.weighted_fdr(start_gw, [1.0] * max(num_gameweeks, 0), finished)
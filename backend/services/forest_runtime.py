@@ -0,0 +1,214 @@
+"""
+Array-backed random forest runtime.
+
+A trained scikit-learn forest classifier (plus its StandardScaler) is exported
+to flat NumPy arrays - one row per tree node, all trees concatenated - and
+scored with a vectorized traversal that walks every sample down every tree at
+once. Only NumPy is needed at serving time, so loading the model no longer
+unpickles scikit-learn objects.
+
+Export layout (a directory):
+    meta.json       classes, feature names, scaler mean/scale, max depth
+    feature.npy     split feature per node (-2 for leaves, as in sklearn)
+    threshold.npy   split threshold per node
+    left.npy        left child (global node index, -1 for leaves)
+    right.npy       right child (global node index, -1 for leaves)
+    value.npy       class fractions per node (n_nodes x n_classes)
+    roots.npy       root node index of each tree
+
+The .npy files are plain uncompressed arrays, so they are loaded with
+mmap_mode="r": pages come from the OS page cache and are shared by every
+worker process instead of each holding its own copy.
+"""
+
+import json
+import os
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+FORMAT_VERSION = 1
+ARRAY_NAMES = ("feature", "threshold", "left", "right", "value", "roots")
+
+
+@dataclass(frozen=True)
+class ArrayScaler:
+    """StandardScaler.transform from its fitted mean and scale."""
+    mean: np.ndarray
+    scale: np.ndarray
+
+    def transform(self, X) -> np.ndarray:
+        X = np.array(X, dtype=np.float64)
+        X -= self.mean
+        X /= self.scale
+        return X
+
+
+@dataclass(frozen=True)
+class ArrayForest:
+    """Forest classifier as flat node arrays, scored like sklearn's predict_proba."""
+    feature: np.ndarray
+    threshold: np.ndarray
+    left: np.ndarray
+    right: np.ndarray
+    value: np.ndarray
+    roots: np.ndarray
+    classes: np.ndarray
+    max_depth: int
+    n_features: int
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    @property
+    def classes_(self) -> np.ndarray:
+        return self.classes
+
+    def apply(self, X) -> np.ndarray:
+        """Leaf node reached by each sample in each tree (n_samples x n_trees)."""
+        # sklearn trees compare float32 features against float64 thresholds
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(f"Expected {self.n_features} features, got shape {X.shape}")
+        if not np.isfinite(X).all():
+            raise ValueError("Input contains NaN or infinity")
+
+        rows = np.arange(len(X))[:, None]
+        node = np.repeat(self.roots[None, :], len(X), axis=0)
+        for _ in range(self.max_depth):
+            feature = self.feature[node]
+            internal = feature >= 0
+            if not internal.any():
+                break
+            go_left = X[rows, np.where(internal, feature, 0)] <= self.threshold[node]
+            node = np.where(internal, np.where(go_left, self.left[node], self.right[node]), node)
+        return node
+
+    def predict_proba(self, X) -> np.ndarray:
+        """Mean of the trees' leaf class fractions (n_samples x n_classes)."""
+        leaves = self.apply(X)
+        proba = np.zeros((len(leaves), self.value.shape[1]))
+        # Add trees one at a time, in order, as the forest accumulates them
+        for tree in range(self.n_trees):
+            proba += self.value[leaves[:, tree]]
+        proba /= self.n_trees
+        return proba
+
+    def predict(self, X) -> np.ndarray:
+        return self.classes[np.argmax(self.predict_proba(X), axis=1)]
+
+
+@dataclass(frozen=True)
+class ExportedForest:
+    """A loaded export: the forest, its scaler and the feature order."""
+    forest: ArrayForest
+    scaler: Optional[ArrayScaler]
+    feature_names: List[str]
+    meta: Dict[str, Any] = field(default_factory=dict)
+
+
+def export_forest(path: str, model, scaler=None, feature_names: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Write a fitted forest classifier (and optional StandardScaler) as arrays.
+
+    Args:
+        path: Directory to write (created if missing, files overwritten)
+        model: Fitted single-output forest classifier (estimators_ with tree_)
+        scaler: Optional fitted StandardScaler applied before the forest
+        feature_names: Feature order (default: the scaler's feature_names_in_)
+
+    Returns:
+        The written metadata
+    """
+    trees = [estimator.tree_ for estimator in model.estimators_]
+    if any(tree.n_outputs != 1 for tree in trees):
+        raise ValueError("Only single-output forests can be exported")
+
+    sizes = [tree.node_count for tree in trees]
+    offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]]).astype(np.int32)
+
+    def children(side: np.ndarray, offset: int) -> np.ndarray:
+        # Per-tree child indices -> global node indices, leaves stay -1
+        return np.where(side >= 0, side + offset, -1).astype(np.int32)
+
+    arrays = {
+        "feature": np.concatenate([t.feature for t in trees]).astype(np.int32),
+        "threshold": np.concatenate([t.threshold for t in trees]).astype(np.float64),
+        "left": np.concatenate([children(t.children_left, o) for t, o in zip(trees, offsets)]),
+        "right": np.concatenate([children(t.children_right, o) for t, o in zip(trees, offsets)]),
+        "value": np.concatenate([t.value[:, 0, :] for t in trees]).astype(np.float64),
+        "roots": offsets,
+    }
+
+    if feature_names is None and scaler is not None and hasattr(scaler, "feature_names_in_"):
+        feature_names = [str(name) for name in scaler.feature_names_in_]
+
+    scaler_meta = None
+    if scaler is not None:
+        n = model.n_features_in_
+        mean = scaler.mean_ if getattr(scaler, "mean_", None) is not None else np.zeros(n)
+        scale = scaler.scale_ if getattr(scaler, "scale_", None) is not None else np.ones(n)
+        scaler_meta = {"mean": [float(v) for v in mean], "scale": [float(v) for v in scale]}
+
+    try:
+        import sklearn
+        sklearn_version = sklearn.__version__
+    except ImportError:
+        sklearn_version = None
+
+    meta = {
+        "format": FORMAT_VERSION,
+        "model": type(model).__name__,
+        "n_trees": len(trees),
+        "n_nodes": int(sum(sizes)),
+        "n_features": int(model.n_features_in_),
+        "max_depth": int(max(tree.max_depth for tree in trees)),
+        "classes": [c.item() if hasattr(c, "item") else c for c in model.classes_],
+        "feature_names": list(feature_names) if feature_names is not None else None,
+        "scaler": scaler_meta,
+        "sklearn_version": sklearn_version,
+        "exported_at": datetime.utcnow().isoformat(),
+    }
+
+    os.makedirs(path, exist_ok=True)
+    for name, array in arrays.items():
+        np.save(os.path.join(path, f"{name}.npy"), np.ascontiguousarray(array), allow_pickle=False)
+    with open(os.path.join(path, "meta.json"), "w") as f:
+        json.dump(meta, f, indent=2)
+    return meta
+
+
+def load_forest(path: str, mmap_mode: Optional[str] = "r") -> ExportedForest:
+    """
+    Load an exported forest.
+
+    Args:
+        path: Export directory
+        mmap_mode: np.load memory-map mode ("r" shares pages across
+            processes); None reads the arrays into memory
+    """
+    with open(os.path.join(path, "meta.json")) as f:
+        meta = json.load(f)
+    if meta.get("format") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported forest export format: {meta.get('format')}")
+
+    arrays = {
+        name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mmap_mode, allow_pickle=False)
+        for name in ARRAY_NAMES
+    }
+    forest = ArrayForest(
+        **arrays,
+        classes=np.array(meta["classes"]),
+        max_depth=meta["max_depth"],
+        n_features=meta["n_features"],
+    )
+    scaler = None
+    if meta.get("scaler"):
+        scaler = ArrayScaler(
+            mean=np.array(meta["scaler"]["mean"], dtype=np.float64),
+            scale=np.array(meta["scaler"]["scale"], dtype=np.float64),
+        )
+    return ExportedForest(forest=forest, scaler=scaler, feature_names=meta.get("feature_names") or [], meta=meta)
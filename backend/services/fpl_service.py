@@ -1,18 +1,32 @@
 """FPL API Service - Two-layer caching for optimal performance."""
 
 import asyncio
+import hashlib
+import json
 import logging
 import time
+from collections import OrderedDict
 from dataclasses import dataclass, field
-from typing import Optional
+from typing import Any, Awaitable, Callable, Hashable, Iterable, Optional, Union
 
 import httpx
 
 from config import settings
+from middleware.resilience import AdaptiveRateLimiter, fpl_rate_limiter
+from services.cache import BoundedCache, CacheBackend, get_cache_backend
+from services.fixture_matrix import FixtureMatrix
+from services.fpl_snapshot import FPLSnapshot, load_snapshot, save_snapshot
 from models import Player, Team, Fixture, Gameweek, Pick, ManagerInfo, ManagerHistory, League
 
 logger = logging.getLogger(__name__)
 
+# HTTP/2 is optional - httpx needs the 'h2' package to negotiate it
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
 
 @dataclass
 class TeamCache:
@@ -25,6 +39,14 @@ class TeamCache:
     timestamp: float
 
 
+@dataclass
+class LivePointsCache:
+    """Cache entry for one gameweek's live points."""
+    points: dict[int, int]  # player_id -> total_points
+    finished: bool  # finished gameweeks never change, so they never expire
+    timestamp: float
+
+
 @dataclass
 class LeagueStandingsCache:
     """Cache entry for league standings data."""
@@ -40,52 +62,334 @@ class RivalPicksCache:
     timestamp: float
 
 
+@dataclass
+class ManagerGameweek:
+    """A manager's picks for a gameweek with the live points they scored."""
+    manager: ManagerInfo
+    picks: list[Pick]
+    gameweek: int  # may differ from the requested GW if picks fell back
+    live_points: dict[int, int]  # player_id -> total_points
+
+
+@dataclass
+class FixtureIndex:
+    """Fixtures grouped by gameweek; rebuilt whenever fixtures change."""
+    by_gameweek: dict[int, list[Fixture]] = field(default_factory=dict)
+
+    @classmethod
+    def build(cls, fixtures: list[Fixture]) -> "FixtureIndex":
+        index = cls()
+        # Stable sort keeps API order within a gameweek
+        for f in sorted((f for f in fixtures if f.event), key=lambda f: f.event):
+            index.by_gameweek.setdefault(f.event, []).append(f)
+        return index
+
+
+class SingleFlight:
+    """
+    Per-key request coalescing for cache misses.
+
+    The first caller for a key starts the fetch; concurrent callers for the
+    same key await that fetch instead of issuing their own, and all of them
+    receive its result or exception. The fetch runs as its own task, so a
+    cancelled waiter never aborts the shared request.
+    """
+
+    def __init__(self):
+        self._inflight: dict[Hashable, asyncio.Task] = {}
+        self.calls = 0
+        self.coalesced = 0
+        self._coalesced_by_kind: dict[str, int] = {}
+
+    @staticmethod
+    def _kind(key: Hashable) -> str:
+        return str(key[0]) if isinstance(key, tuple) else str(key)
+
+    async def do(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """Run ``fetch`` once per key at a time and share its outcome."""
+        self.calls += 1
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            kind = self._kind(key)
+            self._coalesced_by_kind[kind] = self._coalesced_by_kind.get(kind, 0) + 1
+        else:
+            task = asyncio.ensure_future(fetch())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _t, k=key: self._inflight.pop(k, None))
+        return await asyncio.shield(task)
+
+    def is_in_flight(self, key: Hashable) -> bool:
+        """Check whether a fetch for this key is currently running."""
+        return key in self._inflight
+
+    def get_stats(self) -> dict:
+        """Get coalescing counters."""
+        return {
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._inflight),
+            "coalesced_by_kind": dict(self._coalesced_by_kind),
+        }
+
+
+class RateLimitedTransport(httpx.AsyncBaseTransport):
+    """httpx transport that sends every request through an AdaptiveRateLimiter."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, limiter: AdaptiveRateLimiter):
+        self._transport = transport
+        self._limiter = limiter
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        async with self._limiter.slot() as slot:
+            response = await self._transport.handle_async_request(request)
+            slot.record(response.status_code, response.headers.get("Retry-After"))
+            return response
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+async def gather_or_cancel(*aws: Awaitable[Any]) -> list[Any]:
+    """
+    Await several coroutines concurrently and return their results in order.
+
+    Unlike plain asyncio.gather, the first failure cancels the remaining
+    awaitables before its exception propagates. Unlike TaskGroup, the original
+    exception is raised rather than an ExceptionGroup, so callers' existing
+    ``except httpx.HTTPStatusError`` handling keeps working.
+    """
+    tasks = [asyncio.ensure_future(aw) for aw in aws]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+
 class FPLService:
     """Service for fetching data from the official FPL API with two-layer caching."""
 
     # Cache TTLs
     GLOBAL_CACHE_TTL = 900  # 15 minutes for global data
     TEAM_CACHE_TTL = 600    # 10 minutes for per-team data
-    LIVE_CACHE_TTL = 60     # 1 minute for live GW points
+    LIVE_CACHE_TTL = 60     # 1 minute for live GW points (in-progress GW only)
     LEAGUE_CACHE_TTL = 300  # 5 minutes for league standings
     RIVAL_CACHE_TTL = 300   # 5 minutes for rival picks
 
-    # Concurrency settings
-    MAX_CONCURRENT_REQUESTS = 10  # Max parallel API requests for rival picks
+    # Stale-while-revalidate (bootstrap + fixtures)
+    GLOBAL_CACHE_MAX_STALENESS = 3600  # Never serve global data older than 1 hour
+    REVALIDATE_RETRY_DELAY = 30        # Wait before retrying a failed background refresh
+
+    # Cache sizes
+    LIVE_CACHE_MAX_GAMEWEEKS = 16  # LRU bound for per-gameweek live points
+    TEAM_CACHE_MAX_ENTRIES = 1000
+    TEAM_CACHE_MAX_BYTES = 64 * 1024 * 1024  # ~64 MB (approximate, incl. per-GW picks)
+    LEAGUE_CACHE_MAX_ENTRIES = 500
+    RIVAL_CACHE_MAX_ENTRIES = 500
 
     def __init__(self):
         self.base_url = settings.FPL_BASE_URL
 
+        # Shared HTTP client (lazily created, pooled keep-alive connections)
+        self._client: Optional[httpx.AsyncClient] = None
+
+        # Coalesces concurrent cache misses for the same key into one fetch
+        self._single_flight = SingleFlight()
+
+        # Background (stale-while-revalidate) refresh tasks and timing metrics
+        self._background_tasks: set[asyncio.Task] = set()
+        self._refresh_stats: dict[str, dict] = {}
+
+        # Cross-worker cache for raw API payloads (None with the in-process backend,
+        # where the caches above already cover everything)
+        backend = get_cache_backend()
+        self._shared_cache: Optional[CacheBackend] = backend if backend.shared else None
+        self._shared_stats = {"hits": 0, "misses": 0, "errors": 0}
+
+        # Conditional GET validators per endpoint: key -> {etag, last_modified, content_hash, size}
+        self._validators: dict[str, dict] = {}
+        self._conditional_stats = {
+            "requests": 0,
+            "not_modified": 0,      # 304 responses
+            "unchanged_bodies": 0,  # 200 responses whose content hash matched
+            "parses_avoided": 0,
+            "bytes_saved": 0,
+        }
+
+        # Warm-start snapshot of the global cache on disk
+        self._snapshot_stats = {
+            "loaded": False,
+            "load_seconds": None,
+            "loaded_age_seconds": None,
+            "saves": 0,
+            "save_failures": 0,
+            "last_save_bytes": None,
+            "last_save_seconds": None,
+            "last_saved_at": None,
+        }
+
         # Global cache (shared by all users)
         self._players: dict[int, Player] = {}
         self._teams: dict[int, Team] = {}
         self._gameweeks: list[Gameweek] = []
         self._fixtures: list[Fixture] = []
         self._current_gameweek: Optional[int] = None
+
+        # Lookup indexes, swapped in together with the data they index
+        self._fixture_index = FixtureIndex()
+        self._fixture_matrix = FixtureMatrix()
+        self._gameweeks_by_id: dict[int, Gameweek] = {}
+        self._flagged_current_gameweek: Optional[Gameweek] = None  # the GW marked is_current
         self._global_cache_timestamp: float = 0
         self._fixtures_cache_timestamp: float = 0
 
-        # Live points cache
-        self._live_points: dict[int, int] = {}
-        self._live_cache_timestamp: float = 0
-        self._live_cache_gw: Optional[int] = None
+        # Live points cache: gameweek -> LivePointsCache (LRU order, most recent last)
+        self._live_cache: OrderedDict[int, LivePointsCache] = OrderedDict()
 
-        # Per-team cache
-        self._team_cache: dict[int, TeamCache] = {}
+        # Per-team cache: team_id -> TeamCache (bounded, frequency-aware eviction)
+        self._team_cache = BoundedCache(
+            "teams", self.TEAM_CACHE_MAX_ENTRIES, self.TEAM_CACHE_TTL,
+            max_bytes=self.TEAM_CACHE_MAX_BYTES,
+        )
 
         # League standings cache: league_id -> LeagueStandingsCache
-        self._league_cache: dict[int, LeagueStandingsCache] = {}
+        self._league_cache = BoundedCache("leagues", self.LEAGUE_CACHE_MAX_ENTRIES, self.LEAGUE_CACHE_TTL)
 
         # Rival picks cache: (league_id, gameweek) -> RivalPicksCache
-        self._rival_cache: dict[tuple[int, int], RivalPicksCache] = {}
+        self._rival_cache = BoundedCache("rivals", self.RIVAL_CACHE_MAX_ENTRIES, self.RIVAL_CACHE_TTL)
 
         # Position mapping
         self._position_map = {1: "GKP", 2: "DEF", 3: "MID", 4: "FWD"}
     
     async def initialize(self) -> None:
-        """Initialize the service by fetching bootstrap data."""
+        """
+        Initialize the service by fetching bootstrap data.
+
+        If a warm-start snapshot is available it is loaded first, so this
+        returns immediately and the API refresh runs in the background.
+        """
+        if not self._players:
+            await self._load_snapshot()
         await self._refresh_global_cache()
 
+    async def _load_snapshot(self) -> bool:
+        """Populate the global cache from the on-disk snapshot, if usable."""
+        path = settings.FPL_SNAPSHOT_PATH
+        if not path:
+            return False
+
+        start = time.perf_counter()
+        snapshot = await asyncio.to_thread(load_snapshot, path)
+        if snapshot is None or not snapshot.players:
+            return False
+
+        now = time.time()
+        age = now - snapshot.bootstrap_fetched_at
+        if age > settings.FPL_SNAPSHOT_MAX_AGE:
+            logger.info(f"FPL snapshot is {age / 3600:.1f}h old - ignoring it")
+            return False
+
+        # Serve the snapshot for at least one TTL window while the refresh runs,
+        # even if it is older than GLOBAL_CACHE_MAX_STALENESS
+        floor = now - self.GLOBAL_CACHE_MAX_STALENESS + self.GLOBAL_CACHE_TTL
+        self._teams = snapshot.teams
+        self._players = snapshot.players
+        self._set_gameweeks(snapshot.gameweeks)
+        self._current_gameweek = snapshot.current_gameweek
+        self._global_cache_timestamp = max(snapshot.bootstrap_fetched_at, floor)
+        if snapshot.fixtures:
+            self._set_fixtures(snapshot.fixtures)
+            self._fixtures_cache_timestamp = max(snapshot.fixtures_fetched_at, floor)
+        # Validators let the first refresh skip re-parsing if nothing changed
+        for key, validator in snapshot.validators.items():
+            self._validators.setdefault(key, validator)
+
+        duration = time.perf_counter() - start
+        self._snapshot_stats.update(
+            loaded=True,
+            load_seconds=round(duration, 3),
+            loaded_age_seconds=round(age, 1),
+        )
+        logger.info(
+            f"Loaded FPL snapshot in {duration * 1000:.0f}ms: {len(self._players)} players, "
+            f"{len(self._fixtures)} fixtures ({age / 60:.0f} min old)"
+        )
+        return True
+
+    async def _save_snapshot(self) -> None:
+        """Persist the global cache to disk (failures are logged, never raised)."""
+        path = settings.FPL_SNAPSHOT_PATH
+        if not path or not self._players:
+            return
+
+        snapshot = FPLSnapshot(
+            teams=self._teams,
+            players=self._players,
+            gameweeks=self._gameweeks,
+            fixtures=self._fixtures,
+            current_gameweek=self._current_gameweek,
+            bootstrap_fetched_at=self._global_cache_timestamp,
+            fixtures_fetched_at=self._fixtures_cache_timestamp,
+            validators={key: dict(v) for key, v in self._validators.items()},
+        )
+        start = time.perf_counter()
+        try:
+            size = await asyncio.to_thread(save_snapshot, path, snapshot)
+        except Exception as e:
+            self._snapshot_stats["save_failures"] += 1
+            logger.warning(f"Failed to write FPL snapshot {path}: {e}")
+            return
+        self._snapshot_stats.update(
+            saves=self._snapshot_stats["saves"] + 1,
+            last_save_bytes=size,
+            last_save_seconds=round(time.perf_counter() - start, 3),
+            last_saved_at=time.time(),
+        )
+
+    @property
+    def http_client(self) -> httpx.AsyncClient:
+        """
+        Long-lived HTTP client shared by every FPL API call.
+
+        Reusing one pooled client avoids a new TCP+TLS handshake per request.
+        Every request goes through the process-wide fpl_rate_limiter. Other
+        services (predictor, ML) should use this client instead of opening
+        their own.
+        """
+        if self._client is None or self._client.is_closed:
+            http2 = settings.FPL_HTTP2 and HTTP2_AVAILABLE
+            if settings.FPL_HTTP2 and not HTTP2_AVAILABLE:
+                logger.warning("FPL_HTTP2 enabled but 'h2' is not installed - falling back to HTTP/1.1")
+            transport = httpx.AsyncHTTPTransport(
+                limits=httpx.Limits(
+                    max_connections=settings.FPL_HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.FPL_HTTP_MAX_KEEPALIVE,
+                    keepalive_expiry=settings.FPL_HTTP_KEEPALIVE_EXPIRY,
+                ),
+                http2=http2,
+            )
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(settings.FPL_REQUEST_TIMEOUT, connect=10.0),
+                transport=RateLimitedTransport(transport, fpl_rate_limiter),
+            )
+            logger.info(
+                f"Created FPL HTTP client (max_connections={settings.FPL_HTTP_MAX_CONNECTIONS}, "
+                f"keepalive={settings.FPL_HTTP_MAX_KEEPALIVE}, http2={http2})"
+            )
+        return self._client
+
+    async def close(self) -> None:
+        """Cancel background refreshes, then close the shared HTTP client."""
+        for task in list(self._background_tasks):
+            task.cancel()
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+            logger.info("FPL HTTP client closed")
+        self._client = None
+
     def clear_cache(self, cache_types: list[str] | None = None) -> dict:
         """
         Clear specified caches or all caches if none specified.
@@ -112,42 +416,40 @@ class FPLService:
             team_count = len(self._teams)
             self._players = {}
             self._teams = {}
-            self._gameweeks = []
-            self._fixtures = []
+            self._set_gameweeks([])
+            self._set_fixtures([])
             self._current_gameweek = None
             self._global_cache_timestamp = 0
             self._fixtures_cache_timestamp = 0
+            self._validators = {}
             result["cleared"].append("global")
             result["counts"]["players"] = player_count
             result["counts"]["teams"] = team_count
             logger.info(f"Cleared global cache ({player_count} players, {team_count} teams)")
 
         if "teams" in cache_types:
-            team_cache_count = len(self._team_cache)
-            self._team_cache = {}
+            team_cache_count = self._team_cache.clear()
             result["cleared"].append("teams")
             result["counts"]["team_caches"] = team_cache_count
             logger.info(f"Cleared {team_cache_count} team caches")
 
         if "live" in cache_types:
-            live_count = len(self._live_points)
-            self._live_points = {}
-            self._live_cache_timestamp = 0
-            self._live_cache_gw = None
+            live_count = sum(len(entry.points) for entry in self._live_cache.values())
+            gw_count = len(self._live_cache)
+            self._live_cache = OrderedDict()
             result["cleared"].append("live")
             result["counts"]["live_points"] = live_count
-            logger.info(f"Cleared live cache ({live_count} entries)")
+            result["counts"]["live_gameweeks"] = gw_count
+            logger.info(f"Cleared live cache ({gw_count} gameweeks, {live_count} entries)")
 
         if "leagues" in cache_types:
-            league_count = len(self._league_cache)
-            self._league_cache = {}
+            league_count = self._league_cache.clear()
             result["cleared"].append("leagues")
             result["counts"]["league_caches"] = league_count
             logger.info(f"Cleared {league_count} league standing caches")
 
         if "rivals" in cache_types:
-            rival_count = len(self._rival_cache)
-            self._rival_cache = {}
+            rival_count = self._rival_cache.clear()
             result["cleared"].append("rivals")
             result["counts"]["rival_caches"] = rival_count
             logger.info(f"Cleared {rival_count} rival picks caches")
@@ -171,55 +473,246 @@ class FPLService:
                 "age_seconds": round(now - self._global_cache_timestamp, 1) if self._global_cache_timestamp else None,
                 "ttl_seconds": self.GLOBAL_CACHE_TTL,
                 "expires_in": max(0, round(self.GLOBAL_CACHE_TTL - (now - self._global_cache_timestamp), 1)) if self._global_cache_timestamp else None,
+                "fixtures_age_seconds": round(now - self._fixtures_cache_timestamp, 1) if self._fixtures_cache_timestamp else None,
+                "stale": bool(self._global_cache_timestamp) and now - self._global_cache_timestamp >= self.GLOBAL_CACHE_TTL,
+                "max_staleness_seconds": self.GLOBAL_CACHE_MAX_STALENESS,
             },
             "teams": {
                 "cached_teams": len(self._team_cache),
-                "team_ids": list(self._team_cache.keys())[:10],  # First 10 for display
-                "ttl_seconds": self.TEAM_CACHE_TTL,
+                "team_ids": self._team_cache.keys()[:10],  # First 10 for display
+                **self._team_cache.get_stats(),
             },
             "live": {
-                "entries": len(self._live_points),
-                "gameweek": self._live_cache_gw,
-                "age_seconds": round(now - self._live_cache_timestamp, 1) if self._live_cache_timestamp else None,
+                "entries": sum(len(entry.points) for entry in self._live_cache.values()),
+                "gameweeks": list(self._live_cache.keys()),
+                "finished_gameweeks": [gw for gw, entry in self._live_cache.items() if entry.finished],
+                "max_gameweeks": self.LIVE_CACHE_MAX_GAMEWEEKS,
                 "ttl_seconds": self.LIVE_CACHE_TTL,
             },
             "leagues": {
                 "cached_leagues": len(self._league_cache),
-                "league_ids": list(self._league_cache.keys())[:10],
-                "ttl_seconds": self.LEAGUE_CACHE_TTL,
+                "league_ids": self._league_cache.keys()[:10],
+                **self._league_cache.get_stats(),
             },
             "rivals": {
                 "cached_contexts": len(self._rival_cache),
-                "contexts": list(self._rival_cache.keys())[:5],  # (league_id, gw) tuples
-                "ttl_seconds": self.RIVAL_CACHE_TTL,
-            }
+                "contexts": self._rival_cache.keys()[:5],  # (league_id, gw) tuples
+                **self._rival_cache.get_stats(),
+            },
+            "single_flight": self._single_flight.get_stats(),
+            "shared": {
+                "enabled": self._shared_cache is not None,
+                **(self._shared_cache.get_stats() if self._shared_cache is not None else {}),
+                **self._shared_stats,
+            },
+            "refresh": {key: dict(stats) for key, stats in self._refresh_stats.items()},
+            "rate_limiter": fpl_rate_limiter.get_stats(),
+            "snapshot": {"path": settings.FPL_SNAPSHOT_PATH or None, **self._snapshot_stats},
+            "conditional_get": {
+                **self._conditional_stats,
+                "validators": {
+                    key: {k: v for k, v in validator.items() if k != "content_hash"}
+                    for key, validator in self._validators.items()
+                },
+            },
         }
 
-    async def _refresh_global_cache(self) -> None:
-        """Fetch all static data from bootstrap-static endpoint."""
-        if time.time() - self._global_cache_timestamp < self.GLOBAL_CACHE_TTL:
+    async def _shared_get(self, key: str) -> Optional[Any]:
+        """Read from the cross-worker cache (None if disabled, missing or failing)."""
+        if self._shared_cache is None:
+            return None
+        try:
+            value = await asyncio.to_thread(self._shared_cache.get, f"fpl:{key}")
+        except Exception as e:
+            self._shared_stats["errors"] += 1
+            logger.warning(f"Shared cache read failed for {key}: {e}")
+            return None
+        self._shared_stats["hits" if value is not None else "misses"] += 1
+        return value
+
+    async def _shared_set(self, key: str, value: Any, ttl: float) -> None:
+        """Publish to the cross-worker cache (no-op if disabled; failures are logged)."""
+        if self._shared_cache is None:
             return
-        
-        logger.info("Refreshing global cache (bootstrap data)...")
-        
-        async with httpx.AsyncClient(timeout=httpx.Timeout(30.0, connect=10.0)) as client:
+        try:
+            await asyncio.to_thread(self._shared_cache.set, f"fpl:{key}", value, ttl)
+        except Exception as e:
+            self._shared_stats["errors"] += 1
+            logger.warning(f"Shared cache write failed for {key}: {e}")
+
+    async def _get_json(self, path: str, shared_key: str, ttl: float, **kwargs) -> Any:
+        """GET an FPL API endpoint, going through the cross-worker cache if configured."""
+        data = await self._shared_get(shared_key)
+        if data is not None:
+            return data
+        response = await self.http_client.get(f"{self.base_url}{path}", **kwargs)
+        response.raise_for_status()
+        data = response.json()
+        await self._shared_set(shared_key, data, ttl)
+        return data
+
+    async def _conditional_get(
+        self, key: str, url: str, has_cached: bool, **kwargs
+    ) -> tuple[Optional[Any], float]:
+        """
+        GET a global endpoint using stored validators.
+
+        Sends If-None-Match / If-Modified-Since when cached data exists.
+        Returns (data, fetched_at): data is the decoded JSON body, or None when
+        the upstream data is unchanged (304, or a 200 whose content hash
+        matches the last one) so the caller can skip parsing and just extend
+        its cache timestamp. With a shared cache backend, a copy another
+        worker fetched within the TTL is used instead of calling the API.
+        """
+        validator = self._validators.get(key) if has_cached else None
+
+        shared = await self._shared_get(f"global:{key}")
+        if shared is not None:
+            if validator and validator.get("content_hash") == shared["validator"]["content_hash"]:
+                self._conditional_stats["parses_avoided"] += 1
+                return None, shared["fetched_at"]
+            self._validators[key] = dict(shared["validator"])
+            return json.loads(shared["content"]), shared["fetched_at"]
+
+        headers = {}
+        if validator:
+            if validator.get("etag"):
+                headers["If-None-Match"] = validator["etag"]
+            if validator.get("last_modified"):
+                headers["If-Modified-Since"] = validator["last_modified"]
+
+        self._conditional_stats["requests"] += 1
+        response = await self.http_client.get(url, headers=headers, **kwargs)
+        fetched_at = time.time()
+
+        if response.status_code == 304 and validator:
+            self._conditional_stats["not_modified"] += 1
+            self._conditional_stats["parses_avoided"] += 1
+            self._conditional_stats["bytes_saved"] += validator.get("size", 0)
+            return None, fetched_at
+        response.raise_for_status()
+
+        content = response.content
+        content_hash = hashlib.blake2b(content, digest_size=16).hexdigest()
+        unchanged = validator is not None and validator.get("content_hash") == content_hash
+
+        self._validators[key] = {
+            "etag": response.headers.get("etag"),
+            "last_modified": response.headers.get("last-modified"),
+            "content_hash": content_hash,
+            "size": len(content),
+        }
+
+        await self._shared_set(
+            f"global:{key}",
+            {"content": content, "validator": self._validators[key], "fetched_at": fetched_at},
+            self.GLOBAL_CACHE_TTL,
+        )
+
+        if unchanged:
+            self._conditional_stats["unchanged_bodies"] += 1
+            self._conditional_stats["parses_avoided"] += 1
+            return None, fetched_at
+        return response.json(), fetched_at
+
+    async def _timed_refresh(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """Run a global-data fetch and record its duration."""
+        stats = self._refresh_stats.setdefault(key, {
+            "refreshes": 0,
+            "failures": 0,
+            "last_duration_seconds": None,
+            "max_duration_seconds": 0.0,
+            "total_duration_seconds": 0.0,
+            "last_failure_at": None,
+        })
+        start = time.perf_counter()
+        try:
+            result = await fetch()
+        except Exception:
+            stats["failures"] += 1
+            stats["last_failure_at"] = time.time()
+            raise
+        duration = time.perf_counter() - start
+        stats["refreshes"] += 1
+        stats["last_duration_seconds"] = round(duration, 3)
+        stats["max_duration_seconds"] = round(max(stats["max_duration_seconds"], duration), 3)
+        stats["total_duration_seconds"] = round(stats["total_duration_seconds"] + duration, 3)
+        return result
+
+    async def _revalidate(
+        self,
+        key: str,
+        fetch: Callable[[], Awaitable[Any]],
+        timestamp: float,
+        has_data: bool,
+    ) -> None:
+        """
+        Stale-while-revalidate for global data.
+
+        Fresh data is served as-is. Expired data younger than
+        GLOBAL_CACHE_MAX_STALENESS keeps being served while a background task
+        refreshes it; beyond that bound (or with no data at all) the caller
+        waits for the refresh.
+        """
+        age = time.time() - timestamp
+        if age < self.GLOBAL_CACHE_TTL:
+            return
+
+        if has_data and age < self.GLOBAL_CACHE_MAX_STALENESS:
+            self._schedule_background_refresh(key, fetch)
+            return
+
+        await self._single_flight.do(key, lambda: self._timed_refresh(key, fetch))
+
+    def _schedule_background_refresh(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> None:
+        """Start a background refresh unless one is running or recently failed."""
+        if self._single_flight.is_in_flight(key):
+            return
+        last_failure = self._refresh_stats.get(key, {}).get("last_failure_at")
+        if last_failure and time.time() - last_failure < self.REVALIDATE_RETRY_DELAY:
+            return
+
+        async def refresh() -> None:
             try:
-                response = await client.get(
-                    f"{self.base_url}/bootstrap-static/",
-                )
-                response.raise_for_status()
-                data = response.json()
-            except httpx.TimeoutException:
-                logger.error("FPL API request timed out")
-                raise
-            except httpx.RequestError as e:
-                logger.error(f"FPL API request failed: {e}")
-                raise
-        
-        # Parse teams
-        self._teams = {}
+                await self._single_flight.do(key, lambda: self._timed_refresh(key, fetch))
+            except Exception as e:
+                logger.warning(f"Background refresh of {key} failed, serving stale data: {e}")
+
+        task = asyncio.create_task(refresh())
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+    async def _refresh_global_cache(self) -> None:
+        """Fetch all static data from bootstrap-static endpoint (stale-while-revalidate)."""
+        await self._revalidate(
+            "bootstrap", self._fetch_bootstrap,
+            self._global_cache_timestamp, bool(self._players),
+        )
+
+    async def _fetch_bootstrap(self) -> None:
+        """Download and parse bootstrap-static, then swap it into the global cache."""
+        logger.info("Refreshing global cache (bootstrap data)...")
+
+        try:
+            data, fetched_at = await self._conditional_get(
+                "bootstrap", f"{self.base_url}/bootstrap-static/", bool(self._players),
+            )
+        except httpx.TimeoutException:
+            logger.error("FPL API request timed out")
+            raise
+        except httpx.RequestError as e:
+            logger.error(f"FPL API request failed: {e}")
+            raise
+
+        if data is None:
+            self._global_cache_timestamp = fetched_at
+            logger.info("Bootstrap data unchanged - extended global cache without re-parsing")
+            return
+
+        # Parse into fresh containers so readers never see a half-built cache
+        teams = {}
         for t in data["teams"]:
-            self._teams[t["id"]] = Team(
+            teams[t["id"]] = Team(
                 id=t["id"],
                 name=t["name"],
                 short_name=t["short_name"],
@@ -233,15 +726,15 @@ class FPLService:
             )
         
         # Parse players
-        self._players = {}
+        players = {}
         for p in data["elements"]:
-            self._players[p["id"]] = Player(
+            players[p["id"]] = Player(
                 id=p["id"],
                 web_name=p["web_name"],
                 first_name=p["first_name"],
                 second_name=p["second_name"],
                 team=p["team"],
-                team_name=self._teams[p["team"]].short_name if p["team"] in self._teams else None,
+                team_name=teams[p["team"]].short_name if p["team"] in teams else None,
                 element_type=p["element_type"],
                 position=self._position_map.get(p["element_type"], "???"),
                 now_cost=p["now_cost"],
@@ -271,9 +764,10 @@ class FPLService:
             )
         
         # Parse gameweeks
-        self._gameweeks = []
+        gameweeks = []
+        current_gameweek = self._current_gameweek
         for gw in data["events"]:
-            self._gameweeks.append(Gameweek(
+            gameweeks.append(Gameweek(
                 id=gw["id"],
                 name=gw["name"],
                 deadline_time=gw["deadline_time"],
@@ -284,31 +778,51 @@ class FPLService:
                 highest_score=gw.get("highest_score"),
             ))
             if gw["is_current"]:
-                self._current_gameweek = gw["id"]
-        
-        self._global_cache_timestamp = time.time()
+                current_gameweek = gw["id"]
+
+        # Swap in the new data in one step
+        self._teams = teams
+        self._players = players
+        self._set_gameweeks(gameweeks)
+        self._current_gameweek = current_gameweek
+        self._global_cache_timestamp = fetched_at
         logger.info(f"Global cache refreshed: {len(self._players)} players, {len(self._teams)} teams")
+        await self._save_snapshot()
     
-    def _is_team_cache_valid(self, team_id: int) -> bool:
-        """Check if per-team cache is still valid."""
-        if team_id not in self._team_cache:
-            return False
-        return time.time() - self._team_cache[team_id].timestamp < self.TEAM_CACHE_TTL
-    
-    async def _fetch_team_data(self, team_id: int) -> None:
-        """Fetch and cache all data for a specific team in one go."""
+    async def _get_team_cache(self, team_id: int) -> TeamCache:
+        """Get the per-team cache entry, fetching it if missing or expired."""
+        cache = self._team_cache.get(team_id)
+        if cache is None:
+            cache = await self._fetch_team_data(team_id)
+        return cache
+
+    def _set_gameweeks(self, gameweeks: list[Gameweek]) -> None:
+        """Swap in gameweeks together with their lookup indexes."""
+        self._gameweeks_by_id = {gw.id: gw for gw in gameweeks}
+        self._flagged_current_gameweek = next((gw for gw in gameweeks if gw.is_current), None)
+        self._gameweeks = gameweeks
+
+    def _set_fixtures(self, fixtures: list[Fixture]) -> None:
+        """Swap in fixtures together with their gameweek index and difficulty matrix."""
+        self._fixture_index = FixtureIndex.build(fixtures)
+        self._fixture_matrix = FixtureMatrix.build(fixtures)
+        self._fixtures = fixtures
+
+    async def _fetch_team_data(self, team_id: int) -> TeamCache:
+        """Fetch and cache all data for a specific team in one go (coalesced)."""
+        return await self._single_flight.do(("team", team_id), lambda: self._load_team_data(team_id))
+
+    async def _load_team_data(self, team_id: int) -> TeamCache:
+        """Download and parse entry + history for a team into the team cache."""
         logger.info(f"Fetching data for team {team_id}...")
         
-        async with httpx.AsyncClient() as client:
-            # Fetch manager info + leagues (single request)
-            entry_resp = await client.get(f"{self.base_url}/entry/{team_id}/", timeout=30.0)
-            entry_resp.raise_for_status()
-            entry_data = entry_resp.json()
-            
-            # Fetch history
-            history_resp = await client.get(f"{self.base_url}/entry/{team_id}/history/", timeout=30.0)
-            history_resp.raise_for_status()
-            history_data = history_resp.json()
+        # Fetch manager info + leagues and history concurrently
+        entry_data, history_data = await gather_or_cancel(
+            self._get_json(f"/entry/{team_id}/", f"entry:{team_id}", self.TEAM_CACHE_TTL, timeout=30.0),
+            self._get_json(
+                f"/entry/{team_id}/history/", f"history:{team_id}", self.TEAM_CACHE_TTL, timeout=30.0,
+            ),
+        )
         
         # Parse manager info
         manager = ManagerInfo(
@@ -357,8 +871,8 @@ class FPLService:
             if chip_name:
                 chips_used.append(chip_name)
 
-        # Store in cache
-        self._team_cache[team_id] = TeamCache(
+        # Store in cache (the bounded cache may decline to admit rarely-seen teams)
+        cache = TeamCache(
             manager=manager,
             leagues=leagues,
             history=history,
@@ -366,63 +880,65 @@ class FPLService:
             chips_used=chips_used,
             timestamp=time.time(),
         )
+        self._team_cache.set(team_id, cache)
         logger.info(f"Team {team_id} cached (2 API calls) - chips used: {chips_used}")
-    
+        return cache
+
     async def get_manager_info(self, team_id: int) -> ManagerInfo:
         """Get manager info (cached)."""
-        if not self._is_team_cache_valid(team_id):
-            await self._fetch_team_data(team_id)
-        return self._team_cache[team_id].manager
-    
+        return (await self._get_team_cache(team_id)).manager
+
     async def get_manager_history(self, team_id: int) -> list[ManagerHistory]:
         """Get manager history (cached)."""
-        if not self._is_team_cache_valid(team_id):
-            await self._fetch_team_data(team_id)
-        return self._team_cache[team_id].history
-    
+        return (await self._get_team_cache(team_id)).history
+
     async def get_manager_leagues(self, team_id: int) -> list[League]:
         """Get manager leagues (cached)."""
-        if not self._is_team_cache_valid(team_id):
-            await self._fetch_team_data(team_id)
-        return self._team_cache[team_id].leagues
+        return (await self._get_team_cache(team_id)).leagues
 
     async def get_chips_used(self, team_id: int) -> list[str]:
         """Get list of chips already used by this manager (cached)."""
-        if not self._is_team_cache_valid(team_id):
-            await self._fetch_team_data(team_id)
-        return self._team_cache[team_id].chips_used
+        return (await self._get_team_cache(team_id)).chips_used
 
     async def get_manager_picks(self, team_id: int, gameweek: int) -> list[Pick]:
         """Get manager picks for a gameweek (cached)."""
-        if not self._is_team_cache_valid(team_id):
-            await self._fetch_team_data(team_id)
-        
-        cache = self._team_cache[team_id]
-        
-        # Check if picks for this GW are cached
+        cache = self._team_cache.get(team_id)
+        if cache is not None and gameweek in cache.picks:
+            return cache.picks[gameweek]
+
+        # Picks don't depend on the team data, so fetch both at once on a miss
+        cache, picks = await gather_or_cancel(
+            self._get_team_cache(team_id),
+            self._single_flight.do(
+                ("picks", team_id, gameweek),
+                lambda: self._fetch_picks(team_id, gameweek),
+            ),
+        )
         if gameweek not in cache.picks:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.base_url}/entry/{team_id}/event/{gameweek}/picks/",
-                    timeout=30.0
-                )
-                response.raise_for_status()
-                data = response.json()
-            
-            picks = []
-            for p in data.get("picks", []):
-                picks.append(Pick(
-                    element=p["element"],
-                    position=p["position"],
-                    multiplier=p["multiplier"],
-                    is_captain=p["is_captain"],
-                    is_vice_captain=p["is_vice_captain"],
-                ))
             cache.picks[gameweek] = picks
+            self._team_cache.resize(team_id)  # picks grow the entry in place
             logger.info(f"Cached picks for team {team_id} GW{gameweek}")
-        
+
         return cache.picks[gameweek]
 
+    async def _fetch_picks(self, team_id: int, gameweek: int) -> list[Pick]:
+        """Download and parse a manager's picks for one gameweek."""
+        data = await self._get_json(
+            f"/entry/{team_id}/event/{gameweek}/picks/", f"picks:{team_id}:{gameweek}",
+            self.TEAM_CACHE_TTL, timeout=30.0,
+        )
+
+        picks = []
+        for p in data.get("picks", []):
+            picks.append(Pick(
+                element=p["element"],
+                position=p["position"],
+                multiplier=p["multiplier"],
+                is_captain=p["is_captain"],
+                is_vice_captain=p["is_vice_captain"],
+            ))
+        return picks
+
     async def get_manager_picks_with_fallback(self, team_id: int, gameweek: int) -> tuple[list[Pick], int]:
         """
         Get manager picks with automatic fallback to last played gameweek.
@@ -442,32 +958,83 @@ class FPLService:
                     return picks, manager.current_event
             raise
 
+    async def get_manager_gameweek(self, team_id: int, gameweek: int) -> ManagerGameweek:
+        """
+        Fetch manager info, picks (with fallback) and live points.
+
+        Manager info (whose team-cache fetch also covers history and leagues)
+        and picks for ``gameweek`` are requested at the same time, then live
+        points for the gameweek the picks belong to. If picks don't exist yet
+        (404), the manager's last played GW is used instead, as in
+        get_manager_picks_with_fallback.
+        """
+        async def picks_or_missing() -> Union[list[Pick], httpx.HTTPStatusError]:
+            try:
+                return await self.get_manager_picks(team_id, gameweek)
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code == 404:
+                    return e
+                raise
+
+        manager, picks = await gather_or_cancel(
+            self.get_manager_info(team_id),
+            picks_or_missing(),
+        )
+
+        if isinstance(picks, httpx.HTTPStatusError):
+            if not manager.current_event or manager.current_event == gameweek:
+                # Nothing to fall back to
+                raise picks
+            gameweek = manager.current_event
+            picks, live_points = await gather_or_cancel(
+                self.get_manager_picks(team_id, gameweek),
+                self.get_live_gameweek_points(gameweek),
+            )
+        else:
+            live_points = await self.get_live_gameweek_points(gameweek)
+
+        return ManagerGameweek(manager=manager, picks=picks, gameweek=gameweek, live_points=live_points)
+
     async def get_live_gameweek_points(self, gameweek: int) -> dict[int, int]:
-        """Get live points for all players (cached 1 min)."""
+        """Get live points for all players.
+
+        Finished gameweeks are cached indefinitely; the in-progress gameweek
+        is cached for LIVE_CACHE_TTL. Up to LIVE_CACHE_MAX_GAMEWEEKS
+        gameweeks are kept, least recently used evicted first.
+        """
+        entry = self._live_cache.get(gameweek)
+        if entry is not None and (entry.finished or time.time() - entry.timestamp < self.LIVE_CACHE_TTL):
+            self._live_cache.move_to_end(gameweek)
+            return entry.points
+
+        return await self._single_flight.do(
+            ("live", gameweek), lambda: self._fetch_live_points(gameweek)
+        )
+
+    async def _fetch_live_points(self, gameweek: int) -> dict[int, int]:
+        """Download live points for a gameweek into the live cache."""
         now = time.time()
-        if (self._live_cache_gw == gameweek and 
-            now - self._live_cache_timestamp < self.LIVE_CACHE_TTL):
-            return self._live_points
-        
         logger.info(f"Fetching live points for GW{gameweek}...")
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.base_url}/event/{gameweek}/live/",
-                timeout=30.0
-            )
-            response.raise_for_status()
-            data = response.json()
-        
-        self._live_points = {}
+        gw = self.get_gameweek_by_id(gameweek)
+        finished = bool(gw and gw.finished)
+
+        data = await self._get_json(
+            f"/event/{gameweek}/live/", f"live:{gameweek}",
+            self.GLOBAL_CACHE_TTL if finished else self.LIVE_CACHE_TTL, timeout=30.0,
+        )
+
+        points = {}
         for element in data.get("elements", []):
-            self._live_points[element["id"]] = element.get("stats", {}).get("total_points", 0)
-        
-        self._live_cache_timestamp = now
-        self._live_cache_gw = gameweek
-        logger.info(f"Live points cached for GW{gameweek}")
+            points[element["id"]] = element.get("stats", {}).get("total_points", 0)
 
-        return self._live_points
+        self._live_cache[gameweek] = LivePointsCache(points=points, finished=finished, timestamp=now)
+        self._live_cache.move_to_end(gameweek)
+        while len(self._live_cache) > self.LIVE_CACHE_MAX_GAMEWEEKS:
+            self._live_cache.popitem(last=False)
+        logger.info(f"Live points cached for GW{gameweek}" + (" (finished)" if finished else ""))
+
+        return points
 
     async def calculate_free_transfers(self, team_id: int) -> int:
         """
@@ -541,12 +1108,7 @@ class FPLService:
         """Get current gameweek, or next upcoming gameweek if current deadline has passed."""
         from datetime import datetime, timezone
 
-        current_gw = None
-        for gw in self._gameweeks:
-            if gw.is_current:
-                current_gw = gw
-                break
-
+        current_gw = self._flagged_current_gameweek
         if not current_gw:
             return None
 
@@ -556,19 +1118,15 @@ class FPLService:
 
         # If deadline has passed, return next gameweek
         if now > deadline:
-            next_gw_id = current_gw.id + 1
-            for gw in self._gameweeks:
-                if gw.id == next_gw_id:
-                    return gw
+            next_gw = self._gameweeks_by_id.get(current_gw.id + 1)
+            if next_gw:
+                return next_gw
 
         return current_gw
 
     def get_gameweek_by_id(self, gw_id: int) -> Optional[Gameweek]:
         """Get a specific gameweek by ID."""
-        for gw in self._gameweeks:
-            if gw.id == gw_id:
-                return gw
-        return None
+        return self._gameweeks_by_id.get(gw_id)
 
     def get_all_players(self) -> list[Player]:
         return list(self._players.values())
@@ -586,24 +1144,25 @@ class FPLService:
 
         Returns list of {entry, entry_name, player_name, rank, total, event_total}
         """
-        now = time.time()
-
         # Check cache first
-        if league_id in self._league_cache:
-            cache_entry = self._league_cache[league_id]
-            if now - cache_entry.timestamp < self.LEAGUE_CACHE_TTL:
-                logger.debug(f"League {league_id} standings from cache")
-                return cache_entry.standings[:limit]
+        cache_entry = self._league_cache.get(league_id)
+        if cache_entry is not None:
+            logger.debug(f"League {league_id} standings from cache")
+            return cache_entry.standings[:limit]
+
+        standings = await self._single_flight.do(
+            ("league", league_id), lambda: self._fetch_league_standings(league_id)
+        )
+        return standings[:limit]
 
-        # Fetch from API
+    async def _fetch_league_standings(self, league_id: int) -> list[dict]:
+        """Download full classic league standings into the league cache."""
+        now = time.time()
         logger.info(f"Fetching league {league_id} standings from API...")
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.base_url}/leagues-classic/{league_id}/standings/",
-                timeout=30.0
-            )
-            response.raise_for_status()
-            data = response.json()
+        data = await self._get_json(
+            f"/leagues-classic/{league_id}/standings/", f"league:{league_id}",
+            self.LEAGUE_CACHE_TTL, timeout=30.0,
+        )
 
         # Parse all standings (we may need different limits later)
         standings = []
@@ -618,13 +1177,13 @@ class FPLService:
             })
 
         # Cache the full result
-        self._league_cache[league_id] = LeagueStandingsCache(
+        self._league_cache.set(league_id, LeagueStandingsCache(
             standings=standings,
             timestamp=now
-        )
+        ))
         logger.info(f"Cached league {league_id} standings ({len(standings)} entries)")
 
-        return standings[:limit]
+        return standings
     
     async def get_rival_picks(
         self,
@@ -634,7 +1193,8 @@ class FPLService:
     ) -> dict[int, set[int]]:
         """Fetch picks for multiple rivals concurrently (with caching).
 
-        Uses asyncio.gather for concurrent requests with rate limiting.
+        Uses asyncio.gather for concurrent requests; the shared FPL rate
+        limiter caps how many actually run at once across all callers.
         Results are cached by (league_id, gameweek) if league_id is provided.
 
         Returns dict mapping rival_id -> set of player_ids
@@ -643,41 +1203,34 @@ class FPLService:
 
         # Check cache if league_id provided (allows caching by context)
         if league_id is not None:
-            cache_key = (league_id, gameweek)
-            if cache_key in self._rival_cache:
-                cache_entry = self._rival_cache[cache_key]
-                if now - cache_entry.timestamp < self.RIVAL_CACHE_TTL:
-                    logger.debug(f"Rival picks for league {league_id} GW{gameweek} from cache")
-                    # Return only requested rivals from cache
-                    return {rid: cache_entry.picks.get(rid, set()) for rid in rival_ids if rid in cache_entry.picks}
-
-        # Fetch concurrently with semaphore for rate limiting
-        semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_REQUESTS)
+            cache_entry = self._rival_cache.get((league_id, gameweek))
+            if cache_entry is not None:
+                logger.debug(f"Rival picks for league {league_id} GW{gameweek} from cache")
+                # Return only requested rivals from cache
+                return {rid: cache_entry.picks.get(rid, set()) for rid in rival_ids if rid in cache_entry.picks}
+
+        # Fetch concurrently (throttled by the shared FPL rate limiter)
         rival_picks: dict[int, set[int]] = {}
 
-        async def fetch_rival(rival_id: int, client: httpx.AsyncClient) -> tuple[int, set[int] | None]:
+        async def fetch_rival(rival_id: int) -> tuple[int, set[int] | None]:
             """Fetch picks for a single rival."""
-            async with semaphore:
-                try:
-                    response = await client.get(
-                        f"{self.base_url}/entry/{rival_id}/event/{gameweek}/picks/",
-                        timeout=30.0
-                    )
-                    response.raise_for_status()
-                    data = response.json()
-
-                    picks = set()
-                    for p in data.get("picks", []):
-                        picks.add(p["element"])
-                    return rival_id, picks
-                except Exception as e:
-                    logger.warning(f"Failed to fetch picks for rival {rival_id}: {e}")
-                    return rival_id, None
+            try:
+                data = await self._get_json(
+                    f"/entry/{rival_id}/event/{gameweek}/picks/", f"picks:{rival_id}:{gameweek}",
+                    self.RIVAL_CACHE_TTL, timeout=30.0,
+                )
+
+                picks = set()
+                for p in data.get("picks", []):
+                    picks.add(p["element"])
+                return rival_id, picks
+            except Exception as e:
+                logger.warning(f"Failed to fetch picks for rival {rival_id}: {e}")
+                return rival_id, None
 
         logger.info(f"Fetching {len(rival_ids)} rival picks for GW{gameweek} concurrently...")
-        async with httpx.AsyncClient() as client:
-            tasks = [fetch_rival(rid, client) for rid in rival_ids]
-            results = await asyncio.gather(*tasks)
+        tasks = [fetch_rival(rid) for rid in rival_ids]
+        results = await asyncio.gather(*tasks)
 
         # Collect successful results
         for rival_id, picks in results:
@@ -688,33 +1241,38 @@ class FPLService:
 
         # Cache results if league_id provided
         if league_id is not None:
-            self._rival_cache[(league_id, gameweek)] = RivalPicksCache(
+            self._rival_cache.set((league_id, gameweek), RivalPicksCache(
                 picks=rival_picks,
                 gameweek=gameweek,
                 timestamp=now
-            )
+            ))
             logger.info(f"Cached rival picks for league {league_id} GW{gameweek}")
 
         return rival_picks
     
     async def get_fixtures(self) -> list[Fixture]:
         """Fetch all fixtures (cached)."""
-        if time.time() - self._fixtures_cache_timestamp < self.GLOBAL_CACHE_TTL:
-            return self._fixtures
-        
+        await self._revalidate(
+            "fixtures", self._fetch_fixtures,
+            self._fixtures_cache_timestamp, bool(self._fixtures),
+        )
+        return self._fixtures
+
+    async def _fetch_fixtures(self) -> list[Fixture]:
+        """Download and parse all fixtures, then swap them into the global cache."""
         logger.info("Fetching fixtures...")
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.base_url}/fixtures/",
-                timeout=30.0
-            )
-            response.raise_for_status()
-            data = response.json()
-        
-        self._fixtures = []
+        data, fetched_at = await self._conditional_get(
+            "fixtures", f"{self.base_url}/fixtures/", bool(self._fixtures), timeout=30.0,
+        )
+        if data is None:
+            self._fixtures_cache_timestamp = fetched_at
+            logger.info("Fixtures unchanged - extended cache without re-parsing")
+            return self._fixtures
+
+        fixtures = []
         for f in data:
-            self._fixtures.append(Fixture(
+            fixtures.append(Fixture(
                 id=f["id"],
                 event=f.get("event"),
                 team_h=f["team_h"],
@@ -726,46 +1284,65 @@ class FPLService:
                 team_a_score=f.get("team_a_score"),
                 kickoff_time=f.get("kickoff_time"),
             ))
-        
-        self._fixtures_cache_timestamp = time.time()
+
+        self._set_fixtures(fixtures)
+        self._fixtures_cache_timestamp = fetched_at
         logger.info(f"Cached {len(self._fixtures)} fixtures")
-        
+        await self._save_snapshot()
+
         return self._fixtures
     
+    async def get_fixture_matrix(self) -> FixtureMatrix:
+        """Get the team x gameweek difficulty matrix (refreshing fixtures if stale)."""
+        await self.get_fixtures()
+        return self._fixture_matrix
+
+    async def get_fixtures_for_gameweek(self, gameweek: int) -> list[Fixture]:
+        """Get all fixtures in a gameweek (cached, indexed)."""
+        await self.get_fixtures()
+        return list(self._fixture_index.by_gameweek.get(gameweek, []))
+
+    async def get_team_fixtures(self, team_ids: Iterable[int], num_gameweeks: int = 5) -> dict[int, list[dict]]:
+        """Get upcoming fixtures for many teams at once.
+
+        Returns {team_id: [{gameweek, opponent, is_home, difficulty}, ...]}
+        """
+        matrix = await self.get_fixture_matrix()
+        current_gw = self._current_gameweek or 1
+
+        result = {}
+        for team_id in team_ids:
+            if team_id in result:
+                continue
+            upcoming = []
+            for f in matrix.upcoming(team_id, current_gw + 1, num_gameweeks):
+                opponent = self._teams.get(f.opponent_id)
+                upcoming.append({
+                    "gameweek": f.gameweek,
+                    "opponent": opponent.short_name if opponent else "???",
+                    "is_home": f.is_home,
+                    "difficulty": f.fdr,
+                })
+            result[team_id] = upcoming
+        return result
+
+    async def get_players_fixtures(self, player_ids: Iterable[int], num_gameweeks: int = 5) -> dict[int, list[dict]]:
+        """Get upcoming fixtures for many players at once.
+
+        Each team's fixtures are built once and shared by its players. Unknown
+        player IDs are omitted from the result.
+        """
+        players = [p for p in (self.get_player(pid) for pid in player_ids) if p]
+        by_team = await self.get_team_fixtures({p.team for p in players}, num_gameweeks)
+        return {p.id: [dict(f) for f in by_team[p.team]] for p in players}
+
     async def get_player_fixtures(self, player_id: int, num_gameweeks: int = 5) -> list[dict]:
         """Get upcoming fixtures for a player's team.
         
         Returns list of {gameweek, opponent, is_home, difficulty}
         """
-        player = self.get_player(player_id)
-        if not player:
-            return []
-        
-        team_id = player.team
-        fixtures = await self.get_fixtures()
-        current_gw = self._current_gameweek or 1
-        
-        upcoming = []
-        for f in fixtures:
-            if f.event and current_gw < f.event <= current_gw + num_gameweeks:
-                if f.team_h == team_id:
-                    opponent = self._teams.get(f.team_a)
-                    upcoming.append({
-                        "gameweek": f.event,
-                        "opponent": opponent.short_name if opponent else "???",
-                        "is_home": True,
-                        "difficulty": f.team_h_difficulty,
-                    })
-                elif f.team_a == team_id:
-                    opponent = self._teams.get(f.team_h)
-                    upcoming.append({
-                        "gameweek": f.event,
-                        "opponent": opponent.short_name if opponent else "???",
-                        "is_home": False,
-                        "difficulty": f.team_a_difficulty,
-                    })
-        
-        return sorted(upcoming, key=lambda x: x["gameweek"])
+        fixtures = await self.get_players_fixtures([player_id], num_gameweeks)
+        return fixtures.get(player_id, [])
 
 
 # Global singleton
@@ -0,0 +1,156 @@
+"""
+Warm-start snapshot of FPL global data.
+
+FPLService writes players, teams, gameweeks and fixtures to disk after every
+successful refresh, and loads them on boot so the API can serve immediately
+while fresh data is fetched in the background.
+
+File layout:
+    MAGIC (4 bytes) | format version (uint16) | zlib(pickle(payload))
+
+Each table is stored column-named and row-oriented (field names once, then a
+tuple per row), and rows are rebuilt with ``model_construct`` so loading skips
+pydantic validation. A schema fingerprint of the model fields guards against
+loading a snapshot written by a different version of the models.
+"""
+
+import hashlib
+import logging
+import os
+import pickle
+import struct
+import tempfile
+import time
+import zlib
+from dataclasses import dataclass, field
+from typing import Optional
+
+from pydantic import BaseModel
+
+from models import Fixture, Gameweek, Player, Team
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"SPFS"
+FORMAT_VERSION = 1
+_HEADER = struct.Struct(">4sH")
+
+_TABLES: dict[str, type[BaseModel]] = {
+    "teams": Team,
+    "players": Player,
+    "gameweeks": Gameweek,
+    "fixtures": Fixture,
+}
+
+
+def schema_fingerprint() -> str:
+    """Hash of the snapshot tables' model fields; changes whenever a model does."""
+    parts = [f"{name}:{','.join(model.model_fields)}" for name, model in _TABLES.items()]
+    return hashlib.blake2b("|".join(parts).encode(), digest_size=8).hexdigest()
+
+
+@dataclass
+class FPLSnapshot:
+    """Global FPL data as stored on disk."""
+    teams: dict[int, Team] = field(default_factory=dict)
+    players: dict[int, Player] = field(default_factory=dict)
+    gameweeks: list[Gameweek] = field(default_factory=list)
+    fixtures: list[Fixture] = field(default_factory=list)
+    current_gameweek: Optional[int] = None
+    bootstrap_fetched_at: float = 0.0
+    fixtures_fetched_at: float = 0.0
+    validators: dict[str, dict] = field(default_factory=dict)
+    saved_at: float = 0.0
+
+
+def _pack_table(model: type[BaseModel], rows: list[BaseModel]) -> tuple[tuple[str, ...], list[tuple]]:
+    fields = tuple(model.model_fields)
+    return fields, [tuple(getattr(row, f) for f in fields) for row in rows]
+
+
+def _unpack_table(model: type[BaseModel], table: tuple[tuple[str, ...], list[tuple]]) -> list[BaseModel]:
+    fields, rows = table
+    construct = model.model_construct
+    return [construct(**dict(zip(fields, row))) for row in rows]
+
+
+def save_snapshot(path: str, snapshot: FPLSnapshot) -> int:
+    """
+    Write a snapshot atomically (temp file + rename) and return its size in bytes.
+
+    Blocking - call via ``asyncio.to_thread`` from async code.
+    """
+    payload = {
+        "schema": schema_fingerprint(),
+        "saved_at": time.time(),
+        "current_gameweek": snapshot.current_gameweek,
+        "bootstrap_fetched_at": snapshot.bootstrap_fetched_at,
+        "fixtures_fetched_at": snapshot.fixtures_fetched_at,
+        "validators": snapshot.validators,
+        "tables": {
+            "teams": _pack_table(Team, list(snapshot.teams.values())),
+            "players": _pack_table(Player, list(snapshot.players.values())),
+            "gameweeks": _pack_table(Gameweek, snapshot.gameweeks),
+            "fixtures": _pack_table(Fixture, snapshot.fixtures),
+        },
+    }
+    blob = _HEADER.pack(MAGIC, FORMAT_VERSION) + zlib.compress(
+        pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL), 6
+    )
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=".fpl_snapshot.", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(blob)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    return len(blob)
+
+
+def load_snapshot(path: str) -> Optional[FPLSnapshot]:
+    """
+    Load a snapshot, or return None if it is missing, corrupt or incompatible.
+
+    Blocking - call via ``asyncio.to_thread`` from async code.
+    """
+    try:
+        with open(path, "rb") as f:
+            blob = f.read()
+    except FileNotFoundError:
+        return None
+    except OSError as e:
+        logger.warning(f"Could not read FPL snapshot {path}: {e}")
+        return None
+
+    try:
+        magic, version = _HEADER.unpack_from(blob)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            logger.info(f"Ignoring FPL snapshot {path}: unsupported format (version {version})")
+            return None
+        payload = pickle.loads(zlib.decompress(blob[_HEADER.size:]))
+        if payload.get("schema") != schema_fingerprint():
+            logger.info(f"Ignoring FPL snapshot {path}: written for a different model schema")
+            return None
+
+        tables = payload["tables"]
+        teams = _unpack_table(Team, tables["teams"])
+        players = _unpack_table(Player, tables["players"])
+        return FPLSnapshot(
+            teams={t.id: t for t in teams},
+            players={p.id: p for p in players},
+            gameweeks=_unpack_table(Gameweek, tables["gameweeks"]),
+            fixtures=_unpack_table(Fixture, tables["fixtures"]),
+            current_gameweek=payload.get("current_gameweek"),
+            bootstrap_fetched_at=payload.get("bootstrap_fetched_at", 0.0),
+            fixtures_fetched_at=payload.get("fixtures_fetched_at", 0.0),
+            validators=payload.get("validators", {}),
+            saved_at=payload.get("saved_at", 0.0),
+        )
+    except Exception as e:
+        logger.warning(f"Ignoring corrupt FPL snapshot {path}: {e}")
+        return None
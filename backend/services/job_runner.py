@@ -0,0 +1,223 @@
+"""
+In-process background job runner.
+
+Long pipelines (predictor score calculation, the scheduled ML improvement
+cycle) are submitted here instead of running inside an HTTP request or a
+scheduler callback:
+
+- submit() returns immediately with a Job; callers poll get() for status,
+  the current stage and progress, per-stage timings and the final result.
+- Jobs with the same dedupe key share one run while it is queued or running,
+  so repeated POSTs or an overlapping cron tick join the job already in flight.
+- At most MAX_CONCURRENT_JOBS run at once; the rest wait in the queue, so
+  heavy jobs don't compete for the FPL rate limit, CPU and database.
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from enum import Enum
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+@dataclass
+class JobStage:
+    """Timing of one named stage of a job."""
+    name: str
+    started_at: datetime
+    elapsed_seconds: Optional[float] = None
+
+
+@dataclass
+class Job:
+    """A submitted job and everything reported about it so far."""
+    id: str
+    kind: str
+    key: str
+    trigger: str
+    status: JobStatus = JobStatus.QUEUED
+    submitted_at: datetime = field(default_factory=datetime.utcnow)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    stages: list[JobStage] = field(default_factory=list)
+    progress: Optional[Dict[str, int]] = None  # done/total within the current stage
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    _task: Optional[asyncio.Task] = field(default=None, repr=False)
+    _stage_clock: float = field(default=0.0, repr=False)
+
+    @property
+    def is_active(self) -> bool:
+        return self.status in (JobStatus.QUEUED, JobStatus.RUNNING)
+
+    @property
+    def stage(self) -> Optional[str]:
+        return self.stages[-1].name if self.is_active and self.stages else None
+
+    # ------------------------------------------------------------------
+    # Reporting (called by the job function)
+    # ------------------------------------------------------------------
+
+    def set_stage(self, name: str):
+        """Start a new stage, closing the timing of the previous one."""
+        self._end_stage()
+        self.stages.append(JobStage(name=name, started_at=datetime.utcnow()))
+        self._stage_clock = time.perf_counter()
+        self.progress = None
+
+    def set_progress(self, done: int, total: int):
+        """Report progress within the current stage (matches on_progress callbacks)."""
+        self.progress = {"done": done, "total": total}
+
+    def _end_stage(self):
+        if self.stages and self.stages[-1].elapsed_seconds is None:
+            self.stages[-1].elapsed_seconds = round(time.perf_counter() - self._stage_clock, 3)
+
+    def to_dict(self) -> Dict[str, Any]:
+        def iso(value: Optional[datetime]) -> Optional[str]:
+            return value.isoformat() if value else None
+
+        end = self.finished_at or datetime.utcnow()
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status.value,
+            "trigger": self.trigger,
+            "submitted_at": iso(self.submitted_at),
+            "started_at": iso(self.started_at),
+            "finished_at": iso(self.finished_at),
+            "elapsed_seconds": round((end - self.started_at).total_seconds(), 2) if self.started_at else None,
+            "stage": self.stage,
+            "progress": self.progress,
+            "stages": [
+                {"name": s.name, "started_at": iso(s.started_at), "elapsed_seconds": s.elapsed_seconds}
+                for s in self.stages
+            ],
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+JobFunction = Callable[[Job], Awaitable[Optional[Dict[str, Any]]]]
+
+
+class JobRunner:
+    """Runs deduplicated background jobs on the event loop, a few at a time."""
+
+    MAX_CONCURRENT_JOBS = 1
+    MAX_FINISHED_JOBS = 50  # history kept for status queries
+
+    def __init__(self, max_concurrent: Optional[int] = None):
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._active: Dict[str, Job] = {}  # dedupe key -> queued/running job
+        self._slots = asyncio.Semaphore(max_concurrent or self.MAX_CONCURRENT_JOBS)
+
+    def submit(
+        self,
+        kind: str,
+        fn: JobFunction,
+        key: Optional[str] = None,
+        trigger: str = "api",
+    ) -> tuple[Job, bool]:
+        """
+        Queue a job, or join the identical one already queued or running.
+
+        Args:
+            kind: Job type, e.g. "predictor_calculate"
+            fn: Coroutine function run with the Job (for stage/progress
+                reporting); its return value becomes the job result
+            key: Dedupe key (default: kind)
+            trigger: Who asked for it ("api", "scheduled", ...)
+
+        Returns:
+            (job, created) - created is False when an in-flight job was reused
+        """
+        key = key or kind
+        existing = self._active.get(key)
+        if existing is not None:
+            logger.info(f"Job {kind} already {existing.status.value} as {existing.id} - joining it")
+            return existing, False
+
+        job = Job(id=uuid.uuid4().hex[:12], kind=kind, key=key, trigger=trigger)
+        self._jobs[job.id] = job
+        self._active[key] = job
+        job._task = asyncio.create_task(self._run(job, fn), name=f"job-{kind}-{job.id}")
+        logger.info(f"Queued job {kind} ({job.id}, trigger={trigger})")
+        return job, True
+
+    async def _run(self, job: Job, fn: JobFunction):
+        try:
+            async with self._slots:
+                job.status = JobStatus.RUNNING
+                job.started_at = datetime.utcnow()
+                job.result = await fn(job)
+                job.status = JobStatus.SUCCEEDED
+        except asyncio.CancelledError:
+            job.status = JobStatus.CANCELLED
+        except Exception as e:
+            logger.error(f"Job {job.kind} ({job.id}) failed: {e}")
+            job.status = JobStatus.FAILED
+            job.error = str(e)
+        finally:
+            job._end_stage()
+            job.progress = None
+            job.finished_at = datetime.utcnow()
+            self._active.pop(job.key, None)
+            self._prune()
+            logger.info(f"Job {job.kind} ({job.id}) {job.status.value}")
+
+    def _prune(self):
+        finished = [job_id for job_id, job in self._jobs.items() if not job.is_active]
+        for job_id in finished[:max(0, len(finished) - self.MAX_FINISHED_JOBS)]:
+            del self._jobs[job_id]
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def list(self, kind: Optional[str] = None, limit: int = 20) -> list[Job]:
+        """Most recent jobs first."""
+        jobs = [job for job in reversed(self._jobs.values()) if kind is None or job.kind == kind]
+        return jobs[:limit]
+
+    async def wait(self, job: Job) -> Job:
+        """Wait for a job to finish without cancelling it if the waiter goes away."""
+        if job._task is not None:
+            await asyncio.shield(job._task)
+        return job
+
+    async def shutdown(self):
+        """Cancel queued and running jobs (application shutdown)."""
+        tasks = [job._task for job in self._active.values() if job._task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+# Singleton instance
+_job_runner: Optional[JobRunner] = None
+
+
+def get_job_runner() -> JobRunner:
+    """Get the singleton job runner."""
+    global _job_runner
+    if _job_runner is None:
+        _job_runner = JobRunner()
+    return _job_runner
@@ -10,18 +10,17 @@ This service integrates ML predictions into the squad builder without
 requiring model retraining.
 """
 
-import os
+import asyncio
 import logging
 from dataclasses import dataclass
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 import numpy as np
+import pandas as pd
 
-try:
-    import joblib
-    JOBLIB_AVAILABLE = True
-except ImportError:
-    import pickle
-    JOBLIB_AVAILABLE = False
+from services.feature_store import DEFAULT_FDR, STAGE1_FEATURES, get_feature_store
+from services.fixture_matrix import FDR_WINDOW_GAMEWEEKS
+from services.model_registry import get_model_registry
+from services.points_model_service import get_points_model_service
 
 logger = logging.getLogger(__name__)
 
@@ -66,6 +65,18 @@ class PlayerPrediction:
     availability_reason: str
     chance_of_playing: Optional[int]
 
+    # Stage 2 points models (None until predictor scores exist)
+    expected_points: Optional[float] = None
+
+
+@dataclass(frozen=True)
+class Stage1Model:
+    """The Stage 1 classifier with the scaler and feature order it was trained with."""
+    model: Any
+    scaler: Any
+    features: Optional[List[str]]
+    source: str  # registry name@version
+
 
 class MLPredictorService:
     """
@@ -74,107 +85,97 @@ class MLPredictorService:
     Loads trained models and provides predictions without retraining.
     """
 
-    MODEL_DIR = os.path.join(os.path.dirname(__file__), "..", "ml", "models")
+    # Registry artifacts (ml/models, see services/model_registry.py). The array
+    # export of the forest is served when present, else the pickled pipeline.
+    STAGE1_ARRAY_ARTIFACT = "stage1_forest"
+    STAGE1_ARTIFACTS = ("stage1_random_forest", "scaler_stage1", "stage1_features")
 
     def __init__(self):
         self._fpl_service = None
         self._kg_service = None
 
-        # Models
-        self._stage1_model = None
-        self._stage1_scaler = None
-        self._stage1_features = None
-        self._models_loaded = False
+        # Models (swapped as one object when a new version is deployed)
+        self._registry = get_model_registry()
+        self._stage1: Optional[Stage1Model] = None
 
         # Team fixture difficulty cache
         self._team_fdr: Dict[int, float] = {}
         self._team_is_home: Dict[int, bool] = {}
+        self._team_next_fdr: Dict[int, float] = {}
+
+        # Next-gameweek feature rows from the feature store, by player id
+        self._stage1_rows: Optional[pd.DataFrame] = None
+        # Persisted gameweek histories, used until the predictor publishes scores
+        self._stored_history: Optional[pd.DataFrame] = None
 
         # Load models on init
         self._load_models()
+        self._registry.on_deploy(self._on_model_deployed)
 
     def set_services(self, fpl_service, kg_service=None):
         """Set FPL and KG services for data access."""
         self._fpl_service = fpl_service
         self._kg_service = kg_service
 
-    def _validate_model_path(self, path: str) -> bool:
-        """
-        SECURITY: Validate that model path is within allowed directory.
-
-        This prevents path traversal attacks if paths are ever user-influenced.
-        """
-        # Resolve to absolute paths
-        model_dir = os.path.realpath(self.MODEL_DIR)
-        resolved_path = os.path.realpath(path)
-
-        # Ensure the path is within MODEL_DIR
-        if not resolved_path.startswith(model_dir):
-            logger.warning(f"SECURITY: Attempted to load model from outside MODEL_DIR: {path}")
-            return False
+    @property
+    def _models_loaded(self) -> bool:
+        return self._stage1 is not None
 
-        # Ensure it's a .pkl file
-        if not resolved_path.endswith('.pkl'):
-            logger.warning(f"SECURITY: Attempted to load non-pkl file: {path}")
-            return False
+    def _load_stage1(self) -> Optional[Stage1Model]:
+        """Serving Stage 1 model from the registry, or None if there is none."""
+        registry = self._registry
+        if registry.has(self.STAGE1_ARRAY_ARTIFACT):
+            try:
+                exported = registry.get(self.STAGE1_ARRAY_ARTIFACT)
+                return Stage1Model(
+                    model=exported.forest,
+                    scaler=exported.scaler,
+                    features=exported.feature_names,
+                    source=f"{self.STAGE1_ARRAY_ARTIFACT}@{registry.serving_version(self.STAGE1_ARRAY_ARTIFACT)}",
+                )
+            except Exception as e:
+                logger.warning(f"Stage 1 array export unusable ({e}) - loading pickled model")
 
-        return True
+        model_name, scaler_name, features_name = self.STAGE1_ARTIFACTS
+        if not registry.has(model_name):
+            return None
+        return Stage1Model(
+            model=registry.get(model_name),
+            scaler=registry.get(scaler_name) if registry.has(scaler_name) else None,
+            features=registry.get(features_name) if registry.has(features_name) else None,
+            source=f"{model_name}@{registry.serving_version(model_name)}",
+        )
 
-    def _secure_load(self, path: str):
+    def _load_models(self):
         """
-        Securely load a pickle file with validation.
+        Load trained models through the model registry.
 
-        SECURITY NOTE: Pickle deserialization can execute arbitrary code.
-        This function only loads files from the trusted MODEL_DIR and
-        uses joblib when available (which provides some additional safety).
+        Stage 1 comes from its array export (memory-mapped NumPy arrays,
+        no scikit-learn needed) when present, else from the joblib pickles.
         """
-        if not self._validate_model_path(path):
-            raise ValueError(f"Invalid model path: {path}")
-
-        if not os.path.exists(path):
-            return None
-
-        # Prefer joblib for scikit-learn models (safer and faster)
-        if JOBLIB_AVAILABLE:
-            return joblib.load(path)
-        else:
-            # Fallback to pickle with file properly closed
-            # WARNING: pickle.load can execute arbitrary code
-            logger.warning("Using pickle fallback - joblib not available")
-            with open(path, 'rb') as f:
-                return pickle.load(f)
-
-    def _load_models(self):
-        """Load trained models from disk using joblib (secure loading)."""
         try:
-            # Load Stage 1 model (P(plays) prediction)
-            stage1_path = os.path.join(self.MODEL_DIR, "stage1_random_forest.pkl")
-            scaler_path = os.path.join(self.MODEL_DIR, "scaler_stage1.pkl")
-            features_path = os.path.join(self.MODEL_DIR, "stage1_features.pkl")
-
-            # SECURITY: Validate paths before loading
-            if os.path.exists(stage1_path) and self._validate_model_path(stage1_path):
-                self._stage1_model = self._secure_load(stage1_path)
-                logger.info("Loaded Stage 1 model (Random Forest)")
+            self._stage1 = self._load_stage1()
 
-            if os.path.exists(scaler_path) and self._validate_model_path(scaler_path):
-                self._stage1_scaler = self._secure_load(scaler_path)
-                logger.info("Loaded Stage 1 scaler")
-
-            if os.path.exists(features_path) and self._validate_model_path(features_path):
-                self._stage1_features = self._secure_load(features_path)
-                logger.info(f"Loaded Stage 1 features: {len(self._stage1_features)} features")
-
-            self._models_loaded = self._stage1_model is not None
-
-            if self._models_loaded:
-                logger.info("ML Predictor Service: Models loaded successfully")
+            if self._stage1 is not None:
+                logger.info(f"ML Predictor Service: Stage 1 model loaded ({self._stage1.source})")
             else:
                 logger.warning("ML Predictor Service: No models found, using fallback")
 
         except Exception as e:
             logger.error(f"Error loading models: {e}")
-            self._models_loaded = False
+            self._stage1 = None
+
+    def _on_model_deployed(self, name: str, version: str, model):
+        """Registry hook: swap in a newly deployed Stage 1 model."""
+        if name != self.STAGE1_ARRAY_ARTIFACT and name not in self.STAGE1_ARTIFACTS:
+            return
+        stage1 = self._load_stage1()
+        if stage1 is None:
+            logger.warning(f"Deploy of {name}@{version} left no usable Stage 1 model - keeping the current one")
+            return
+        # One reference swap: predictions in flight finish on the model they started with
+        self._stage1 = stage1
+        logger.info(f"ML Predictor Service: now serving Stage 1 model {stage1.source}")
 
     @property
     def is_ready(self) -> bool:
@@ -186,43 +187,55 @@ class MLPredictorService:
         if not self._fpl_service:
             return
 
-        fixtures = await self._fpl_service.get_fixtures()
+        fixture_matrix = await self._fpl_service.get_fixture_matrix()
         current_gw_obj = self._fpl_service.get_current_gameweek()
         current_gw = current_gw_obj.id if hasattr(current_gw_obj, 'id') else current_gw_obj
 
-        self._team_fdr = {}
+        # Average FDR over the next 3 GWs, home/away from the current GW's first fixture
+        self._team_fdr = fixture_matrix.mean_fdr(current_gw, FDR_WINDOW_GAMEWEEKS)
         self._team_is_home = {}
+        self._team_next_fdr = {}
+        for team_id in fixture_matrix.team_ids:
+            fixtures = fixture_matrix.upcoming(team_id, current_gw, 1)
+            if fixtures:
+                self._team_is_home[team_id] = fixtures[0].is_home
+                self._team_next_fdr[team_id] = float(fixtures[0].fdr)
+
+    def update_feature_rows(self, players: List):
+        """
+        Build next-gameweek Stage 1 feature rows with the feature store.
+
+        Uses the gameweek histories behind PredictorService's current score
+        snapshot (or, before the first calculation, the ones persisted in the
+        player history store), so players are scored on the features the
+        model was trained on. Without histories, players fall back to the
+        approximations in _build_stage1_features.
+        Blocking - call via asyncio.to_thread from async code.
+        """
+        from services.player_history_store import get_player_history_store
+        from services.predictor_service import get_predictor_service
+
+        history = get_predictor_service().snapshot.history
+        if history is None:
+            if self._stored_history is None or len(self._stored_history) == 0:
+                self._stored_history = get_player_history_store().load()
+            history = self._stored_history
+        if len(history) == 0:
+            self._stage1_rows = None
+            return
 
-        # Get next 3 GWs for FDR calculation
-        gws_to_check = range(current_gw, min(current_gw + 3, 39))
-
-        team_fdrs = {}
-
-        for fixture in fixtures:
-            gw = getattr(fixture, 'event', None)
-            if gw and gw in gws_to_check:
-                home_team = getattr(fixture, 'team_h', None)
-                away_team = getattr(fixture, 'team_a', None)
-                home_fdr = getattr(fixture, 'team_h_difficulty', 3)
-                away_fdr = getattr(fixture, 'team_a_difficulty', 3)
-
-                if home_team:
-                    if home_team not in team_fdrs:
-                        team_fdrs[home_team] = []
-                    team_fdrs[home_team].append(home_fdr)
-                    if gw == current_gw:
-                        self._team_is_home[home_team] = True
-
-                if away_team:
-                    if away_team not in team_fdrs:
-                        team_fdrs[away_team] = []
-                    team_fdrs[away_team].append(away_fdr)
-                    if gw == current_gw:
-                        self._team_is_home[away_team] = False
-
-        # Average FDR for each team
-        for team_id, fdrs in team_fdrs.items():
-            self._team_fdr[team_id] = sum(fdrs) / len(fdrs) if fdrs else 3.0
+        upcoming = pd.DataFrame({
+            'player_id': [p.id for p in players],
+            'position': [p.position for p in players],
+            'price': [p.price for p in players],
+            'is_home': [int(self._team_is_home.get(p.team, False)) for p in players],
+            'fdr': [self._team_next_fdr.get(p.team, DEFAULT_FDR) for p in players],
+        })
+        try:
+            self._stage1_rows = get_feature_store().online(history, upcoming)
+        except Exception as e:
+            logger.warning(f"Feature store failed ({e}) - using approximate Stage 1 features")
+            self._stage1_rows = None
 
     def check_availability(self, player) -> Tuple[bool, str]:
         """
@@ -347,6 +360,55 @@ class MLPredictorService:
 
         Returns probability 0-1.
         """
+        fixed = self._p_plays_from_status(player)
+        if fixed is not None:
+            return fixed
+
+        # If model is loaded, use it
+        stage1 = self._stage1
+        if stage1 is not None:
+            try:
+                features = self._stage1_feature_matrix(stage1, [player], current_gw)
+                return float(self._stage1_probabilities(stage1, features)[0])
+            except Exception as e:
+                logger.warning(f"Model prediction failed for {player.web_name}: {e}")
+
+        return self._p_plays_fallback(player, current_gw)
+
+    def predict_p_plays_batch(self, players: List, current_gw: int) -> List[float]:
+        """
+        Predict probability of playing for many players at once.
+
+        Same results as calling predict_p_plays per player, but everyone the
+        model has to score goes through the scaler and the Stage 1 model as
+        one feature matrix instead of one single-row call each.
+
+        Returns:
+            Probabilities (0-1) aligned with ``players``
+        """
+        p_plays: List[Optional[float]] = [self._p_plays_from_status(player) for player in players]
+        pending = [i for i, p in enumerate(p_plays) if p is None]
+
+        stage1 = self._stage1  # the same model for the whole batch, even across a deploy
+        if pending and stage1 is not None:
+            try:
+                features = self._stage1_feature_matrix(stage1, [players[i] for i in pending], current_gw)
+                for i, p in zip(pending, self._stage1_probabilities(stage1, features).tolist()):
+                    p_plays[i] = p
+            except Exception as e:
+                # One bad row shouldn't cost everyone the model
+                logger.warning(f"Batch Stage 1 prediction failed ({e}) - predicting players one by one")
+                for i in pending:
+                    p_plays[i] = self.predict_p_plays(players[i], current_gw)
+            pending = []
+
+        for i in pending:
+            p_plays[i] = self._p_plays_fallback(players[i], current_gw)
+
+        return p_plays
+
+    def _p_plays_from_status(self, player) -> Optional[float]:
+        """P(plays) settled by availability or chance_of_playing_next_round, else None."""
         # First check availability status
         is_available, _ = self.check_availability(player)
         if not is_available:
@@ -357,29 +419,40 @@ class MLPredictorService:
         if chance is not None:
             return chance / 100.0
 
-        # If model is loaded, use it
-        if self._models_loaded and self._stage1_model:
-            try:
-                features = self._build_stage1_features(player, current_gw)
-                if self._stage1_scaler:
-                    features_scaled = self._stage1_scaler.transform([features])
-                else:
-                    features_scaled = [features]
-
-                # Get probability from model
-                if hasattr(self._stage1_model, 'predict_proba'):
-                    proba = self._stage1_model.predict_proba(features_scaled)[0]
-                    # Probability of playing (class 1)
-                    return float(proba[1]) if len(proba) > 1 else float(proba[0])
-                else:
-                    # Binary prediction
-                    pred = self._stage1_model.predict(features_scaled)[0]
-                    return 1.0 if pred == 1 else 0.0
-
-            except Exception as e:
-                logger.warning(f"Model prediction failed for {player.web_name}: {e}")
-
-        # Fallback: Use nailedness as proxy
+        return None
+
+    def _stage1_feature_matrix(self, stage1: Stage1Model, players: List, current_gw: int) -> np.ndarray:
+        """Stage 1 features (one row per player): feature store rows, else approximations."""
+        features = stage1.features or STAGE1_FEATURES
+        rows = self._stage1_rows
+        if rows is None or not set(features) <= set(rows.columns):
+            return np.array([self._build_stage1_features(p, current_gw) for p in players], dtype=float)
+
+        X = rows[features].reindex([p.id for p in players]).to_numpy(dtype=float)
+        for i in np.flatnonzero(np.isnan(X).any(axis=1)):
+            X[i] = self._build_stage1_features(players[i], current_gw)
+        return X
+
+    def _stage1_probabilities(self, stage1: Stage1Model, features: np.ndarray) -> np.ndarray:
+        """Run the Stage 1 model on a feature matrix (one row per player)."""
+        if stage1.scaler:
+            # Fitted on a DataFrame: name the columns (avoids a warning per call)
+            names = getattr(stage1.scaler, 'feature_names_in_', None)
+            if names is not None and len(names) == features.shape[1]:
+                features = pd.DataFrame(features, columns=names)
+            features = stage1.scaler.transform(features)
+
+        # Get probability from model
+        if hasattr(stage1.model, 'predict_proba'):
+            proba = stage1.model.predict_proba(features)
+            # Probability of playing (class 1)
+            return proba[:, 1] if proba.shape[1] > 1 else proba[:, 0]
+
+        # Binary prediction
+        return (stage1.model.predict(features) == 1).astype(float)
+
+    def _p_plays_fallback(self, player, current_gw: int) -> float:
+        """P(plays) without the model: nailedness as a proxy."""
         nailedness = self.compute_nailedness_score(player, current_gw)
 
         # Adjust based on status
@@ -392,7 +465,8 @@ class MLPredictorService:
         """
         Build feature vector for Stage 1 model.
 
-        Many features need to be approximated from available data.
+        Many features need to be approximated from available data. Only used
+        for players without a feature store row (no gameweek history loaded).
         """
         games_so_far = max(1, current_gw - 1)
         minutes = player.minutes or 0
@@ -487,18 +561,20 @@ class MLPredictorService:
         await self.update_fixture_data()
 
         players = self._fpl_service.get_all_players()
+        await asyncio.to_thread(self.update_feature_rows, players)
         current_gw_obj = self._fpl_service.get_current_gameweek()
         current_gw = current_gw_obj.id if hasattr(current_gw_obj, 'id') else current_gw_obj
 
+        # Predict probability of playing for everyone in one model call
+        all_p_plays = self.predict_p_plays_batch(players, current_gw)
+        expected_points = await self._expected_points()
+
         predictions = []
 
-        for player in players:
+        for player, p_plays in zip(players, all_p_plays):
             # Check availability
             is_available, availability_reason = self.check_availability(player)
 
-            # Predict probability of playing
-            p_plays = self.predict_p_plays(player, current_gw)
-
             # Compute ML score
             ml_score, breakdown = self.compute_ml_score(player, current_gw)
 
@@ -519,6 +595,7 @@ class MLPredictorService:
                 is_available=is_available,
                 availability_reason=availability_reason,
                 chance_of_playing=player.chance_of_playing_next_round,
+                expected_points=expected_points.get(player.id),
             ))
 
         # Sort by ML score descending
@@ -526,6 +603,25 @@ class MLPredictorService:
 
         return predictions
 
+    async def _expected_points(self) -> Dict[int, float]:
+        """Stage 2 expected points for the predictor's current snapshot ({} if unavailable)."""
+        from services.predictor_service import get_predictor_service
+
+        predictor = get_predictor_service()
+        if not predictor.is_initialized:
+            return {}
+        try:
+            predictions = await asyncio.to_thread(get_points_model_service().predict, predictor)
+        except Exception as e:
+            logger.warning(f"Stage 2 points prediction failed: {e}")
+            return {}
+        return predictions.points
+
+    def _cached_expected_points(self) -> Dict[int, float]:
+        """Latest cached Stage 2 expected points, without computing any."""
+        predictions = get_points_model_service().cached()
+        return predictions.points if predictions else {}
+
     def filter_available_players(self, players: List,
                                   min_p_plays: float = 0.5) -> List:
         """
@@ -544,15 +640,10 @@ class MLPredictorService:
         current_gw_obj = self._fpl_service.get_current_gameweek()
         current_gw = current_gw_obj.id if hasattr(current_gw_obj, 'id') else current_gw_obj
 
-        available = []
-        for player in players:
-            is_available, _ = self.check_availability(player)
-            if not is_available:
-                continue
+        candidates = [player for player in players if self.check_availability(player)[0]]
+        p_plays = self.predict_p_plays_batch(candidates, current_gw)
 
-            p_plays = self.predict_p_plays(player, current_gw)
-            if p_plays >= min_p_plays:
-                available.append(player)
+        available = [player for player, p in zip(candidates, p_plays) if p >= min_p_plays]
 
         return available
 
@@ -586,6 +677,7 @@ class MLPredictorService:
             is_available=is_available,
             availability_reason=availability_reason,
             chance_of_playing=player.chance_of_playing_next_round,
+            expected_points=self._cached_expected_points().get(player.id),
         )
 
 
@@ -9,6 +9,7 @@ Handles:
 - Continuous improvement of SmartPlay Score
 """
 
+import asyncio
 import os
 import json
 import logging
@@ -17,7 +18,7 @@ from typing import Dict, List, Optional, Tuple
 import numpy as np
 
 from database import (
-    SessionLocal, ModelVersion, PredictionLog, AccuracyReport, RetrainingLog
+    SessionLocal, ModelVersion, PredictionLog, AccuracyReport, RetrainingLog, bulk_upsert
 )
 
 logger = logging.getLogger(__name__)
@@ -125,45 +126,56 @@ class MLRetrainingService:
         model_version = self._get_current_version()
         predictions = await self._predictor_service.predict_all_players()
 
+        now = datetime.utcnow()
+        rows = [
+            {
+                "model_version": model_version,
+                "gameweek": gameweek,
+                "player_id": int(pred.player_id),
+                "player_name": pred.player_name,
+                "position": pred.position,
+                "team_id": int(pred.team_id),
+                "predicted_score": float(pred.ml_score),
+                "p_plays": float(pred.p_plays),
+                "nailedness_score": float(pred.nailedness_score),
+                "form_xg_score": float(pred.form_score_xg),
+                "form_pts_score": float(pred.form_score_pts),
+                "fixture_score": float(pred.fixture_score),
+                # Re-logging starts the validation over, as a fresh row would
+                "actual_points": None,
+                "actual_minutes": None,
+                "did_play": None,
+                "prediction_error": None,
+                "absolute_error": None,
+                "predicted_at": now,
+                "validated_at": None,
+            }
+            for pred in predictions
+        ]
+
+        write_stats = await asyncio.to_thread(self._write_prediction_logs, rows, gameweek, model_version, now)
+        logger.info(f"Logged {len(rows)} predictions for GW{gameweek} using model {model_version}")
+
+        return {
+            "gameweek": gameweek,
+            "model_version": model_version,
+            "predictions_logged": len(rows),
+            "rows_per_second": write_stats["rows_per_second"],
+            "timestamp": now.isoformat()
+        }
+
+    def _write_prediction_logs(self, rows: List[Dict], gameweek: int, model_version: str, logged_at: datetime) -> Dict:
+        """Upsert one gameweek's prediction logs and drop players no longer predicted (blocking)."""
         db = SessionLocal()
-        logged = 0
-
         try:
-            # Clear any existing predictions for this GW + version
+            stats = bulk_upsert(db, PredictionLog, rows, ["model_version", "gameweek", "player_id"])
             db.query(PredictionLog).filter(
                 PredictionLog.gameweek == gameweek,
-                PredictionLog.model_version == model_version
-            ).delete()
-
-            for pred in predictions:
-                log = PredictionLog(
-                    model_version=model_version,
-                    gameweek=gameweek,
-                    player_id=pred.player_id,
-                    player_name=pred.player_name,
-                    position=pred.position,
-                    team_id=pred.team_id,
-                    predicted_score=pred.ml_score,
-                    p_plays=pred.p_plays,
-                    nailedness_score=pred.nailedness_score,
-                    form_xg_score=pred.form_score_xg,
-                    form_pts_score=pred.form_score_pts,
-                    fixture_score=pred.fixture_score,
-                )
-                db.add(log)
-                logged += 1
-
+                PredictionLog.model_version == model_version,
+                PredictionLog.predicted_at < logged_at,
+            ).delete(synchronize_session=False)
             db.commit()
-
-            logger.info(f"Logged {logged} predictions for GW{gameweek} using model {model_version}")
-
-            return {
-                "gameweek": gameweek,
-                "model_version": model_version,
-                "predictions_logged": logged,
-                "timestamp": datetime.utcnow().isoformat()
-            }
-
+            return stats
         except Exception as e:
             db.rollback()
             logger.error(f"Failed to log predictions: {e}")
@@ -12,13 +12,17 @@ The model learns from historical gameweek data to understand:
 - The relationship between form and future performance
 """
 
+import asyncio
 import logging
 import numpy as np
+import pandas as pd
 from dataclasses import dataclass, field
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 import json
 
+from services.feature_store import build_features
+
 logger = logging.getLogger(__name__)
 
 # Try to import sklearn, fall back to manual implementation if not available
@@ -238,8 +242,6 @@ class MLService:
         if not self._fpl_service:
             raise ValueError("FPL service not set")
         
-        import httpx
-        
         self._training_data = []
         players = self._fpl_service.get_all_players()
         teams = self._fpl_service.get_all_teams()
@@ -247,107 +249,61 @@ class MLService:
         # Build team name and FDR maps
         self._team_names = {t.id: t.short_name for t in teams}
         
-        # Get fixtures to calculate FDR
-        fixtures = self._fpl_service.get_fixtures()
-        team_difficulties = {}
-        for fixture in fixtures:
-            if fixture.get("event") and fixture.get("finished"):
-                team_h = fixture.get("team_h")
-                team_a = fixture.get("team_a")
-                if team_h:
-                    if team_h not in team_difficulties:
-                        team_difficulties[team_h] = []
-                    team_difficulties[team_h].append(fixture.get("team_h_difficulty", 3))
-                if team_a:
-                    if team_a not in team_difficulties:
-                        team_difficulties[team_a] = []
-                    team_difficulties[team_a].append(fixture.get("team_a_difficulty", 3))
-        
-        self._team_fdr_map = {
-            team_id: sum(fdrs) / len(fdrs) if fdrs else 3.0
-            for team_id, fdrs in team_difficulties.items()
-        }
+        # Season FDR faced so far, from finished fixtures
+        fixtures = await self._fpl_service.get_fixtures()
+        fixture_matrix = await self._fpl_service.get_fixture_matrix()
+        self._team_fdr_map = fixture_matrix.mean_fdr(1, fixture_matrix.num_gameweeks, finished=True)
         
         # Filter to players with significant minutes
         active_players = [p for p in players if (p.minutes or 0) > 200]
         active_players = sorted(active_players, key=lambda x: x.total_points or 0, reverse=True)
         active_players = active_players[:max_players]
         
-        collected = 0
-        errors = 0
-        
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            for player in active_players:
-                try:
-                    # Fetch player's GW history
-                    response = await client.get(
-                        f"https://fantasy.premierleague.com/api/element-summary/{player.id}/",
-                        headers={"User-Agent": "GraphFPL-ML-Model"}
-                    )
-                    
-                    if response.status_code != 200:
-                        errors += 1
-                        continue
-                    
-                    data = response.json()
-                    history = data.get("history", [])
-                    
-                    # Calculate rolling form for each GW
-                    points_history = []
-                    
-                    for gw_data in history:
-                        gw = gw_data.get("round", 0)
-                        minutes = gw_data.get("minutes", 0)
-                        
-                        # Skip GWs with no minutes
-                        if minutes == 0:
-                            points_history.append(0)
-                            continue
-                        
-                        # Calculate form (avg of previous 5 GWs)
-                        if len(points_history) >= 5:
-                            form = sum(points_history[-5:]) / 5
-                        elif len(points_history) > 0:
-                            form = sum(points_history) / len(points_history)
-                        else:
-                            form = 0
-                        
-                        opponent = gw_data.get("opponent_team", 0)
-                        opponent_fdr = self._team_fdr_map.get(opponent, 3.0)
-                        
-                        gw_record = PlayerGameweek(
-                            player_id=player.id,
-                            player_name=player.web_name,
-                            position=player.position,
-                            team_id=player.team,
-                            gameweek=gw,
-                            total_points=gw_data.get("total_points", 0),
-                            minutes=minutes,
-                            was_home=gw_data.get("was_home", False),
-                            opponent_team=opponent,
-                            opponent_fdr=opponent_fdr,
-                            goals_scored=gw_data.get("goals_scored", 0),
-                            assists=gw_data.get("assists", 0),
-                            clean_sheets=gw_data.get("clean_sheets", 0),
-                            bonus=gw_data.get("bonus", 0),
-                            bps=gw_data.get("bps", 0),
-                            expected_goals=float(gw_data.get("expected_goals", 0) or 0),
-                            expected_assists=float(gw_data.get("expected_assists", 0) or 0),
-                            ict_index=float(gw_data.get("ict_index", 0) or 0),
-                            price=gw_data.get("value", 0) / 10,
-                            form=form,
-                            ownership=gw_data.get("selected", 0) / 100000,  # Normalize
-                        )
-                        
-                        self._training_data.append(gw_record)
-                        points_history.append(gw_data.get("total_points", 0))
-                    
-                    collected += 1
-                    
-                except Exception as e:
-                    logger.warning(f"Error fetching player {player.id}: {e}")
-                    errors += 1
-        
+        # Sync the persistent history store (only players whose history changed are fetched)
+        histories = await self._load_player_histories(active_players, fixtures)
+        players_by_id = {p.id: p for p in active_players}
+        collected = len(histories)
+        errors = len(active_players) - collected
+
+        records = [
+            dict(gw_data, player_id=player_id)
+            for player_id, history in histories.items()
+            for gw_data in history
+        ]
+        if records:
+            # Form (mean points of the previous 5 GWs) and opponent FDR from the feature store
+            features = build_features(pd.DataFrame.from_records(records), team_fdr=self._team_fdr_map)
+
+            # Skip GWs with no minutes
+            played = features[features['minutes'] > 0]
+            for index, row in zip(played.index, played.itertuples(index=False)):
+                gw_data = records[index]
+                player = players_by_id[row.player_id]
+
+                self._training_data.append(PlayerGameweek(
+                    player_id=player.id,
+                    player_name=player.web_name,
+                    position=player.position,
+                    team_id=player.team,
+                    gameweek=int(row.gameweek),
+                    total_points=gw_data.get("total_points", 0),
+                    minutes=gw_data.get("minutes", 0),
+                    was_home=gw_data.get("was_home", False),
+                    opponent_team=gw_data.get("opponent_team", 0),
+                    opponent_fdr=float(row.fdr),
+                    goals_scored=gw_data.get("goals_scored", 0),
+                    assists=gw_data.get("assists", 0),
+                    clean_sheets=gw_data.get("clean_sheets", 0),
+                    bonus=gw_data.get("bonus", 0),
+                    bps=gw_data.get("bps", 0),
+                    expected_goals=float(gw_data.get("expected_goals", 0) or 0),
+                    expected_assists=float(gw_data.get("expected_assists", 0) or 0),
+                    ict_index=float(gw_data.get("ict_index", 0) or 0),
+                    price=gw_data.get("value", 0) / 10,
+                    form=float(row.points_avg_last5),
+                    ownership=gw_data.get("selected", 0) / 100000,  # Normalize
+                ))
+
         return {
             "players_collected": collected,
             "total_samples": len(self._training_data),
@@ -355,6 +311,42 @@ class MLService:
             "positions": self._count_by_position(),
         }
     
+    async def _load_player_histories(self, players: list, fixtures: list) -> Dict[int, List[dict]]:
+        """
+        Get element-summary history for players via the persistent history store.
+
+        Players missing from the result could not be fetched.
+        """
+        from services.player_history_store import get_player_history_store
+        from services.predictor_service import get_predictor_service
+
+        fetcher = get_predictor_service()
+        store = get_player_history_store()
+        player_ids = [p.id for p in players]
+        try:
+            stats = await store.sync(
+                [{"id": p.id, "team": p.team, "total_points": p.total_points,
+                  "minutes": p.minutes, "now_cost": p.now_cost} for p in players],
+                [f.model_dump() for f in fixtures],
+                fetcher.fetch_history_records,
+            )
+            histories = await asyncio.to_thread(store.load_records, player_ids)
+            # Players that failed keep their previously stored rows, if any
+            failed = set(stats.get("fetch", {}).get("failed_player_ids", []))
+            return {
+                pid: histories.get(pid, [])
+                for pid in player_ids
+                if pid in histories or pid not in failed
+            }
+        except Exception as e:
+            logger.warning(f"Player history store unavailable ({e}) - fetching all histories")
+            records, stats = await fetcher.fetch_history_records(player_ids)
+            failed = set(stats.get("failed_player_ids", []))
+            histories = {pid: [] for pid in player_ids if pid not in failed}
+            for record in records:
+                histories[record["player_id"]].append(record)
+            return histories
+
     def _count_by_position(self) -> Dict[str, int]:
         """Count samples by position."""
         counts = {}
@@ -499,28 +491,20 @@ class MLService:
             raise ValueError("FPL service not set")
         
         players = self._fpl_service.get_all_players()
-        fixtures = self._fpl_service.get_fixtures()
-        current_gw = self._fpl_service.get_current_gameweek()
+        fixture_matrix = await self._fpl_service.get_fixture_matrix()
+        current_gw_obj = self._fpl_service.get_current_gameweek()
+        current_gw = current_gw_obj.id if hasattr(current_gw_obj, 'id') else current_gw_obj
         
         # Get next fixture for each team
         team_next_fixture = {}
-        for fixture in fixtures:
-            gw = fixture.get("event")
-            if gw == current_gw:
-                team_h = fixture.get("team_h")
-                team_a = fixture.get("team_a")
-                if team_h and team_h not in team_next_fixture:
-                    team_next_fixture[team_h] = {
-                        "opponent": team_a,
-                        "is_home": True,
-                        "fdr": fixture.get("team_h_difficulty", 3),
-                    }
-                if team_a and team_a not in team_next_fixture:
-                    team_next_fixture[team_a] = {
-                        "opponent": team_h,
-                        "is_home": False,
-                        "fdr": fixture.get("team_a_difficulty", 3),
-                    }
+        for team_id in fixture_matrix.team_ids:
+            upcoming = fixture_matrix.upcoming(team_id, current_gw, 1)
+            if upcoming:
+                team_next_fixture[team_id] = {
+                    "opponent": upcoming[0].opponent_id,
+                    "is_home": upcoming[0].is_home,
+                    "fdr": upcoming[0].fdr,
+                }
         
         predictions = []
         
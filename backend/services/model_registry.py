@@ -0,0 +1,322 @@
+"""
+Model artifact registry.
+
+Indexes the trained artifacts in ml/models by name and version and loads them
+on demand:
+
+- An artifact is a joblib pickle (<name>.pkl), a JSON config (<name>.json) or
+  an array export directory (<name>/meta.json, see services/forest_runtime.py).
+  Retrains can write side-by-side versions as <name>@<version>.<ext>; the plain
+  file is version "base".
+- get() loads lazily and keeps the last MAX_LOADED_MODELS objects in an LRU.
+  Pickles are loaded with joblib mmap_mode="r", so their NumPy arrays are
+  mapped from the page cache instead of copied into every worker; array
+  exports are memory-mapped the same way.
+- Each name has a serving version, persisted in serving.json. deploy() loads
+  the new version first and only then swaps the pointer, so a retrain goes
+  live without a restart, and predictions already running keep the object
+  they started with. Services that hold a model subscribe with on_deploy().
+"""
+
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from services.forest_runtime import load_forest
+
+try:
+    import joblib
+    JOBLIB_AVAILABLE = True
+except ImportError:
+    import pickle
+    JOBLIB_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+VERSION_PATTERN = re.compile(r"^[A-Za-z0-9._-]+$")
+
+
+class ModelNotFoundError(LookupError):
+    """No artifact with that name (and version) in the registry."""
+
+
+@dataclass(frozen=True)
+class ModelArtifact:
+    """One versioned file or export directory under the models directory."""
+    name: str
+    version: str
+    path: str
+    kind: str  # "joblib", "json" or "arrays"
+    size_bytes: int
+    modified_ns: int
+
+    @property
+    def cache_key(self) -> Tuple[str, str, int, int]:
+        # A file rewritten in place gets a new key, so it is never served stale
+        return (self.name, self.version, self.modified_ns, self.size_bytes)
+
+
+DeployListener = Callable[[str, str, Any], None]
+
+
+class ModelRegistry:
+    """Versioned, lazily loaded model artifacts with an LRU and hot swap."""
+
+    DEFAULT_ROOT = os.path.join(os.path.dirname(__file__), "..", "ml", "models")
+    BASE_VERSION = "base"
+    SERVING_FILE = "serving.json"
+    MAX_LOADED_MODELS = 16
+    MMAP_MODE = "r"
+
+    def __init__(self, root: Optional[str] = None, max_loaded: Optional[int] = None):
+        self.root = os.path.realpath(root or self.DEFAULT_ROOT)
+        self.max_loaded = max_loaded or self.MAX_LOADED_MODELS
+        self._lock = threading.RLock()  # index, serving pointers, LRU
+        self._load_lock = threading.Lock()  # one disk load at a time
+        self._index: Dict[str, Dict[str, ModelArtifact]] = {}
+        self._serving: Dict[str, str] = {}
+        self._loaded: "OrderedDict[Tuple, Any]" = OrderedDict()
+        self._listeners: List[DeployListener] = []
+        self.refresh()
+
+    # ------------------------------------------------------------------
+    # Index
+    # ------------------------------------------------------------------
+
+    def refresh(self):
+        """Rescan the models directory and reread the serving pointers."""
+        index: Dict[str, Dict[str, ModelArtifact]] = {}
+        if os.path.isdir(self.root):
+            for entry in sorted(os.listdir(self.root)):
+                artifact = self._artifact_for(entry)
+                if artifact is not None:
+                    index.setdefault(artifact.name, {})[artifact.version] = artifact
+
+        serving: Dict[str, str] = {}
+        serving_path = os.path.join(self.root, self.SERVING_FILE)
+        if os.path.exists(serving_path):
+            try:
+                with open(serving_path) as f:
+                    serving = {str(k): str(v) for k, v in json.load(f).items()}
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable {self.SERVING_FILE}: {e}")
+
+        with self._lock:
+            self._index = index
+            self._serving = serving
+
+    def _artifact_for(self, entry: str) -> Optional[ModelArtifact]:
+        path = os.path.join(self.root, entry)
+        if entry == self.SERVING_FILE or entry.startswith("."):
+            return None
+
+        if os.path.isdir(path):
+            if not os.path.exists(os.path.join(path, "meta.json")):
+                return None
+            stem, kind = entry, "arrays"
+            stat = os.stat(os.path.join(path, "meta.json"))
+            size = sum(f.stat().st_size for f in os.scandir(path) if f.is_file())
+        else:
+            stem, ext = os.path.splitext(entry)
+            kind = {".pkl": "joblib", ".json": "json"}.get(ext)
+            if kind is None:
+                return None
+            stat = os.stat(path)
+            size = stat.st_size
+
+        name, _, version = stem.partition("@")
+        version = version or self.BASE_VERSION
+        if not name or not VERSION_PATTERN.match(version):
+            return None
+        return ModelArtifact(
+            name=name, version=version, path=path, kind=kind,
+            size_bytes=size, modified_ns=stat.st_mtime_ns,
+        )
+
+    def names(self) -> List[str]:
+        with self._lock:
+            return sorted(self._index)
+
+    def versions(self, name: str) -> List[ModelArtifact]:
+        """All versions of an artifact, oldest first."""
+        with self._lock:
+            return sorted(self._index.get(name, {}).values(), key=lambda a: a.modified_ns)
+
+    def serving_version(self, name: str) -> Optional[str]:
+        """The version get(name) serves: the deployed one, else base."""
+        with self._lock:
+            versions = self._index.get(name, {})
+            deployed = self._serving.get(name)
+            if deployed in versions:
+                return deployed
+            if deployed is not None:
+                logger.warning(f"Deployed {name}@{deployed} is missing - serving {self.BASE_VERSION}")
+            return self.BASE_VERSION if self.BASE_VERSION in versions else None
+
+    def resolve(self, name: str, version: Optional[str] = None) -> ModelArtifact:
+        """The artifact for name@version (default: the serving version)."""
+        with self._lock:
+            version = version or self.serving_version(name)
+            artifact = self._index.get(name, {}).get(version) if version else None
+        if artifact is None:
+            raise ModelNotFoundError(f"No model artifact {name}@{version or self.BASE_VERSION}")
+        return artifact
+
+    def has(self, name: str) -> bool:
+        return self.serving_version(name) is not None
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+
+    def get(self, name: str, version: Optional[str] = None) -> Any:
+        """
+        The loaded object for name@version (default: the serving version).
+
+        Cached in the LRU; the first call for a version loads it from disk.
+        """
+        artifact = self.resolve(name, version)
+        with self._lock:
+            if artifact.cache_key in self._loaded:
+                self._loaded.move_to_end(artifact.cache_key)
+                return self._loaded[artifact.cache_key]
+
+        with self._load_lock:
+            with self._lock:
+                # Another thread may have loaded it while we waited
+                if artifact.cache_key in self._loaded:
+                    return self._loaded[artifact.cache_key]
+            obj = self._load(artifact)
+
+        with self._lock:
+            self._loaded[artifact.cache_key] = obj
+            self._loaded.move_to_end(artifact.cache_key)
+            while len(self._loaded) > self.max_loaded:
+                # Evicting only drops the registry's reference; holders keep theirs
+                evicted, _ = self._loaded.popitem(last=False)
+                logger.info(f"Model registry evicted {evicted[0]}@{evicted[1]}")
+        return obj
+
+    def _load(self, artifact: ModelArtifact) -> Any:
+        # SECURITY: only artifacts inside the models directory are ever loaded
+        # (pickle deserialization can execute arbitrary code)
+        if os.path.commonpath([os.path.realpath(artifact.path), self.root]) != self.root:
+            raise ValueError(f"Model path outside {self.root}: {artifact.path}")
+
+        if artifact.kind == "arrays":
+            obj = load_forest(artifact.path, mmap_mode=self.MMAP_MODE)
+        elif artifact.kind == "json":
+            with open(artifact.path) as f:
+                obj = json.load(f)
+        elif JOBLIB_AVAILABLE:
+            obj = joblib.load(artifact.path, mmap_mode=self.MMAP_MODE)
+        else:
+            logger.warning("Using pickle fallback - joblib not available")
+            with open(artifact.path, "rb") as f:
+                obj = pickle.load(f)
+
+        logger.info(f"Loaded model {artifact.name}@{artifact.version} ({artifact.kind}, {artifact.size_bytes / 1e6:.2f} MB)")
+        return obj
+
+    def is_loaded(self, artifact: ModelArtifact) -> bool:
+        with self._lock:
+            return artifact.cache_key in self._loaded
+
+    # ------------------------------------------------------------------
+    # Deployment
+    # ------------------------------------------------------------------
+
+    def on_deploy(self, listener: DeployListener):
+        """Call listener(name, version, model) after each deploy()."""
+        with self._lock:
+            if listener not in self._listeners:
+                self._listeners.append(listener)
+
+    def deploy(self, name: str, version: Optional[str] = None) -> ModelArtifact:
+        """
+        Make name@version the serving version, without downtime.
+
+        The directory is rescanned and the new version loaded before the
+        pointer moves, so a version that fails to load is never served.
+        With version=None the current serving version is reloaded, which
+        picks up a file retrained in place.
+
+        Returns:
+            The artifact now being served
+        """
+        self.refresh()
+        artifact = self.resolve(name, version)
+        model = self.get(artifact.name, artifact.version)
+
+        with self._lock:
+            previous = self._serving.get(name)
+            self._serving[name] = artifact.version
+            try:
+                self._write_serving()
+            except OSError:
+                self._serving[name] = previous
+                if previous is None:
+                    del self._serving[name]
+                raise
+            listeners = list(self._listeners)
+
+        logger.info(f"Deployed model {name}@{artifact.version} (was {previous or self.BASE_VERSION})")
+        for listener in listeners:
+            try:
+                listener(name, artifact.version, model)
+            except Exception as e:
+                logger.error(f"Model deploy listener failed for {name}@{artifact.version}: {e}")
+        return artifact
+
+    def _write_serving(self):
+        # Write-then-rename, so a crash never leaves a half-written pointer file
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, prefix=".serving-", suffix=".json")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(dict(sorted(self._serving.items())), f, indent=2)
+            os.replace(tmp_path, os.path.join(self.root, self.SERVING_FILE))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def describe(self) -> List[Dict[str, Any]]:
+        """Every artifact with its versions, for status endpoints."""
+        result = []
+        for name in self.names():
+            serving = self.serving_version(name)
+            result.append({
+                "name": name,
+                "serving_version": serving,
+                "versions": [
+                    {
+                        "version": a.version,
+                        "kind": a.kind,
+                        "size_bytes": a.size_bytes,
+                        "modified_at": datetime.fromtimestamp(a.modified_ns / 1e9).isoformat(),
+                        "loaded": self.is_loaded(a),
+                        "serving": a.version == serving,
+                    }
+                    for a in self.versions(name)
+                ],
+            })
+        return result
+
+
+# Singleton instance
+_model_registry: Optional[ModelRegistry] = None
+
+
+def get_model_registry() -> ModelRegistry:
+    """Get the singleton model registry."""
+    global _model_registry
+    if _model_registry is None:
+        _model_registry = ModelRegistry()
+    return _model_registry
@@ -0,0 +1,338 @@
+"""
+Incremental per-player gameweek history store.
+
+Keeps every player's element-summary history in the database
+(PlayerGameweekHistory) so callers only hit the FPL API for players whose
+history actually moved since the last sync:
+
+- A player is re-fetched when their season total_points or minutes (from
+  bootstrap-static) no longer match the sum of their stored rows, when they
+  changed club, or when they have never been synced.
+- For everyone else, unchanged totals mean any fixture their club finished
+  since their last stored row was a zero-minute, zero-point appearance, so
+  that row is filled in from the fixture list without a request. Match stats
+  are zero, running totals (selected) are carried over from the player's
+  previous row, and per-gameweek transfer counts are left unknown (None).
+
+Finished gameweeks are immutable, so after the first full sync each
+gameweek costs roughly one request per player who actually played.
+"""
+
+import asyncio
+import json
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional
+
+import pandas as pd
+from sqlalchemy import and_, func
+
+from database import PlayerGameweekHistory, PlayerHistorySync, SessionLocal
+
+logger = logging.getLogger(__name__)
+
+# Fetches raw history records (each with a player_id key) for the given players.
+# Returns (records, stats); players that failed are listed in stats["failed_player_ids"].
+HistoryFetcher = Callable[[list[int]], Awaitable[tuple[list[dict], Dict[str, Any]]]]
+
+# Running totals copied from the player's previous row into inferred rows
+# (zeroing them would read as e.g. nobody owning the player)
+CARRIED_FIELDS = ("selected",)
+
+# Per-gameweek counts that can't be inferred without a request; left unknown
+UNKNOWN_FIELDS = ("transfers_balance", "transfers_in", "transfers_out")
+
+
+@dataclass
+class _PlayerState:
+    team_id: Optional[int] = None
+    synced_at: Optional[datetime] = None
+    total_points: int = 0
+    minutes: int = 0
+    fixture_ids: set[int] = field(default_factory=set)
+    last_kickoff: Optional[str] = None
+    template: Optional[dict] = None  # the player's latest row, used to shape inferred rows
+
+
+def _parse_kickoff(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+
+
+def _json_default(value: Any) -> Any:
+    # numpy scalars from DataFrame-derived records
+    if hasattr(value, "item"):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _zero_like(value: Any) -> Any:
+    if isinstance(value, bool):
+        return False
+    if isinstance(value, (int, float)):
+        return 0
+    if isinstance(value, str):
+        # Decimal strings keep their precision ("0.12" -> "0.00", "2.1" -> "0.0")
+        whole, _, decimals = value.partition(".")
+        return "0." + "0" * len(decimals) if decimals else "0"
+    return value
+
+
+class PlayerHistoryStore:
+    """Database-backed player history with change-driven incremental sync."""
+
+    def __init__(self, session_factory: Callable = SessionLocal):
+        self._session_factory = session_factory
+        self.last_sync_stats: Dict[str, Any] = {}
+
+    # ------------------------------------------------------------------
+    # Reads (blocking - call via asyncio.to_thread from async code)
+    # ------------------------------------------------------------------
+
+    def load(self, player_ids: Optional[Iterable[int]] = None) -> pd.DataFrame:
+        """Load stored history as a DataFrame (one row per player-fixture, plus player_id)."""
+        return pd.DataFrame.from_records([
+            record for records in self.load_records(player_ids).values() for record in records
+        ])
+
+    def load_records(self, player_ids: Optional[Iterable[int]] = None) -> Dict[int, list[dict]]:
+        """Load stored history as raw element-summary entries, chronological per player."""
+        db = self._session_factory()
+        try:
+            query = db.query(PlayerGameweekHistory.player_id, PlayerGameweekHistory.data)
+            if player_ids is not None:
+                query = query.filter(PlayerGameweekHistory.player_id.in_(list(player_ids)))
+            rows = query.order_by(
+                PlayerGameweekHistory.player_id,
+                PlayerGameweekHistory.round,
+                PlayerGameweekHistory.kickoff_time,
+                PlayerGameweekHistory.fixture_id,
+            ).all()
+        finally:
+            db.close()
+
+        by_player: Dict[int, list[dict]] = {}
+        for player_id, data in rows:
+            record = json.loads(data)
+            record["player_id"] = player_id
+            by_player.setdefault(player_id, []).append(record)
+        return by_player
+
+    def _load_state(self) -> Dict[int, _PlayerState]:
+        db = self._session_factory()
+        try:
+            states: Dict[int, _PlayerState] = {}
+            for sync in db.query(PlayerHistorySync).all():
+                states[sync.player_id] = _PlayerState(team_id=sync.team_id, synced_at=sync.synced_at)
+
+            rows = db.query(
+                PlayerGameweekHistory.player_id,
+                PlayerGameweekHistory.fixture_id,
+                PlayerGameweekHistory.kickoff_time,
+                PlayerGameweekHistory.minutes,
+                PlayerGameweekHistory.total_points,
+            ).all()
+            for player_id, fixture_id, kickoff, minutes, points in rows:
+                state = states.setdefault(player_id, _PlayerState())
+                state.fixture_ids.add(fixture_id)
+                state.minutes += minutes or 0
+                state.total_points += points or 0
+                if kickoff and (state.last_kickoff is None or kickoff > state.last_kickoff):
+                    state.last_kickoff = kickoff
+
+            # Each player's latest row shapes their inferred rows
+            latest = db.query(
+                PlayerGameweekHistory.player_id,
+                func.max(PlayerGameweekHistory.kickoff_time).label("kickoff_time"),
+            ).group_by(PlayerGameweekHistory.player_id).subquery()
+            rows = db.query(PlayerGameweekHistory.player_id, PlayerGameweekHistory.data).join(
+                latest,
+                and_(
+                    PlayerGameweekHistory.player_id == latest.c.player_id,
+                    PlayerGameweekHistory.kickoff_time == latest.c.kickoff_time,
+                ),
+            ).all()
+            for player_id, data in rows:
+                if player_id in states:
+                    states[player_id].template = json.loads(data)
+            return states
+        finally:
+            db.close()
+
+    # ------------------------------------------------------------------
+    # Planning
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _plan(
+        players: list[dict],
+        fixtures: list[dict],
+        states: Dict[int, _PlayerState],
+    ) -> tuple[list[int], Dict[int, list[dict]]]:
+        """Split players into those to fetch and zero-minute rows to infer."""
+        finished_by_team: Dict[int, list[dict]] = {}
+        for f in fixtures:
+            if not f.get("finished") or not f.get("event"):
+                continue
+            for team_id in (f.get("team_h"), f.get("team_a")):
+                finished_by_team.setdefault(team_id, []).append(f)
+
+        to_fetch: list[int] = []
+        inferred: Dict[int, list[dict]] = {}
+        for player in players:
+            player_id = int(player["id"])
+            team_id = int(player["team"])
+            state = states.get(player_id)
+            if (
+                state is None
+                or state.synced_at is None
+                or state.team_id != team_id
+                or state.total_points != int(player.get("total_points") or 0)
+                or state.minutes != int(player.get("minutes") or 0)
+                or state.template is None
+            ):
+                to_fetch.append(player_id)
+                continue
+
+            since = _parse_kickoff(state.last_kickoff) or state.synced_at.replace(tzinfo=timezone.utc)
+            rows = []
+            for f in finished_by_team.get(team_id, []):
+                kickoff = _parse_kickoff(f.get("kickoff_time"))
+                if f["id"] in state.fixture_ids or kickoff is None or kickoff <= since:
+                    continue
+                is_home = f.get("team_h") == team_id
+                row = {k: _zero_like(v) for k, v in state.template.items()}
+                row.update({k: state.template.get(k) for k in CARRIED_FIELDS})
+                row.update({k: None for k in UNKNOWN_FIELDS})
+                row.update(
+                    element=player_id,
+                    fixture=f["id"],
+                    opponent_team=f.get("team_a") if is_home else f.get("team_h"),
+                    was_home=is_home,
+                    kickoff_time=f.get("kickoff_time"),
+                    team_h_score=f.get("team_h_score"),
+                    team_a_score=f.get("team_a_score"),
+                    round=f["event"],
+                    value=int(player.get("now_cost") or 0),
+                )
+                rows.append(row)
+            if rows:
+                inferred[player_id] = rows
+        return to_fetch, inferred
+
+    # ------------------------------------------------------------------
+    # Writes (blocking)
+    # ------------------------------------------------------------------
+
+    def _save(
+        self,
+        fetched: Dict[int, list[dict]],
+        inferred: Dict[int, list[dict]],
+        teams: Dict[int, int],
+        synced_at: datetime,
+    ) -> None:
+        db = self._session_factory()
+        try:
+            if fetched:
+                db.query(PlayerGameweekHistory).filter(
+                    PlayerGameweekHistory.player_id.in_(list(fetched))
+                ).delete(synchronize_session=False)
+
+            objects = []
+            for synthetic, by_player in ((False, fetched), (True, inferred)):
+                for player_id, rows in by_player.items():
+                    for row in rows:
+                        row = {k: v for k, v in row.items() if k != "player_id"}
+                        objects.append(PlayerGameweekHistory(
+                            player_id=player_id,
+                            fixture_id=int(row.get("fixture") or 0),
+                            round=int(row.get("round") or 0),
+                            kickoff_time=row.get("kickoff_time"),
+                            minutes=int(row.get("minutes") or 0),
+                            total_points=int(row.get("total_points") or 0),
+                            synthetic=synthetic,
+                            data=json.dumps(row, default=_json_default),
+                        ))
+            db.bulk_save_objects(objects)
+
+            for player_id, team_id in teams.items():
+                db.merge(PlayerHistorySync(player_id=player_id, team_id=team_id, synced_at=synced_at))
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    # ------------------------------------------------------------------
+    # Sync
+    # ------------------------------------------------------------------
+
+    async def sync(
+        self,
+        players: list[dict],
+        fixtures: list[dict],
+        fetch: HistoryFetcher,
+    ) -> Dict[str, Any]:
+        """
+        Bring stored history up to date for ``players``.
+
+        Args:
+            players: Bootstrap elements (needs id, team, total_points, minutes, now_cost)
+            fixtures: Fixtures (needs id, event, team_h, team_a, kickoff_time,
+                finished, team_h_score, team_a_score)
+            fetch: Fetcher for the players that need a network refresh
+
+        Returns:
+            Sync statistics
+        """
+        started = datetime.utcnow()
+        states = await asyncio.to_thread(self._load_state)
+        to_fetch, inferred = self._plan(players, fixtures, states)
+
+        fetched: Dict[int, list[dict]] = {}
+        fetch_stats: Dict[str, Any] = {}
+        if to_fetch:
+            records, fetch_stats = await fetch(to_fetch)
+            failed = set(fetch_stats.get("failed_player_ids", []))
+            fetched = {pid: [] for pid in to_fetch if pid not in failed}
+            for record in records:
+                if record["player_id"] in fetched:
+                    fetched[record["player_id"]].append(record)
+
+        # Failed players keep their old rows and sync state, so they are retried next time
+        teams = {int(p["id"]): int(p["team"]) for p in players}
+        synced_teams = {pid: team for pid, team in teams.items() if pid not in to_fetch or pid in fetched}
+        await asyncio.to_thread(self._save, fetched, inferred, synced_teams, started)
+
+        self.last_sync_stats = {
+            "players": len(players),
+            "fetched": len(fetched),
+            "unchanged": len(players) - len(to_fetch),
+            "inferred_rows": sum(len(rows) for rows in inferred.values()),
+            "failed": len(to_fetch) - len(fetched),
+            "fetch": fetch_stats,
+            "elapsed_seconds": round((datetime.utcnow() - started).total_seconds(), 2),
+        }
+        logger.info(
+            f"Player history sync: fetched {len(fetched)}/{len(players)} players, "
+            f"inferred {self.last_sync_stats['inferred_rows']} zero-minute rows"
+        )
+        return self.last_sync_stats
+
+
+# Singleton instance
+_history_store: Optional[PlayerHistoryStore] = None
+
+
+def get_player_history_store() -> PlayerHistoryStore:
+    """Get the singleton player history store."""
+    global _history_store
+    if _history_store is None:
+        _history_store = PlayerHistoryStore()
+    return _history_store
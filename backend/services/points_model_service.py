@@ -0,0 +1,427 @@
+"""
+Stage 2 points model serving.
+
+The points models in ml/models - Ridge, RandomForest, XGBoost and LightGBM
+for each feature set, with the feature order in model_config_<set>.json and
+the StandardScaler in scaler_<set>.pkl - are served for every player at once:
+
+- The feature matrix is built once per score snapshot, from the snapshot's
+  component scores plus PredictorService's gameweek histories (recent xGI,
+  team xG strengths) and next fixtures.
+- Each selected model predicts the whole matrix in one call, and the results
+  are blended with the ensemble weights: the config's ensemble_weights, else
+  inverse test MAE.
+- Models are run cheapest first while the observed cost still fits in the
+  latency budget. Models that are too slow, or whose library isn't installed
+  (xgboost, lightgbm), are left out and the weights renormalised.
+- Results are cached by snapshot version and recomputed only when a new
+  snapshot is published or a model is redeployed through the registry.
+
+Feature definitions follow ml/SCORES_APPROACH.md, except where the v2
+training data differs, as its scaler shows (ml/benchmark_points_models.py
+reports the drift). Positions were missing there, so is_gkp..is_fwd were
+constant zero and every ceiling score started from the 0.5 base, and the
+value score is season points per £m capped at 10. Only feature sets whose
+features can all be built online are served: v2_kg also needs Knowledge
+Graph tags, and top10k predicts ownership, not points.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from config import settings
+from services.model_registry import ModelNotFoundError, get_model_registry
+
+logger = logging.getLogger(__name__)
+
+# Config model name -> artifact prefix (<prefix>_<set>.pkl)
+MODEL_ARTIFACTS = {
+    'Ridge': 'ridge',
+    'RandomForest': 'rf',
+    'XGBoost': 'xgb',
+    'LightGBM': 'lgb',
+}
+
+POSITIONS = ('GKP', 'DEF', 'MID', 'FWD')
+
+# Features build_points_features produces
+POINTS_FEATURES = (
+    'fixture_score', 'form_score_xg', 'form_score_pts', 'nailedness_score', 'value_score', 'ceiling_score',
+    'own_team_attack', 'own_team_defense_weakness', 'opp_attack_strength', 'opp_defense_weakness',
+    'price_m', 'is_home', 'xgi_last5', 'pts_last5', 'mins_last5',
+    'is_gkp', 'is_def', 'is_mid', 'is_fwd',
+    'fixture_x_form', 'fixture_x_nailed', 'form_x_nailed',
+)
+
+# Ceiling score parts (ml/SCORES_APPROACH.md, factor 5); the position base is
+# the no-position one the models were trained with
+CEILING_BASE = 0.5
+CEILING_PENALTY_TAKER = 2.0
+CEILING_SET_PIECES = 1.0
+CEILING_RECENT_HAUL = 1.5
+CEILING_EASY_FIXTURE = 1.5
+HAUL_POINTS = 10
+EASY_FIXTURE_SCORE = 7
+
+
+@dataclass(frozen=True)
+class PointsEnsemble:
+    """The loaded models of one feature set and how they are blended."""
+    model_set: str
+    features: List[str]
+    scaler: Any
+    models: Dict[str, Any]
+    weights: Dict[str, float]
+    missing: Dict[str, str]  # selected models that could not be loaded -> why
+
+
+@dataclass(frozen=True)
+class PointsPredictions:
+    """Expected points for every player in one score snapshot."""
+    snapshot_version: int
+    gameweek: Optional[int]
+    model_set: str
+    points: Mapping[int, float]  # player_id -> blended expected points
+    by_model: Dict[str, Mapping[int, float]]
+    weights: Dict[str, float]  # renormalised over the models that ran
+    skipped: Dict[str, str] = field(default_factory=dict)  # model -> reason
+    timings_ms: Dict[str, float] = field(default_factory=dict)  # features, per model, total
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "snapshot_version": self.snapshot_version,
+            "model_set": self.model_set,
+            "players": len(self.points),
+            "models": list(self.by_model),
+            "weights": {name: round(w, 4) for name, w in self.weights.items()},
+            "skipped": self.skipped,
+            "timings_ms": self.timings_ms,
+        }
+
+
+class PointsModelService:
+    """Batched, cached Stage 2 points predictions for a score snapshot."""
+
+    CACHE_SIZE = 4  # snapshots kept
+    COST_SMOOTHING = 0.5  # weight of the latest run in each model's cost estimate
+
+    def __init__(
+        self,
+        model_set: Optional[str] = None,
+        models: Optional[List[str]] = None,
+        latency_budget_ms: Optional[float] = None,
+    ):
+        self.model_set = model_set or settings.POINTS_MODEL_SET
+        self.selected = models or [m.strip() for m in settings.POINTS_MODELS.split(",") if m.strip()]
+        self.latency_budget_ms = latency_budget_ms or settings.POINTS_LATENCY_BUDGET_MS
+        self._registry = get_model_registry()
+        self._ensemble: Optional[PointsEnsemble] = None
+        self._cache: "OrderedDict[int, PointsPredictions]" = OrderedDict()
+        self._cost_ms: Dict[str, float] = {}
+        self._lock = threading.Lock()  # ensemble, cache and cost estimates
+        self._compute_lock = threading.Lock()  # one matrix build at a time
+        self._registry.on_deploy(self._on_model_deployed)
+
+    # ------------------------------------------------------------------
+    # Models
+    # ------------------------------------------------------------------
+
+    def _artifact_names(self) -> List[str]:
+        return [f"model_config_{self.model_set}", f"scaler_{self.model_set}"] + [
+            f"{MODEL_ARTIFACTS[name]}_{self.model_set}" for name in self.selected if name in MODEL_ARTIFACTS
+        ]
+
+    def _load_ensemble(self) -> PointsEnsemble:
+        config = self._registry.get(f"model_config_{self.model_set}")
+        features = list(config['features'])
+        unsupported = [f for f in features if f not in POINTS_FEATURES]
+        if unsupported:
+            raise ValueError(
+                f"Feature set {self.model_set} needs features that aren't built online: {', '.join(unsupported)}"
+            )
+        scaler = self._registry.get(config.get('scaler_path', f"scaler_{self.model_set}.pkl").rsplit('.', 1)[0])
+
+        models: Dict[str, Any] = {}
+        missing: Dict[str, str] = {}
+        for name in self.selected:
+            if name not in MODEL_ARTIFACTS:
+                missing[name] = "unknown model"
+                continue
+            try:
+                models[name] = self._registry.get(f"{MODEL_ARTIFACTS[name]}_{self.model_set}")
+            except ModelNotFoundError:
+                missing[name] = "not trained for this feature set"
+            except ImportError as e:
+                # Optional dependency (xgboost/lightgbm) not installed
+                missing[name] = f"not installed ({e.name})"
+        if not models:
+            raise ValueError(f"No points models could be loaded for {self.model_set}: {missing}")
+        for name, reason in missing.items():
+            logger.warning(f"Points model {name} ({self.model_set}) skipped: {reason}")
+
+        weights = config.get('ensemble_weights')
+        if not weights:
+            # Inverse test MAE, so the better models count for more
+            results = config.get('test_results', {})
+            weights = {name: 1 / results[name]['MAE'] for name in models if results.get(name, {}).get('MAE')}
+        weights = {name: float(weights.get(name, 0.0)) for name in models}
+        if not any(weights.values()):
+            weights = {name: 1.0 for name in models}
+
+        return PointsEnsemble(
+            model_set=self.model_set, features=features, scaler=scaler,
+            models=models, weights=weights, missing=missing,
+        )
+
+    def _get_ensemble(self) -> PointsEnsemble:
+        with self._lock:
+            ensemble = self._ensemble
+        if ensemble is None:
+            ensemble = self._load_ensemble()
+            with self._lock:
+                self._ensemble = ensemble
+        return ensemble
+
+    def _on_model_deployed(self, name: str, version: str, model):
+        """Registry hook: reload the ensemble and drop cached predictions."""
+        if name not in self._artifact_names():
+            return
+        with self._lock:
+            self._ensemble = None
+            self._cache.clear()
+        logger.info(f"Points models: {name}@{version} deployed - predictions will be recomputed")
+
+    # ------------------------------------------------------------------
+    # Predictions
+    # ------------------------------------------------------------------
+
+    def cached(self, snapshot_version: Optional[int] = None) -> Optional[PointsPredictions]:
+        """Cached predictions for a snapshot version (default: the latest), without computing."""
+        with self._lock:
+            if snapshot_version is None:
+                return next(reversed(self._cache.values()), None)
+            return self._cache.get(snapshot_version)
+
+    def predict(self, predictor) -> Optional[PointsPredictions]:
+        """
+        Expected points for every player in the predictor's current snapshot.
+
+        Computed once per snapshot version and cached. Blocking (model
+        inference) - call from a worker thread in async code.
+
+        Args:
+            predictor: PredictorService with a published snapshot
+
+        Returns:
+            The predictions, or None before the first snapshot
+        """
+        snapshot = predictor.snapshot
+        if not len(snapshot):
+            return None
+        hit = self.cached(snapshot.version)
+        if hit is not None:
+            return hit
+
+        with self._compute_lock:
+            hit = self.cached(snapshot.version)
+            if hit is not None:
+                return hit
+            result = self._predict_snapshot(snapshot)
+
+        with self._lock:
+            self._cache[snapshot.version] = result
+            while len(self._cache) > self.CACHE_SIZE:
+                self._cache.popitem(last=False)
+        return result
+
+    def _predict_snapshot(self, snapshot) -> PointsPredictions:
+        ensemble = self._get_ensemble()
+        start = time.perf_counter()
+
+        player_ids, frame = build_points_features(
+            snapshot.scores, snapshot.history, snapshot.team_fixtures, snapshot.recent_aggregates,
+        )
+        X = ensemble.scaler.transform(frame[ensemble.features].to_numpy(dtype=float))
+        timings = {'features': round((time.perf_counter() - start) * 1000, 2)}
+
+        # Cheapest first; unknown costs count as free so each model gets measured once
+        with self._lock:
+            order = sorted(ensemble.models, key=lambda name: self._cost_ms.get(name, 0.0))
+            costs = dict(self._cost_ms)
+
+        by_model: Dict[str, np.ndarray] = {}
+        skipped = dict(ensemble.missing)
+        for name in order:
+            elapsed = (time.perf_counter() - start) * 1000
+            if by_model and elapsed + costs.get(name, 0.0) > self.latency_budget_ms:
+                skipped[name] = f"over latency budget (~{costs[name]:.0f}ms, {elapsed:.0f}ms used)"
+                continue
+            model_start = time.perf_counter()
+            by_model[name] = np.asarray(ensemble.models[name].predict(X), dtype=float).reshape(-1)
+            timings[name] = round((time.perf_counter() - model_start) * 1000, 2)
+            with self._lock:
+                previous = self._cost_ms.get(name)
+                self._cost_ms[name] = timings[name] if previous is None else (
+                    self.COST_SMOOTHING * timings[name] + (1 - self.COST_SMOOTHING) * previous
+                )
+
+        total_weight = sum(ensemble.weights[name] for name in by_model)
+        weights = {name: ensemble.weights[name] / total_weight for name in by_model}
+        blended = sum(weights[name] * predictions for name, predictions in by_model.items())
+        timings['total'] = round((time.perf_counter() - start) * 1000, 2)
+
+        ids = player_ids.tolist()
+        if timings['total'] > self.latency_budget_ms:
+            logger.warning(f"Points models took {timings['total']:.0f}ms (budget {self.latency_budget_ms:.0f}ms)")
+        return PointsPredictions(
+            snapshot_version=snapshot.version,
+            gameweek=snapshot.gameweek,
+            model_set=ensemble.model_set,
+            points=dict(zip(ids, np.round(blended, 2).tolist())),
+            by_model={name: dict(zip(ids, np.round(p, 2).tolist())) for name, p in by_model.items()},
+            weights=weights,
+            skipped=skipped,
+            timings_ms=timings,
+        )
+
+
+# =========================================================================
+# Feature matrix
+# =========================================================================
+
+def team_strengths(history: Optional[pd.DataFrame], player_team: Mapping[int, int]) -> Tuple[Dict[int, float], Dict[int, float]]:
+    """
+    Team attack strength and defensive weakness relative to the league.
+
+    attack = team xG per match / league average, weakness = xG conceded per
+    match / league average, from the players' gameweek histories (a team's
+    xG in a match is the sum over its players).
+
+    Returns:
+        (attack, weakness) by team id; teams without matches are left out
+    """
+    needed = {'player_id', 'fixture', 'opponent_team', 'expected_goals'}
+    if history is None or not len(history) or not needed <= set(history.columns):
+        return {}, {}
+
+    rows = pd.DataFrame({
+        'team': history['player_id'].map(player_team),
+        'fixture': history['fixture'],
+        'opponent': history['opponent_team'],
+        'xg': pd.to_numeric(history['expected_goals'], errors='coerce').fillna(0.0),
+    }).dropna(subset=['team'])
+    rows['team'] = rows['team'].astype(int)
+
+    matches = rows.groupby(['team', 'fixture', 'opponent'], sort=False)['xg'].sum().reset_index()
+    # xG conceded in a match is the opponent's xG in it
+    conceded = matches.merge(
+        matches[['team', 'fixture', 'xg']].rename(columns={'team': 'opponent', 'xg': 'xga'}),
+        on=['opponent', 'fixture'], how='left',
+    )
+    per_team = conceded.groupby('team').agg(xg=('xg', 'mean'), xga=('xga', 'mean'))
+    league_xg = per_team['xg'].mean()
+    league_xga = per_team['xga'].mean()
+    attack = (per_team['xg'] / league_xg).to_dict() if league_xg > 0 else {}
+    weakness = (per_team['xga'] / league_xga).dropna().to_dict() if league_xga > 0 else {}
+    return attack, weakness
+
+
+def build_points_features(
+    scores: Mapping[int, Dict[str, Any]],
+    history: Optional[pd.DataFrame],
+    team_fixtures: Mapping[int, list],
+    recent_aggregates,
+) -> Tuple[np.ndarray, pd.DataFrame]:
+    """
+    The Stage 2 feature matrix for every scored player.
+
+    Args:
+        scores: Snapshot score entries by player id
+        history: Gameweek history rows (player_id, round, minutes, ...)
+        team_fixtures: Upcoming fixtures by team id (next one first)
+        recent_aggregates: ScoreSnapshot.recent_aggregates
+
+    Returns:
+        (player_ids, frame) - one row per player with a column per feature
+    """
+    player_ids = np.fromiter(scores, dtype=np.int64, count=len(scores))
+    entries = [scores[pid] for pid in player_ids.tolist()]
+
+    def column(key: str, default: float = 0.0) -> np.ndarray:
+        return np.array([e.get(key) if e.get(key) is not None else default for e in entries], dtype=float)
+
+    positions = np.array([e.get('position') for e in entries], dtype=object)
+    team_ids = [e.get('team_id') for e in entries]
+    price = column('price')
+    fixture = column('fixture_score', 5.0)
+    form_xg = column('form_xg_score')
+    nailed = column('nailedness_score')
+
+    # Recent xGI per game (all of the last RECENT_GAMES rows, not just played ones)
+    recent = recent_aggregates(pd.Series(player_ids))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        xgi_last5 = (recent['xg_sum'] + recent['xa_sum']) / recent['minutes_count']
+    xgi_last5 = np.nan_to_num(xgi_last5, nan=0.0)
+
+    # Recent haul (10+ points in one of the last games)
+    haul = np.zeros(len(player_ids), dtype=bool)
+    if history is not None and len(history) and 'total_points' in history:
+        recent_rows = history.sort_values('round').groupby('player_id').tail(5)
+        haulers = recent_rows.loc[recent_rows['total_points'] >= HAUL_POINTS, 'player_id'].unique()
+        haul = np.isin(player_ids, haulers)
+
+    # Team strengths for the player's team and the next opponent
+    attack, weakness = team_strengths(history, dict(zip(player_ids.tolist(), team_ids)))
+    next_fixtures = [(team_fixtures.get(team_id) or [None])[0] for team_id in team_ids]
+    opponents = [f['opponent_id'] if f else None for f in next_fixtures]
+
+    ceiling = np.full(len(player_ids), CEILING_BASE)
+    ceiling += np.where(column('is_penalty_taker') > 0, CEILING_PENALTY_TAKER, 0.0)
+    ceiling += np.where(column('is_set_piece_taker') > 0, CEILING_SET_PIECES, 0.0)
+    ceiling += np.where(haul, CEILING_RECENT_HAUL, 0.0)
+    ceiling += np.where(fixture >= EASY_FIXTURE_SCORE, CEILING_EASY_FIXTURE, 0.0)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        points_per_million = np.where(price > 0, column('total_points') / price, 0.0)
+
+    frame = pd.DataFrame({
+        'fixture_score': fixture,
+        'form_score_xg': form_xg,
+        'form_score_pts': column('form_pts_score'),
+        'nailedness_score': nailed,
+        'value_score': np.clip(points_per_million, 0, 10),
+        'ceiling_score': np.minimum(ceiling, 10),
+        'own_team_attack': [attack.get(t, 1.0) for t in team_ids],
+        'own_team_defense_weakness': [weakness.get(t, 1.0) for t in team_ids],
+        'opp_attack_strength': [attack.get(o, 1.0) for o in opponents],
+        'opp_defense_weakness': [weakness.get(o, 1.0) for o in opponents],
+        'price_m': price / 10,  # £10m units, as in the training data
+        'is_home': [float(bool(f and f['is_home'])) for f in next_fixtures],
+        'xgi_last5': xgi_last5,
+        'pts_last5': column('avg_points'),
+        'mins_last5': column('avg_minutes'),
+        **{f'is_{p.lower()}': (positions == p).astype(float) for p in POSITIONS},
+        'fixture_x_form': fixture * form_xg,
+        'fixture_x_nailed': fixture * nailed,
+        'form_x_nailed': form_xg * nailed,
+    })
+    return player_ids, frame
+
+
+# Singleton instance
+_points_model_service: Optional[PointsModelService] = None
+
+
+def get_points_model_service() -> PointsModelService:
+    """Get the singleton points model service."""
+    global _points_model_service
+    if _points_model_service is None:
+        _points_model_service = PointsModelService()
+    return _points_model_service
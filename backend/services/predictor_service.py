@@ -17,14 +17,26 @@ The weights vary by position:
 
 import pandas as pd
 import numpy as np
+import bisect
+import functools
+import heapq
+import itertools
 import logging
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, Optional, Any
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Iterable, Iterator, Mapping, Optional
 from datetime import datetime
 import time
 import httpx
 from sqlalchemy.orm import Session
 
+from middleware.resilience import AdaptiveRateLimiter, fpl_history_rate_limiter
+from models import Fixture
+from services.fixture_matrix import FixtureMatrix
+from services.job_runner import Job, get_job_runner
+from services.points_model_service import get_points_model_service
+
 logger = logging.getLogger(__name__)
 
 # Position-specific weights
@@ -55,248 +67,715 @@ FDR_TO_SCORE = {
 FPL_API = "https://fantasy.premierleague.com/api"
 
 
+# Vectorized equivalents of the builtin min/max clamps used by the per-player
+# scorer (now in ml/benchmark_player_scoring.py). Besides the values they return a mask of entries that passed
+# through unclamped: the builtins return the bound itself otherwise (and NaN
+# compares false, so it ends up at the bound), which decides how the loop
+# rounded the result - see _round_scores.
+
+def _py_min(values: np.ndarray, high: float) -> tuple[np.ndarray, np.ndarray]:
+    """Vectorized ``min(high, x)``."""
+    passed = values < high
+    return np.where(passed, values, high), passed
+
+
+def _py_max(values: np.ndarray, low: float) -> tuple[np.ndarray, np.ndarray]:
+    """Vectorized ``max(low, x)``."""
+    passed = values > low
+    return np.where(passed, values, low), passed
+
+
+def _py_clamp(values: np.ndarray, low: float = 0, high: float = 10) -> tuple[np.ndarray, np.ndarray]:
+    """Vectorized ``max(low, min(high, x))``."""
+    capped, under = _py_min(values, high)
+    clamped, over = _py_max(capped, low)
+    return clamped, under & over
+
+
+def _round_scores(values: np.ndarray, numpy_scalar: np.ndarray, ndigits: int = 2) -> list[float]:
+    """
+    Round scores exactly as the per-player loop did.
+
+    There a score was a numpy scalar whenever it came from a pandas mean
+    (rounded with numpy's rounding) and a plain Python number otherwise
+    (correctly rounded). The two disagree on some half-way cases, so
+    ``numpy_scalar`` says which rounding each value gets.
+    """
+    numpy_rounded = np.round(values, ndigits).tolist()
+    return [
+        rounded if is_numpy else round(value, ndigits)
+        for value, rounded, is_numpy in zip(values.tolist(), numpy_rounded, numpy_scalar.tolist())
+    ]
+
+
+# Ranked index buckets: ownership upper edges (%) and price bucket width (£m)
+OWNERSHIP_BUCKETS = (0.5, 1.0, 2.0, 5.0, 10.0, 15.0, 20.0, 30.0, 50.0, 100.0)
+PRICE_BUCKET_WIDTH = 0.5
+# Minimum nailedness for the pick pools (differentials, value picks)
+PICK_MIN_NAILEDNESS = 6.0
+
+# Bootstrap columns the player scores are computed from, grouped by what a
+# change means for an incremental refresh
+AVAILABILITY_COLUMNS = ('status', 'news', 'chance_of_playing_next_round')
+HISTORY_COLUMNS = ('team', 'total_points', 'minutes')  # moved => new history rows
+PROFILE_COLUMNS = (
+    'web_name', 'first_name', 'second_name', 'team_name', 'position', 'now_cost',
+    'selected_by_percent', 'form', 'penalties_order', 'corners_and_indirect_freekicks_order',
+)
+
+Buckets = tuple[tuple[float, tuple[int, ...]], ...]  # (upper edge, player ids in rank order)
+
+
+def _bucket(ids: Iterable[int], value: Callable[[int], float], edges: list[float]) -> Buckets:
+    """Split ranked ids into ascending value buckets, keeping rank order within each."""
+    buckets: Dict[float, list[int]] = {}
+    for pid in ids:
+        i = bisect.bisect_left(edges, value(pid))
+        buckets.setdefault(edges[i] if i < len(edges) else float('inf'), []).append(pid)
+    return tuple((upper, tuple(buckets[upper])) for upper in sorted(buckets))
+
+
+def _merge_buckets(
+    buckets: Buckets,
+    max_value: float,
+    value: Callable[[int], float],
+    rank: Mapping[int, int],
+) -> Iterator[int]:
+    """
+    Lazily yield ids with value <= max_value in rank order.
+
+    Buckets entirely under the limit are merged as-is; only the one bucket
+    straddling the limit is filtered.
+    """
+    lists: list[Iterable[int]] = []
+    for upper, ids in buckets:
+        if upper <= max_value:
+            lists.append(ids)
+        else:
+            lists.append(pid for pid in ids if value(pid) <= max_value)
+            break
+    return heapq.merge(*lists, key=rank.__getitem__)
+
+
+@dataclass(frozen=True)
+class ScoreIndex:
+    """
+    Precomputed orderings over one snapshot's scores.
+
+    Built once per published snapshot so score queries take the first K
+    entries of a ready-made ordering instead of copying and sorting every
+    player per request. Entries are shared between callers; treat them as
+    read-only.
+    """
+    entries: Mapping[int, Dict[str, Any]] = field(default_factory=dict)  # score data + player_id
+    by_final: tuple[int, ...] = ()
+    by_captain: tuple[int, ...] = ()
+    by_position: Mapping[str, tuple[int, ...]] = field(default_factory=dict)  # final_score order
+    final_rank: Mapping[int, int] = field(default_factory=dict)
+    captain_rank: Mapping[int, int] = field(default_factory=dict)
+    value_rank: Mapping[int, int] = field(default_factory=dict)  # final_score per £m, pick pool only
+    # Available players with nailedness >= PICK_MIN_NAILEDNESS
+    picks_by_ownership: Buckets = ()  # final_score order within buckets
+    picks_by_price: Buckets = ()  # value order within buckets
+
+    @classmethod
+    def build(cls, scores: Mapping[int, Dict[str, Any]]) -> "ScoreIndex":
+        entries = {pid: {**data, 'player_id': pid} for pid, data in scores.items()}
+        by_final = tuple(sorted(entries, key=lambda pid: entries[pid]['final_score'], reverse=True))
+        by_captain = tuple(sorted(entries, key=lambda pid: entries[pid]['captain_score'], reverse=True))
+
+        by_position: Dict[str, list[int]] = {}
+        for pid in by_final:
+            by_position.setdefault(entries[pid]['position'], []).append(pid)
+
+        pool = [
+            pid for pid in by_final
+            if entries[pid]['status'] == 'a' and entries[pid]['nailedness_score'] >= PICK_MIN_NAILEDNESS
+        ]
+        by_value = sorted(
+            (pid for pid in pool if entries[pid]['price'] > 0),
+            key=lambda pid: entries[pid]['final_score'] / entries[pid]['price'],
+            reverse=True,
+        )
+        max_price = max((entries[pid]['price'] for pid in by_value), default=0)
+        price_edges = [PRICE_BUCKET_WIDTH * (i + 1) for i in range(int(max_price / PRICE_BUCKET_WIDTH) + 1)]
+
+        return cls(
+            entries=entries,
+            by_final=by_final,
+            by_captain=by_captain,
+            by_position={pos: tuple(ids) for pos, ids in by_position.items()},
+            final_rank={pid: i for i, pid in enumerate(by_final)},
+            captain_rank={pid: i for i, pid in enumerate(by_captain)},
+            value_rank={pid: i for i, pid in enumerate(by_value)},
+            picks_by_ownership=_bucket(pool, lambda pid: entries[pid]['ownership'], list(OWNERSHIP_BUCKETS)),
+            picks_by_price=_bucket(by_value, lambda pid: entries[pid]['price'], price_edges),
+        )
+
+    def top(self, ids: Iterable[int], limit: Optional[int] = None, where: Optional[Callable[[Dict[str, Any]], bool]] = None) -> list[Dict[str, Any]]:
+        """First ``limit`` entries of an ordering, optionally filtered."""
+        entries = (self.entries[pid] for pid in ids)
+        if where is not None:
+            entries = (e for e in entries if where(e))
+        return list(itertools.islice(entries, limit))
+
+    def top_by_final(
+        self,
+        limit: Optional[int] = None,
+        positions: Optional[Iterable[str]] = None,
+        min_score: Optional[float] = None,
+        where: Optional[Callable[[Dict[str, Any]], bool]] = None,
+    ) -> list[Dict[str, Any]]:
+        """Best players by final_score, optionally for some positions and above a score."""
+        ids: Iterable[int] = self.by_final
+        if positions is not None:
+            ids = heapq.merge(*(self.by_position.get(pos, ()) for pos in positions), key=self.final_rank.__getitem__)
+        if min_score is not None:
+            ids = itertools.takewhile(lambda pid: self.entries[pid]['final_score'] >= min_score, ids)
+        return self.top(ids, limit, where)
+
+    def differentials(self, max_ownership: float, limit: int) -> list[Dict[str, Any]]:
+        """Best nailed, available players owned by at most ``max_ownership`` percent."""
+        ids = _merge_buckets(self.picks_by_ownership, max_ownership, lambda pid: self.entries[pid]['ownership'], self.final_rank)
+        return self.top(ids, limit)
+
+    def value_picks(self, max_price: float, limit: int) -> list[Dict[str, Any]]:
+        """Best final_score per £m among nailed, available players up to ``max_price``."""
+        ids = _merge_buckets(self.picks_by_price, max_price, lambda pid: self.entries[pid]['price'], self.value_rank)
+        return self.top(ids, limit)
+
+
+@dataclass(frozen=True)
+class ScoreSnapshot:
+    """
+    One complete set of player scores from a single calculation.
+
+    Snapshots are never modified after they are published: a recalculation
+    builds a new one and swaps it in as a single reference assignment, so a
+    reader holding a snapshot always sees a full, consistent table. The
+    version increases with every publish, which makes it a cheap cache key
+    for anything derived from the scores.
+
+    The history and team fixtures the scores were calculated from travel
+    with them, so features derived from a snapshot (the Stage 2 points
+    models) see the same inputs as the scores, whatever has been synced
+    since.
+    """
+    version: int = 0
+    gameweek: Optional[int] = None
+    calculated_at: Optional[datetime] = None
+    scores: Mapping[int, Dict[str, Any]] = field(default_factory=lambda: MappingProxyType({}))
+    index: ScoreIndex = field(default_factory=ScoreIndex)
+    history: Optional[pd.DataFrame] = None  # replaced on sync, never modified in place
+    team_fixtures: Mapping[int, list] = field(default_factory=lambda: MappingProxyType({}))  # next 5 GWs by team id
+
+    def __len__(self) -> int:
+        return len(self.scores)
+
+    def recent_aggregates(self, player_ids: pd.Series) -> Dict[str, Any]:
+        """PredictorService.recent_history_aggregates over this snapshot's history."""
+        return PredictorService.recent_history_aggregates(self.history, player_ids)
+
+
 class PredictorService:
     """Service for calculating ML-based player scores."""
 
+    # Player history fetch (request budget: fpl_history_rate_limiter, see config)
+    HISTORY_FETCH_RETRIES = 3
+    HISTORY_RETRY_BASE_DELAY = 0.5  # Seconds, doubled per attempt
+
+    # Gameweeks behind the nailedness and form scores
+    RECENT_GAMES = 5
+
+    # Job runner kind for score calculations (dedupe keys add the mode)
+    CALCULATION_JOB = "predictor_calculate"
+
     def __init__(self):
-        self._scores: Dict[int, Dict[str, Any]] = {}  # player_id -> score data
-        self._last_update: Optional[datetime] = None
-        self._current_gw: Optional[int] = None
+        self._snapshot = ScoreSnapshot()  # replaced, never mutated
+        self._snapshot_versions = itertools.count(1)
         self._team_fixture_scores: Dict[int, float] = {}  # 5 GW weighted (for transfers)
         self._team_fixture_now_scores: Dict[int, float] = {}  # Next GW only (for captaincy/lineup)
         self._team_fixture_data: Dict[int, list] = {}
         self._history_df: Optional[pd.DataFrame] = None
+        self._history_fetch_stats: Dict[str, Any] = {}
+        # Inputs behind the current snapshot, diffed by incremental refreshes
+        self._score_inputs: Optional[pd.DataFrame] = None
+        self._finished_fixture_ids: set[int] = set()
+        # One calculation at a time, whatever the job runner's concurrency
+        self._calculation_lock = asyncio.Lock()
+
+    @property
+    def _http_client(self) -> httpx.AsyncClient:
+        """Shared pooled FPL API client (owned by FPLService)."""
+        from services.fpl_service import fpl_service
+        return fpl_service.http_client
+
+    @property
+    def snapshot(self) -> ScoreSnapshot:
+        """The current published score snapshot."""
+        return self._snapshot
 
     @property
     def is_initialized(self) -> bool:
-        return len(self._scores) > 0
+        return len(self._snapshot) > 0
 
     @property
     def player_count(self) -> int:
-        return len(self._scores)
+        return len(self._snapshot)
 
     def get_player_score(self, player_id: int) -> Optional[Dict[str, Any]]:
         """Get ML score data for a specific player."""
-        return self._scores.get(player_id)
+        return self._snapshot.scores.get(player_id)
 
-    def get_all_scores(self) -> Dict[int, Dict[str, Any]]:
-        """Get all player scores."""
-        return self._scores
+    def get_all_scores(self) -> Mapping[int, Dict[str, Any]]:
+        """Get all player scores (read-only view of the current snapshot)."""
+        return self._snapshot.scores
 
     def get_scores_by_position(self, position: str) -> list:
         """Get top players for a position, sorted by score."""
-        players = [
-            {**data, 'player_id': pid}
-            for pid, data in self._scores.items()
-            if data.get('position') == position
-        ]
-        return sorted(players, key=lambda x: x.get('final_score', 0), reverse=True)
+        return self._snapshot.index.top_by_final(positions=[position])
 
     def get_top_captain_picks(self, limit: int = 10) -> list:
         """Get top captain picks sorted by captain_score."""
-        players = [
-            {**data, 'player_id': pid}
-            for pid, data in self._scores.items()
-            if data.get('status') == 'a'  # Only available players
-        ]
-        return sorted(players, key=lambda x: x.get('captain_score', 0), reverse=True)[:limit]
+        index = self._snapshot.index
+        return index.top(index.by_captain, limit, where=lambda e: e.get('status') == 'a')  # Only available players
 
     def get_captain_picks_for_squad(self, squad_player_ids: list[int], limit: int = 5) -> list:
         """Get top captain picks from a specific squad."""
-        players = [
-            {**data, 'player_id': pid}
-            for pid, data in self._scores.items()
-            if pid in squad_player_ids and data.get('status') == 'a'
-        ]
-        return sorted(players, key=lambda x: x.get('captain_score', 0), reverse=True)[:limit]
+        index = self._snapshot.index
+        squad = sorted(
+            (pid for pid in set(squad_player_ids) if pid in index.captain_rank),
+            key=index.captain_rank.__getitem__,
+        )
+        return index.top(squad, limit, where=lambda e: e.get('status') == 'a')
+
+    def _publish(self, scores: Dict[int, Dict[str, Any]], gameweek: int) -> ScoreSnapshot:
+        """Publish a fully built score table as the new snapshot."""
+        snapshot = ScoreSnapshot(
+            version=next(self._snapshot_versions),
+            gameweek=gameweek,
+            calculated_at=datetime.now(),
+            scores=MappingProxyType(scores),
+            index=ScoreIndex.build(scores),
+            history=self._history_df,
+            team_fixtures=MappingProxyType(dict(self._team_fixture_data)),
+        )
+        self._snapshot = snapshot
+        return snapshot
 
-    async def calculate_scores(self, db: Optional[Session] = None) -> Dict[str, Any]:
+    def submit_calculation(self, trigger: str = "api", incremental: bool = False) -> tuple[Job, bool]:
+        """
+        Queue a score calculation on the background job runner.
+
+        Submitting while a calculation of the same mode is queued or running
+        returns that job instead of starting another. A full run submitted
+        while an incremental one is in flight gets its own job, which runs
+        after it.
+
+        Args:
+            trigger: Who asked for it ("api", "scheduled", ...)
+            incremental: Only rescore what changed since the last run
+
+        Returns:
+            (job, created) as for JobRunner.submit
+        """
+        run = functools.partial(self._run_calculation_job, incremental=incremental)
+        key = f"{self.CALCULATION_JOB}:{'incremental' if incremental else 'full'}"
+        return get_job_runner().submit(self.CALCULATION_JOB, run, key=key, trigger=trigger)
+
+    async def _run_calculation_job(self, job: Job, incremental: bool = False) -> Dict[str, Any]:
+        """Job body: calculate, save and log one run in its own DB session."""
+        from database import CalculationLog, SessionLocal
+
+        async with self._calculation_lock:
+            db = SessionLocal()
+            started_at = datetime.utcnow()
+            try:
+                try:
+                    result = await self.calculate_scores(db=db, job=job, incremental=incremental)
+                except Exception as e:
+                    db.rollback()
+                    db.add(CalculationLog(
+                        gameweek=0,
+                        players_scored=0,
+                        elapsed_seconds=(datetime.utcnow() - started_at).total_seconds(),
+                        success=False,
+                        error_message=str(e),
+                        started_at=started_at,
+                        completed_at=datetime.utcnow(),
+                    ))
+                    db.commit()
+                    raise
+
+                db.add(CalculationLog(
+                    gameweek=result["gameweek"],
+                    players_scored=result["players_scored"],
+                    elapsed_seconds=result["elapsed_seconds"],
+                    success=True,
+                    error_message=None,
+                    started_at=started_at,
+                    completed_at=datetime.utcnow(),
+                ))
+                db.commit()
+                return result
+            finally:
+                db.close()
+
+    async def calculate_scores(
+        self,
+        db: Optional[Session] = None,
+        job: Optional[Job] = None,
+        incremental: bool = False,
+    ) -> Dict[str, Any]:
         """
         Calculate ML scores for all players.
         This is the main method that runs the prediction pipeline.
 
         Args:
             db: Optional database session to save scores to database
+            job: Optional background job to report stages and progress to
+            incremental: Diff the fresh FPL data against the inputs of the
+                current snapshot and only sync history for / rescore the
+                players it affects (a full run if there is no snapshot yet)
         """
         logger.info("Starting ML score calculation...")
         start_time = time.time()
 
+        def stage(name: str):
+            if job:
+                job.set_stage(name)
+
         try:
             # Step 1: Fetch FPL data
+            stage("fpl_data")
             players_df, teams_df, fixtures_df, current_gw = await self._fetch_fpl_data()
-            self._current_gw = current_gw
 
             # Step 2: Calculate fixture scores for all teams
-            self._calculate_fixture_scores(teams_df, fixtures_df, current_gw)
-
-            # Step 3: Fetch player histories
-            await self._fetch_player_histories(players_df)
-
-            # Step 4: Calculate scores for all players
-            self._calculate_player_scores(players_df)
+            stage("fixtures")
+            fixture_matrix = self._build_fixture_matrix(fixtures_df)
+            moved_teams = self._calculate_fixture_scores(teams_df, fixture_matrix, current_gw)
+
+            previous = self._snapshot
+            changes = None
+            if incremental and self._score_inputs is not None and self._history_df is not None and len(previous):
+                changes = self._diff_inputs(players_df, fixtures_df, moved_teams, current_gw != previous.gameweek)
+
+            # Step 3: Fetch player histories (only players with new rows when incremental)
+            if changes is None or changes['history_ids']:
+                stage("histories")
+                await self._fetch_player_histories(
+                    players_df, fixtures_df, job.set_progress if job else None,
+                    player_ids=changes['history_ids'] if changes else None,
+                )
+
+            # Step 4: Calculate scores, then publish them in one swap
+            stage("scoring")
+            if changes is None:
+                snapshot = self._publish(self._calculate_player_scores(players_df), current_gw)
+            elif changes['unchanged']:
+                snapshot = previous
+            else:
+                snapshot = self._publish(self._rescore(players_df, changes['rescore_ids'], previous), current_gw)
+            self._remember_inputs(players_df, fixtures_df)
 
-            # Step 5: Save to database if provided
-            if db:
-                self._save_to_database(db, current_gw)
+            # Step 5: Stage 2 expected points for the new snapshot (cached per version)
+            points_model = None
+            if snapshot is not previous:
+                stage("points_model")
+                points_model = await asyncio.to_thread(self._predict_points)
 
-            self._last_update = datetime.now()
+            # Step 6: Save to database if provided (blocking I/O, kept off the event loop)
+            db_write = None
+            if db and snapshot is not previous:
+                stage("database")
+                db_write = await asyncio.to_thread(self._save_to_database, db, snapshot)
 
             elapsed = time.time() - start_time
-            logger.info(f"ML score calculation complete: {len(self._scores)} players in {elapsed:.1f}s")
+            logger.info(
+                f"ML score calculation complete: {len(snapshot)} players in {elapsed:.1f}s "
+                f"(snapshot v{snapshot.version}"
+                + (f", {changes['stats']['players_rescored']} rescored)" if changes else ")")
+            )
 
             return {
                 "success": True,
-                "players_scored": len(self._scores),
+                "players_scored": len(snapshot),
                 "gameweek": current_gw,
                 "elapsed_seconds": round(elapsed, 1),
-                "last_update": self._last_update.isoformat(),
+                "last_update": snapshot.calculated_at.isoformat(),
+                "snapshot_version": snapshot.version,
+                "history_fetch": self._history_fetch_stats,
+                "db_write": db_write,
+                "changes": changes['stats'] if changes else None,
+                "points_model": points_model,
             }
 
         except Exception as e:
             logger.error(f"ML score calculation failed: {e}")
+            # Fixture scores or history may already be ahead of the published
+            # snapshot, so the next incremental refresh starts from scratch
+            self._score_inputs = None
             raise
 
-    def _save_to_database(self, db: Session, gameweek: int):
-        """Save calculated scores to database."""
-        from database import MLPlayerScore as DBMLPlayerScore
-        from database import clear_old_scores
+    def _predict_points(self) -> Dict[str, Any]:
+        """Warm the points model cache for the current snapshot (never fails the run)."""
+        try:
+            predictions = get_points_model_service().predict(self)
+            return predictions.summary() if predictions else None
+        except Exception as e:
+            logger.warning(f"Stage 2 points prediction failed: {e}")
+            return {"error": str(e)}
+
+    # =========================================================================
+    # Incremental refresh
+    # =========================================================================
+
+    def _remember_inputs(self, players_df: pd.DataFrame, fixtures_df: pd.DataFrame):
+        """Keep the inputs behind the just-published scores for the next diff."""
+        columns = [c for c in AVAILABILITY_COLUMNS + HISTORY_COLUMNS + PROFILE_COLUMNS if c in players_df]
+        self._score_inputs = players_df.set_index('id')[columns].copy()
+        if 'finished' in fixtures_df:
+            self._finished_fixture_ids = set(fixtures_df.loc[fixtures_df['finished'] == True, 'id'].astype(int))
+
+    def _diff_inputs(
+        self,
+        players_df: pd.DataFrame,
+        fixtures_df: pd.DataFrame,
+        moved_teams: set[int],
+        new_gameweek: bool,
+    ) -> Dict[str, Any]:
+        """
+        Work out which players a refresh actually affects.
+
+        - Fixture scores: every player of a team whose upcoming fixtures moved
+        - Nailedness: players whose status, news or chance of playing changed
+        - Form: players with new history rows - their season points/minutes
+          or club changed, or their club finished a fixture since the last run
+          (a zero-minute appearance still adds a row)
+        - Profile fields (price, ownership, names, set pieces): that player
+
+        Returns:
+            history_ids (players to re-sync history for), rescore_ids, an
+            unchanged flag and counts per reason
+        """
+        previous = self._score_inputs
+        current = players_df.set_index('id')[[c for c in previous.columns if c in players_df]]
+        known = current.index.isin(previous.index)
+        before = previous.reindex(current.index)
+
+        def changed(columns: tuple[str, ...]) -> set[int]:
+            columns = [c for c in columns if c in current]
+            if not columns:
+                return set()
+            now, then = current[columns], before[columns]
+            differs = (now != then) & ~(now.isna() & then.isna())
+            return set(current.index[differs.any(axis=1).to_numpy() & known])
+
+        new_players = set(current.index[~known])
+        removed = len(previous.index.difference(current.index))
+
+        newly_finished = fixtures_df[
+            (fixtures_df['finished'] == True) & ~fixtures_df['id'].isin(self._finished_fixture_ids)
+        ] if 'finished' in fixtures_df else fixtures_df.iloc[0:0]
+        teams_played = set(newly_finished['team_h']) | set(newly_finished['team_a'])
+        team_of = players_df.set_index('id')['team']
+
+        history = changed(HISTORY_COLUMNS) | set(team_of.index[team_of.isin(teams_played)]) | new_players
+        availability = changed(AVAILABILITY_COLUMNS)
+        profile = changed(PROFILE_COLUMNS)
+        fixtures = set(team_of.index[team_of.isin(moved_teams)])
+        rescore = history | availability | profile | fixtures
+
+        return {
+            'history_ids': sorted(int(pid) for pid in history),
+            'rescore_ids': rescore,
+            'unchanged': not rescore and not removed and not new_gameweek,
+            'stats': {
+                'mode': 'incremental',
+                'teams_fixtures_moved': len(moved_teams),
+                'fixtures_finished': len(newly_finished),
+                'players_new_history': len(history),
+                'players_availability_changed': len(availability),
+                'players_profile_changed': len(profile),
+                'players_new': len(new_players),
+                'players_removed': removed,
+                'players_rescored': len(rescore),
+            },
+        }
+
+    def _rescore(self, players_df: pd.DataFrame, rescore_ids: set[int], previous: ScoreSnapshot) -> Dict[int, Dict[str, Any]]:
+        """
+        New score table that recomputes only ``rescore_ids`` and re-ranks everyone.
+
+        Scores are per-player apart from the ranks, so everyone else keeps
+        their previous entry (copied - published entries are never mutated).
+        """
+        affected = players_df['id'].isin(rescore_ids)
+        fresh = self._calculate_player_scores(players_df[affected]) if affected.any() else {}
+        scores = {
+            player_id: fresh[player_id] if player_id in fresh else dict(previous.scores[player_id])
+            for player_id in players_df['id'].tolist()
+        }
+        self._assign_ranks(scores)
+        return scores
+
+    def _save_to_database(self, db: Session, snapshot: ScoreSnapshot) -> Dict[str, Any]:
+        """
+        Upsert a score snapshot into the database in one transaction.
+
+        MLPlayerScore is keyed by player_id alone, so each player has one row
+        holding their latest scores. The upsert only replaces rows from the
+        same or an older gameweek (a late run for a past gameweek never
+        overwrites newer scores); rows not refreshed by this run are then
+        removed, as the old clear-and-insert did.
 
-        logger.info(f"Saving {len(self._scores)} scores to database for GW{gameweek}")
+        Returns:
+            Write stats from bulk_upsert
+        """
+        from database import MLPlayerScore as DBMLPlayerScore
+        from database import bulk_upsert
 
-        # Clear old scores for this gameweek
-        clear_old_scores(db, gameweek)
+        gameweek = snapshot.gameweek
+        logger.info(f"Saving {len(snapshot)} scores to database for GW{gameweek}")
 
-        # Prepare batch insert
-        db_scores = []
         now = datetime.utcnow()
+        rows = [
+            {
+                'player_id': int(player_id),
+                'name': str(score_data['name']),
+                'full_name': str(score_data['full_name']),
+                'team': str(score_data['team']),
+                'team_id': int(score_data['team_id']),
+                'position': str(score_data['position']),
+                'price': float(score_data['price']),
+                'ownership': float(score_data['ownership']),
+                'status': str(score_data['status']),
+                'news': str(score_data['news']),
+                'nailedness_score': float(score_data['nailedness_score']),
+                'form_xg_score': float(score_data['form_xg_score']),
+                'form_pts_score': float(score_data['form_pts_score']),
+                'fixture_score': float(score_data['fixture_score']),
+                'fixture_now_score': float(score_data['fixture_now_score']),
+                'final_score': float(score_data['final_score']),
+                'rank': int(score_data['rank']),
+                'avg_minutes': float(score_data['avg_minutes']),
+                'avg_points': float(score_data['avg_points']),
+                'total_points': int(score_data['total_points']),
+                'form': float(score_data['form']),
+                'next_opponent': str(score_data['next_opponent']),
+                'next_fdr': int(score_data['next_fdr']),
+                'next_home': bool(score_data['next_home']),
+                'gameweek': int(gameweek),
+                'calculated_at': now,
+                'updated_at': now,
+            }
+            for player_id, score_data in snapshot.scores.items()
+        ]
 
-        for player_id, score_data in self._scores.items():
-            db_score = DBMLPlayerScore(
-                player_id=int(player_id),
-                name=str(score_data['name']),
-                full_name=str(score_data['full_name']),
-                team=str(score_data['team']),
-                team_id=int(score_data['team_id']),
-                position=str(score_data['position']),
-                price=float(score_data['price']),
-                ownership=float(score_data['ownership']),
-                status=str(score_data['status']),
-                news=str(score_data['news']),
-                nailedness_score=float(score_data['nailedness_score']),
-                form_xg_score=float(score_data['form_xg_score']),
-                form_pts_score=float(score_data['form_pts_score']),
-                fixture_score=float(score_data['fixture_score']),
-                fixture_now_score=float(score_data['fixture_now_score']),
-                final_score=float(score_data['final_score']),
-                rank=int(score_data['rank']),
-                avg_minutes=float(score_data['avg_minutes']),
-                avg_points=float(score_data['avg_points']),
-                total_points=int(score_data['total_points']),
-                form=float(score_data['form']),
-                next_opponent=str(score_data['next_opponent']),
-                next_fdr=int(score_data['next_fdr']),
-                next_home=bool(score_data['next_home']),
-                gameweek=int(gameweek),
-                calculated_at=now,
-                updated_at=now,
+        try:
+            stats = bulk_upsert(
+                db, DBMLPlayerScore, rows, ['player_id'],
+                update_where=lambda table, excluded: table.c.gameweek <= excluded.gameweek,
             )
-            db_scores.append(db_score)
+            # Players no longer in the game (newer-gameweek rows are left alone)
+            stats["removed"] = db.query(DBMLPlayerScore).filter(
+                DBMLPlayerScore.gameweek <= gameweek,
+                DBMLPlayerScore.calculated_at < now,
+            ).delete(synchronize_session=False)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
 
-        # Bulk insert
-        db.bulk_save_objects(db_scores)
-        db.commit()
-        logger.info(f"Successfully saved {len(db_scores)} scores to database")
+        logger.info(f"Successfully saved {len(rows)} scores to database ({stats['rows_per_second']} rows/s)")
+        return stats
 
     async def _fetch_fpl_data(self) -> tuple:
         """Fetch bootstrap and fixtures data from FPL API."""
         logger.info("Fetching FPL data...")
 
-        async with httpx.AsyncClient(timeout=httpx.Timeout(30.0)) as client:
-            # Fetch bootstrap data
-            response = await client.get(f"{FPL_API}/bootstrap-static/")
-            response.raise_for_status()
-            data = response.json()
+        client = self._http_client
 
-            players_df = pd.DataFrame(data['elements'])
-            teams_df = pd.DataFrame(data['teams'])
-            events_df = pd.DataFrame(data['events'])
+        # Fetch bootstrap data
+        response = await client.get(f"{FPL_API}/bootstrap-static/", timeout=30.0)
+        response.raise_for_status()
+        data = response.json()
 
-            # Find current gameweek
-            next_gw = events_df[events_df['is_next'] == True]
-            current_gw = events_df[events_df['is_current'] == True]
+        players_df = pd.DataFrame(data['elements'])
+        teams_df = pd.DataFrame(data['teams'])
+        events_df = pd.DataFrame(data['events'])
 
-            if len(next_gw) > 0:
-                gw_number = int(next_gw.iloc[0]['id'])  # Convert numpy.int64 to Python int
-            elif len(current_gw) > 0:
-                gw_number = int(current_gw.iloc[0]['id'])  # Convert numpy.int64 to Python int
-            else:
-                gw_number = 1
+        # Find current gameweek
+        next_gw = events_df[events_df['is_next'] == True]
+        current_gw = events_df[events_df['is_current'] == True]
+
+        if len(next_gw) > 0:
+            gw_number = int(next_gw.iloc[0]['id'])  # Convert numpy.int64 to Python int
+        elif len(current_gw) > 0:
+            gw_number = int(current_gw.iloc[0]['id'])  # Convert numpy.int64 to Python int
+        else:
+            gw_number = 1
+
+        # Fetch fixtures
+        fixtures_response = await client.get(f"{FPL_API}/fixtures/", timeout=30.0)
+        fixtures_response.raise_for_status()
+        fixtures_df = pd.DataFrame(fixtures_response.json())
 
-            # Fetch fixtures
-            fixtures_response = await client.get(f"{FPL_API}/fixtures/")
-            fixtures_response.raise_for_status()
-            fixtures_df = pd.DataFrame(fixtures_response.json())
+        # Create team mappings
+        team_id_to_name = dict(zip(teams_df['id'], teams_df['short_name']))
+
+        # Add team names and position mapping
+        players_df['team_name'] = players_df['team'].map(team_id_to_name)
+        position_map = {1: 'GKP', 2: 'DEF', 3: 'MID', 4: 'FWD'}
+        players_df['position'] = players_df['element_type'].map(position_map)
 
-            # Create team mappings
-            team_id_to_name = dict(zip(teams_df['id'], teams_df['short_name']))
+        logger.info(f"Fetched {len(players_df)} players for GW{gw_number}")
 
-            # Add team names and position mapping
-            players_df['team_name'] = players_df['team'].map(team_id_to_name)
-            position_map = {1: 'GKP', 2: 'DEF', 3: 'MID', 4: 'FWD'}
-            players_df['position'] = players_df['element_type'].map(position_map)
+        return players_df, teams_df, fixtures_df, gw_number
 
-            logger.info(f"Fetched {len(players_df)} players for GW{gw_number}")
+    @staticmethod
+    def _build_fixture_matrix(fixtures_df: pd.DataFrame) -> FixtureMatrix:
+        """Fixture matrix over the fixtures this run diffs and syncs histories against."""
+        records = fixtures_df.astype(object).where(fixtures_df.notna(), None).to_dict('records')
+        return FixtureMatrix.build(Fixture(**f) for f in records)
+
+    def _calculate_fixture_scores(self, teams_df: pd.DataFrame, fixture_matrix: FixtureMatrix, current_gw: int) -> set[int]:
+        """
+        Calculate fixture difficulty scores for all teams.
 
-            return players_df, teams_df, fixtures_df, gw_number
+        Only teams whose upcoming fixtures differ from the last run are
+        rescored.
 
-    def _calculate_fixture_scores(self, teams_df: pd.DataFrame, fixtures_df: pd.DataFrame, current_gw: int):
-        """Calculate fixture difficulty scores for all teams."""
+        Returns:
+            IDs of those teams
+        """
         logger.info("Calculating fixture scores...")
 
         team_id_to_name = dict(zip(teams_df['id'], teams_df['short_name']))
 
-        for team_id in teams_df['id']:
-            fixtures = self._get_team_fixtures(team_id, fixtures_df, current_gw, team_id_to_name)
+        moved = set()
+        for team_id in teams_df['id'].tolist():
+            fixtures = self._get_team_fixtures(team_id, fixture_matrix, current_gw, team_id_to_name)
+            if team_id in self._team_fixture_data and self._team_fixture_data[team_id] == fixtures:
+                continue
+            moved.add(team_id)
             self._team_fixture_data[team_id] = fixtures
             self._team_fixture_scores[team_id] = self._calculate_fixture_score(fixtures)
             self._team_fixture_now_scores[team_id] = self._calculate_fixture_now_score(fixtures)
+        return moved
 
-    def _get_team_fixtures(self, team_id: int, fixtures_df: pd.DataFrame, current_gw: int, team_id_to_name: dict, num_gws: int = 5) -> list:
+    def _get_team_fixtures(self, team_id: int, fixture_matrix: FixtureMatrix, current_gw: int, team_id_to_name: dict, num_gws: int = 5) -> list:
         """Get fixture difficulty for a team over next N gameweeks."""
-        team_fixtures = []
-
-        for gw in range(current_gw, current_gw + num_gws):
-            gw_fixtures = fixtures_df[fixtures_df['event'] == gw]
-
-            # Home game
-            home_match = gw_fixtures[gw_fixtures['team_h'] == team_id]
-            if len(home_match) > 0:
-                match = home_match.iloc[0]
-                opponent_id = match['team_a']
-                fdr = match['team_h_difficulty']
-                team_fixtures.append({
-                    'gw': gw,
-                    'opponent_id': opponent_id,
-                    'opponent': team_id_to_name.get(opponent_id, 'Unknown'),
-                    'fdr': fdr,
-                    'is_home': True
-                })
-
-            # Away game
-            away_match = gw_fixtures[gw_fixtures['team_a'] == team_id]
-            if len(away_match) > 0:
-                match = away_match.iloc[0]
-                opponent_id = match['team_h']
-                fdr = match['team_a_difficulty']
-                team_fixtures.append({
-                    'gw': gw,
-                    'opponent_id': opponent_id,
-                    'opponent': team_id_to_name.get(opponent_id, 'Unknown'),
-                    'fdr': fdr,
-                    'is_home': False
-                })
-
-        return team_fixtures
+        return [
+            {
+                'gw': f.gameweek,
+                'opponent_id': f.opponent_id,
+                'opponent': team_id_to_name.get(f.opponent_id, 'Unknown'),
+                'fdr': f.fdr,
+                'is_home': f.is_home,
+            }
+            for f in fixture_matrix.upcoming(int(team_id), current_gw, num_gws)
+        ]
 
     def _calculate_fixture_score(self, team_fixtures: list) -> float:
         """Calculate fixture score (0-10) based on upcoming fixtures."""
@@ -345,313 +824,446 @@ class PredictorService:
 
         return min(10, max(0, base_score))
 
-    async def _fetch_player_histories(self, players_df: pd.DataFrame):
-        """Fetch historical gameweek data for all players."""
-        logger.info("Fetching player histories (this may take a minute)...")
+    async def _fetch_player_histories(
+        self,
+        players_df: pd.DataFrame,
+        fixtures_df: pd.DataFrame,
+        on_progress: Optional[Callable[[int, int], None]] = None,
+        player_ids: Optional[list[int]] = None,
+    ):
+        """
+        Get historical gameweek data for all players, or refresh some of them.
 
-        all_histories = []
-        total_players = len(players_df)
+        Goes through the persistent history store, so only players whose
+        history changed since the last sync are fetched. Falls back to a full
+        fetch if the store is unavailable.
 
-        async with httpx.AsyncClient(timeout=httpx.Timeout(10.0)) as client:
-            for idx, row in players_df.iterrows():
-                player_id = row['id']
+        Args:
+            player_ids: Only sync these players and swap their rows into the
+                current history (default: reload everyone)
+        """
+        from services.player_history_store import get_player_history_store
 
-                if (idx + 1) % 100 == 0:
-                    logger.info(f"Progress: {idx+1}/{total_players} players...")
+        if player_ids is not None:
+            players_df = players_df[players_df['id'].isin(player_ids)]
+        ids = [int(pid) for pid in players_df['id']]
+        store = get_player_history_store()
+        try:
+            players = players_df[['id', 'team', 'total_points', 'minutes', 'now_cost']].to_dict('records')
+            fixtures = fixtures_df.astype(object).where(fixtures_df.notna(), None).to_dict('records')
+            fetch = functools.partial(self.fetch_history_records, on_progress=on_progress)
+            self._history_fetch_stats = await store.sync(players, fixtures, fetch)
+            history_df = await asyncio.to_thread(store.load, ids)
+        except Exception as e:
+            logger.warning(f"Player history store unavailable ({e}) - fetching all histories")
+            history_df, self._history_fetch_stats = await self.fetch_histories(ids, on_progress)
 
-                try:
-                    url = f"{FPL_API}/element-summary/{player_id}/"
-                    response = await client.get(url)
-                    if response.status_code == 200:
-                        data = response.json()
-                        for gw in data.get('history', []):
-                            gw['player_id'] = player_id
-                            all_histories.append(gw)
-                except Exception:
-                    pass  # Skip failed requests
-
-                # Small delay every 50 players to avoid rate limiting
-                if (idx + 1) % 50 == 0:
-                    await asyncio.sleep(0.2)
-
-        self._history_df = pd.DataFrame(all_histories)
-        logger.info(f"Fetched {len(self._history_df)} gameweek records")
-
-    def _calculate_player_scores(self, players_df: pd.DataFrame):
-        """Calculate final scores for all players."""
-        logger.info("Calculating player scores...")
+        if player_ids is None or self._history_df is None or 'player_id' not in self._history_df:
+            self._history_df = history_df
+        else:
+            kept = self._history_df[~self._history_df['player_id'].isin(ids)]
+            self._history_df = pd.concat([kept, history_df], ignore_index=True)
+
+    async def fetch_histories(
+        self,
+        player_ids: list[int],
+        on_progress: Optional[Callable[[int, int], None]] = None,
+    ) -> tuple[pd.DataFrame, Dict[str, Any]]:
+        """
+        Fetch element-summary history for many players as one DataFrame.
+
+        Returns:
+            (history_df, stats) - one row per player-gameweek with a player_id
+            column; stats as for fetch_history_records
+        """
+        records, stats = await self.fetch_history_records(player_ids, on_progress)
+        return pd.DataFrame.from_records(records), stats
 
-        self._scores = {}
+    async def fetch_history_records(
+        self,
+        player_ids: list[int],
+        on_progress: Optional[Callable[[int, int], None]] = None,
+        limiter: Optional[AdaptiveRateLimiter] = None,
+    ) -> tuple[list[dict], Dict[str, Any]]:
+        """
+        Fetch element-summary history for many players concurrently.
 
-        for _, player in players_df.iterrows():
-            player_id = player['id']
-            team_id = player['team']
-            position = player['position']
+        Requests go out within the history fetch's own budget
+        (fpl_history_rate_limiter: FPL_HISTORY_RATE_LIMIT requests/second,
+        FPL_HISTORY_MAX_CONCURRENCY in flight), which is a share of the
+        process-wide FPL limit that every request still passes. Transient failures (network
+        errors, 429/5xx) are retried with backoff; players that still fail are
+        reported rather than aborting the whole fetch.
 
-            # Get player history
-            if self._history_df is not None and len(self._history_df) > 0:
-                player_history = self._history_df[self._history_df['player_id'] == player_id].copy()
-            else:
-                player_history = pd.DataFrame()
+        Args:
+            player_ids: Players to fetch
+            on_progress: Optional callback(done, total) after each player
+            limiter: Budget for this call instead of fpl_history_rate_limiter
 
-            # Calculate component scores
-            nailedness = self._calculate_nailedness(
-                player_history,
-                player.get('status', 'a'),
-                player.get('chance_of_playing_next_round')
-            )
-            form_xg = self._calculate_form_xg(player_history)
-            form_pts = self._calculate_form_pts(player_history)
-            fixture = self._calculate_fixture_for_player(team_id, position)
-            fixture_now = self._calculate_fixture_now_for_player(team_id, position)
-
-            # Calculate final score (0-10 scale)
-            weights = POSITION_WEIGHTS.get(position, POSITION_WEIGHTS['MID'])
-            final_score = (
-                weights['nailedness'] * nailedness +
-                weights['form_xg'] * form_xg +
-                weights['form_pts'] * form_pts +
-                weights['fixture'] * fixture
-            )
-            # Clamp final score to 0-10 range
-            final_score = max(0, min(10, final_score))
-
-            # Get fixture info
-            team_fixtures = self._team_fixture_data.get(team_id, [])
-            next_fixture = team_fixtures[0] if team_fixtures else None
-
-            # Recent stats
-            if len(player_history) > 0:
-                recent = player_history.sort_values('round', ascending=False).head(5)
-                avg_minutes = float(recent['minutes'].mean())
-                avg_points = float(recent['total_points'].mean())
-            else:
-                avg_minutes = 0.0
-                avg_points = 0.0
-
-            # Detect penalty/set piece takers from FPL API
-            # penalties_order: 1 = primary taker, 2 = secondary, etc.
-            penalties_order = player.get('penalties_order', None)
-            is_penalty_taker = penalties_order is not None and penalties_order == 1
-
-            # corners_and_indirect_freekicks_order: 1 = primary taker
-            set_piece_order = player.get('corners_and_indirect_freekicks_order', None)
-            is_set_piece_taker = set_piece_order is not None and set_piece_order <= 2
-
-            # Get fixture info
-            next_home = next_fixture['is_home'] if next_fixture else False
-            next_fdr = next_fixture['fdr'] if next_fixture else 3
-
-            # Calculate captain score with bonuses
-            # Captain score uses fixture_now more heavily (single GW decision)
-            captain_score, captain_bonuses = self._calculate_captain_score(
-                final_score=final_score,
-                is_penalty_taker=is_penalty_taker,
-                is_set_piece_taker=is_set_piece_taker,
-                is_home=next_home,
-                next_fdr=next_fdr,
-                position=position,
-                fixture_now_score=fixture_now,
-                fixture_score=fixture,
-            )
+        Returns:
+            (records, stats) - raw history entries, each with a player_id key,
+            and counts of fetched/failed players, retries and timing
+        """
+        total = len(player_ids)
+        logger.info(f"Fetching histories for {total} players...")
+        start = time.perf_counter()
+
+        client = self._http_client
+        limiter = limiter or fpl_history_rate_limiter
+        pending = iter(player_ids)
+        records: list[dict] = []
+        failed: Dict[int, str] = {}
+        stats = {"retries": 0, "done": 0}
+        log_every = max(1, total // 10)
+
+        async def fetch_one(player_id: int) -> list[dict]:
+            url = f"{FPL_API}/element-summary/{player_id}/"
+            for attempt in range(self.HISTORY_FETCH_RETRIES + 1):
+                try:
+                    async with limiter.slot() as slot:
+                        response = await client.get(url, timeout=10.0)
+                        slot.record(response.status_code, response.headers.get("Retry-After"))
+                    response.raise_for_status()
+                    return response.json().get('history', [])
+                except (httpx.TransportError, httpx.HTTPStatusError) as e:
+                    retryable = not isinstance(e, httpx.HTTPStatusError) or (
+                        e.response.status_code == 429 or e.response.status_code >= 500
+                    )
+                    if not retryable or attempt == self.HISTORY_FETCH_RETRIES:
+                        raise
+                    stats["retries"] += 1
+                    await asyncio.sleep(self.HISTORY_RETRY_BASE_DELAY * (2 ** attempt))
+            return []
+
+        async def worker():
+            for player_id in pending:
+                try:
+                    for gw in await fetch_one(player_id):
+                        gw['player_id'] = player_id
+                        records.append(gw)
+                except Exception as e:
+                    failed[player_id] = f"{type(e).__name__}: {e}"
+
+                stats["done"] += 1
+                if on_progress:
+                    on_progress(stats["done"], total)
+                if stats["done"] % log_every == 0 or stats["done"] == total:
+                    logger.info(f"Progress: {stats['done']}/{total} players...")
+
+        await asyncio.gather(*(worker() for _ in range(min(limiter.max_concurrency, total))))
+
+        elapsed = time.perf_counter() - start
+        fetch_stats = {
+            "players": total,
+            "fetched": total - len(failed),
+            "failed": len(failed),
+            "failed_player_ids": sorted(failed),
+            "retries": stats["retries"],
+            "records": len(records),
+            "elapsed_seconds": round(elapsed, 2),
+        }
+        if failed:
+            sample = ", ".join(f"{pid} ({err})" for pid, err in list(failed.items())[:3])
+            logger.warning(f"Failed to fetch history for {len(failed)}/{total} players, e.g. {sample}")
+        logger.info(f"Fetched {len(records)} gameweek records in {elapsed:.1f}s")
+        return records, fetch_stats
+
+    def _calculate_player_scores(self, players_df: pd.DataFrame) -> Dict[int, Dict[str, Any]]:
+        """
+        Calculate final scores for all players and return them as a new table.
+
+        Vectorized: the last-5 history aggregates for every player come from a
+        single sort of the history frame, and the component, final and
+        captain scores are array expressions. Gives exactly the same scores as
+        the per-player scorer in ml/benchmark_player_scoring.py.
+        """
+        logger.info("Calculating player scores...")
+        n = len(players_df)
+
+        def column(name: str, default: Any) -> list:
+            return players_df[name].tolist() if name in players_df else [default] * n
+
+        def numeric(name: str) -> np.ndarray:
+            if name not in players_df:
+                return np.full(n, np.nan)
+            return pd.to_numeric(players_df[name], errors='coerce').to_numpy(dtype=float)
+
+        player_ids = column('id', None)
+        team_ids = column('team', None)
+        positions = np.array(column('position', None), dtype=object)
+        statuses = column('status', 'a')
+        status = np.array(statuses, dtype=object)
+
+        recent = self.recent_history_aggregates(self._history_df, players_df['id'])
+        has_history = recent['games'] > 0
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            avg_minutes = recent['minutes_sum'] / recent['minutes_count']
+            avg_points = recent['points_sum'] / recent['points_count']
+            xg = recent['xg_sum'] / recent['xg_count'] if recent['has_xg'] else 0
+            xa = recent['xa_sum'] / recent['xa_count'] if recent['has_xa'] else 0
+
+        # Nailedness
+        nailedness, nailedness_np = _py_min(avg_minutes / 9, 10)
+        boosted, boosted_np = _py_min(nailedness + 0.5, 10)
+        all_started = recent['starts'] == self.RECENT_GAMES
+        nailedness = np.where(all_started, boosted, nailedness)
+        nailedness_np &= ~all_started | boosted_np
+        nailedness = np.where(has_history, nailedness, 0.0)
+        nailedness_np &= has_history
+
+        chance = numeric('chance_of_playing_next_round')
+        unavailable = np.isin(status, ['i', 's', 'u'])
+        doubtful = status == 'd'
+        nailedness = np.where(unavailable, nailedness * 0.0, nailedness)
+        # (chance or 50): zero falls back to 50, NaN passes through
+        doubtful_chance = np.where(chance == 0, 50, chance)
+        nailedness = np.where(doubtful, nailedness * (doubtful_chance / 100), nailedness)
+        limited = ~unavailable & ~doubtful & (chance < 100)
+        nailedness = np.where(limited, nailedness * (chance / 100), nailedness)
+
+        # Form (xG over played games, points over all recent games)
+        played = recent['played'] > 0
+        form_xg, form_xg_np = _py_clamp((xg + xa) * 10)
+        form_xg = np.where(played, form_xg, 0.0)
+        form_xg_np &= played & (recent['has_xg'] or recent['has_xa'])
+
+        form_pts, form_pts_np = _py_clamp(avg_points * 1.5)
+        form_pts = np.where(has_history, form_pts, 0.0)
+        form_pts_np &= has_history
+
+        # Fixtures
+        defensive = np.isin(positions, ['GKP', 'DEF'])
+
+        def position_adjusted(team_scores: Dict[int, float]) -> np.ndarray:
+            base = np.array([team_scores.get(team_id, 5.0) for team_id in team_ids], dtype=float)
+            easy = _py_min(base * 1.1, 10)[0]
+            hard = _py_max(base * 0.9, 0)[0]
+            return np.where(defensive, np.where(base > 5, easy, hard), _py_clamp(base)[0])
+
+        fixture = position_adjusted(self._team_fixture_scores)
+        fixture_now = position_adjusted(self._team_fixture_now_scores)
+
+        # Final score (0-10 scale)
+        weights = [POSITION_WEIGHTS.get(position, POSITION_WEIGHTS['MID']) for position in positions]
+
+        def weight(component: str) -> np.ndarray:
+            return np.array([w[component] for w in weights])
+
+        final_score, final_np = _py_clamp(
+            weight('nailedness') * nailedness +
+            weight('form_xg') * form_xg +
+            weight('form_pts') * form_pts +
+            weight('fixture') * fixture
+        )
+        final_np &= nailedness_np | form_xg_np | form_pts_np
 
-            self._scores[player_id] = {
-                'name': player['web_name'],
-                'full_name': f"{player.get('first_name', '')} {player.get('second_name', '')}".strip(),
-                'team': player['team_name'],
-                'team_id': team_id,
-                'position': position,
-                'price': player['now_cost'] / 10,
-                'ownership': float(player.get('selected_by_percent', 0)),
-                'status': player.get('status', 'a'),
-                'news': player.get('news', ''),
+        # Captain score
+        next_fixtures = [
+            (self._team_fixture_data.get(team_id) or [None])[0] for team_id in team_ids
+        ]
+        next_home = np.array([bool(f and f['is_home']) for f in next_fixtures])
+        next_fdr = [f['fdr'] if f else 3 for f in next_fixtures]
+        easy_fixture = np.array(next_fdr) <= 2
+        is_penalty_taker = numeric('penalties_order') == 1
+        is_set_piece_taker = numeric('corners_and_indirect_freekicks_order') <= 2
+        goalkeeper = positions == 'GKP'
+
+        fixture_adjustment = (fixture_now - fixture) / 10
+        captain_score = final_score * (1 + fixture_adjustment * 0.15)
+        bonus_flags = [
+            ('penalty_taker', is_penalty_taker),
+            ('set_piece_taker', is_set_piece_taker),
+            ('home_game', next_home),
+            ('easy_fixture', easy_fixture),
+        ]
+        for bonus, applies in bonus_flags:
+            captain_score = np.where(applies, captain_score * CAPTAIN_BONUSES[bonus], captain_score)
+        captain_score = np.where(goalkeeper, final_score * 0.3, captain_score)
+
+        rounded = {
+            'nailedness_score': _round_scores(nailedness, nailedness_np),
+            'form_xg_score': _round_scores(form_xg, form_xg_np),
+            'form_pts_score': _round_scores(form_pts, form_pts_np),
+            'fixture_score': _round_scores(fixture, np.zeros(n, dtype=bool)),
+            'fixture_now_score': _round_scores(fixture_now, np.zeros(n, dtype=bool)),
+            'final_score': _round_scores(final_score, final_np),
+            'captain_score': _round_scores(captain_score, final_np),
+        }
+        avg_minutes = np.where(has_history, avg_minutes, 0.0).tolist()
+        avg_points = np.where(has_history, avg_points, 0.0).tolist()
+
+        web_names = column('web_name', None)
+        first_names = column('first_name', '')
+        second_names = column('second_name', '')
+        team_names = column('team_name', None)
+        prices = column('now_cost', None)
+        ownership = column('selected_by_percent', 0)
+        news = column('news', '')
+        total_points = column('total_points', 0)
+        form = column('form', 0)
+        adjustment_sign = np.where(np.abs(fixture_adjustment) > 0.1, np.sign(fixture_adjustment), 0)
+        penalty_list = is_penalty_taker.tolist()
+        set_piece_list = is_set_piece_taker.tolist()
+
+        scores: Dict[int, Dict[str, Any]] = {}
+        for i, player_id in enumerate(player_ids):
+            next_fixture = next_fixtures[i]
+
+            if goalkeeper[i]:
+                captain_bonuses = ['GKP penalty']
+            else:
+                captain_bonuses = []
+                if adjustment_sign[i] > 0:
+                    captain_bonuses.append('fixture_now_boost')
+                elif adjustment_sign[i] < 0:
+                    captain_bonuses.append('fixture_now_penalty')
+                captain_bonuses.extend(bonus for bonus, applies in bonus_flags if applies[i])
+
+            scores[player_id] = {
+                'name': web_names[i],
+                'full_name': f"{first_names[i]} {second_names[i]}".strip(),
+                'team': team_names[i],
+                'team_id': team_ids[i],
+                'position': positions[i],
+                'price': prices[i] / 10,
+                'ownership': float(ownership[i]),
+                'status': statuses[i],
+                'news': news[i],
                 # Component scores
-                'nailedness_score': round(nailedness, 2),
-                'form_xg_score': round(form_xg, 2),
-                'form_pts_score': round(form_pts, 2),
-                'fixture_score': round(fixture, 2),  # 5 GW weighted (for transfers)
-                'fixture_now_score': round(fixture_now, 2),  # Next GW only (for captaincy/lineup)
+                'nailedness_score': rounded['nailedness_score'][i],
+                'form_xg_score': rounded['form_xg_score'][i],
+                'form_pts_score': rounded['form_pts_score'][i],
+                'fixture_score': rounded['fixture_score'][i],  # 5 GW weighted (for transfers)
+                'fixture_now_score': rounded['fixture_now_score'][i],  # Next GW only (for captaincy/lineup)
                 # Final score (0-10 scale)
-                'final_score': round(final_score, 2),
+                'final_score': rounded['final_score'][i],
                 # Captain-specific score and bonuses
-                'captain_score': captain_score,
+                'captain_score': rounded['captain_score'][i],
                 'captain_bonuses': captain_bonuses,
-                'is_penalty_taker': is_penalty_taker,
-                'is_set_piece_taker': is_set_piece_taker,
+                'is_penalty_taker': penalty_list[i],
+                'is_set_piece_taker': set_piece_list[i],
                 # Additional info
-                'avg_minutes': round(avg_minutes, 1),
-                'avg_points': round(avg_points, 1),
-                'total_points': player.get('total_points', 0),
-                'form': float(player.get('form', 0)),
+                'avg_minutes': round(avg_minutes[i], 1),
+                'avg_points': round(avg_points[i], 1),
+                'total_points': total_points[i],
+                'form': float(form[i]),
                 'next_opponent': next_fixture['opponent'] if next_fixture else '',
-                'next_fdr': next_fdr,
-                'next_home': next_home,
+                'next_fdr': next_fdr[i],
+                'next_home': bool(next_home[i]),
             }
 
+        self._assign_ranks(scores)
+        return scores
+
+    @classmethod
+    def recent_history_aggregates(cls, history: Optional[pd.DataFrame], player_ids: pd.Series) -> Dict[str, Any]:
+        """
+        Aggregate every player's last RECENT_GAMES history rows in one pass.
+
+        A player's recent rows are the ones
+        ``sort_values('round', ascending=False).head(RECENT_GAMES)`` gives.
+
+        Returns:
+            Arrays aligned with player_ids - games (all history rows), sums and
+            non-null counts of recent minutes and points, starts (60+ minutes),
+            played (minutes > 0) and sums/counts of xG and xA over played
+            games - plus has_xg/has_xa flags for the history columns
+        """
+        n = len(player_ids)
+        k = cls.RECENT_GAMES
+        empty = np.zeros(n)
+        result: Dict[str, Any] = {
+            'games': np.zeros(n, dtype=int),
+            'minutes_sum': empty, 'minutes_count': empty,
+            'points_sum': empty, 'points_count': empty,
+            'starts': np.zeros(n, dtype=int), 'played': np.zeros(n, dtype=int),
+            'xg_sum': empty, 'xg_count': empty, 'xa_sum': empty, 'xa_count': empty,
+            'has_xg': False, 'has_xa': False,
+        }
+        if history is None or len(history) == 0:
+            return result
+
+        player_pos = pd.Index(player_ids).get_indexer(history['player_id'])
+        known = np.flatnonzero(player_pos >= 0)
+        player_pos = player_pos[known]
+        rounds = history['round'].to_numpy()[known]
+
+        # Group rows by player, most recent round first
+        order = np.lexsort((-rounds, player_pos))
+        pos_sorted = player_pos[order]
+        rounds_sorted = rounds[order]
+        row = np.arange(len(order))
+        group_start = np.r_[True, pos_sorted[1:] != pos_sorted[:-1]]
+        rank = row - np.maximum.accumulate(np.where(group_start, row, 0))
+
+        # Which of two same-round rows (double gameweeks) counts as more recent
+        # is whatever sort_values('round', ascending=False) picks for the
+        # player's rows; its default sort isn't stable, so players with such a
+        # tie inside their recent window are ordered by that same call
+        tied = ~group_start[1:] & (rounds_sorted[1:] == rounds_sorted[:-1]) & (rank[:-1] < k)
+        for pos in np.unique(pos_sorted[1:][tied]):
+            lo, hi = np.searchsorted(pos_sorted, [pos, pos + 1])
+            player_rows = np.sort(order[lo:hi])
+            by_round = pd.Series(rounds[player_rows]).sort_values(ascending=False).index.to_numpy()
+            order[lo:hi] = player_rows[by_round]
+
+        top = rank < k
+        rows = known[order[top]]
+        pos_top = pos_sorted[top]
+        slot = rank[top]
+
+        def values(name: str) -> np.ndarray:
+            return history[name].astype(float).to_numpy()[rows]
+
+        def recent_sum(column: np.ndarray, slots: np.ndarray, mask: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+            # Sum each player's values in recency order; NaN counts as 0 and is
+            # left out of the count, like a skipna mean
+            matrix = np.zeros((n, k))
+            matrix[pos_top[mask], slots[mask]] = np.nan_to_num(column[mask], nan=0.0)
+            counts = np.bincount(pos_top[mask & ~np.isnan(column)], minlength=n)
+            return matrix.sum(axis=1), counts
+
+        minutes = values('minutes')
+        everything = np.ones(len(rows), dtype=bool)
+        result['games'] = np.bincount(player_pos, minlength=n)
+        result['minutes_sum'], result['minutes_count'] = recent_sum(minutes, slot, everything)
+        result['points_sum'], result['points_count'] = recent_sum(values('total_points'), slot, everything)
+        result['starts'] = np.bincount(pos_top[minutes >= 60], minlength=n)
+
+        # Played games, packed to the front of each player's row in recency order
+        played = minutes > 0
+        played_before = np.cumsum(played) - played
+        group_start_top = np.r_[True, pos_top[1:] != pos_top[:-1]]
+        played_slot = played_before - np.maximum.accumulate(np.where(group_start_top, played_before, 0))
+        result['played'] = np.bincount(pos_top[played], minlength=n)
+        for name, key in (('expected_goals', 'xg'), ('expected_assists', 'xa')):
+            if name in history:
+                result[f'has_{key}'] = True
+                result[f'{key}_sum'], result[f'{key}_count'] = recent_sum(values(name), played_slot, played)
+
+        return result
+
+    @staticmethod
+    def _assign_ranks(scores: Dict[int, Dict[str, Any]]):
+        """Set overall and captain ranks on a score table."""
         # Calculate ranks (overall)
         sorted_players = sorted(
-            self._scores.items(),
+            scores.items(),
             key=lambda x: x[1]['final_score'],
             reverse=True
         )
         for rank, (player_id, _) in enumerate(sorted_players, 1):
-            self._scores[player_id]['rank'] = rank
+            scores[player_id]['rank'] = rank
 
         # Calculate captain ranks (separate ranking for captain picks)
         sorted_by_captain = sorted(
-            self._scores.items(),
+            scores.items(),
             key=lambda x: x[1]['captain_score'],
             reverse=True
         )
         for captain_rank, (player_id, _) in enumerate(sorted_by_captain, 1):
-            self._scores[player_id]['captain_rank'] = captain_rank
-
-    def _calculate_nailedness(self, player_history: pd.DataFrame, status: str, chance_of_playing: Optional[float]) -> float:
-        """Calculate nailedness score (0-10)."""
-        if len(player_history) > 0:
-            recent = player_history.sort_values('round', ascending=False).head(5)
-            avg_minutes = recent['minutes'].mean()
-            base_score = min(10, avg_minutes / 9)
-
-            games_started = (recent['minutes'] >= 60).sum()
-            if games_started == 5:
-                base_score = min(10, base_score + 0.5)
-        else:
-            base_score = 0
-
-        # Availability adjustment
-        if status == 'i':  # Injured
-            base_score *= 0.0
-        elif status == 'd':  # Doubtful
-            base_score *= (chance_of_playing or 50) / 100
-        elif status == 's':  # Suspended
-            base_score *= 0.0
-        elif status == 'u':  # Unavailable
-            base_score *= 0.0
-        elif chance_of_playing is not None and chance_of_playing < 100:
-            base_score *= chance_of_playing / 100
-
-        return base_score
-
-    def _calculate_form_xg(self, player_history: pd.DataFrame) -> float:
-        """Calculate xG-based form score (0-10)."""
-        if len(player_history) == 0:
-            return 0
-
-        recent = player_history.sort_values('round', ascending=False).head(5)
-        played = recent[recent['minutes'] > 0]
-
-        if len(played) == 0:
-            return 0
-
-        xg = played['expected_goals'].astype(float).mean() if 'expected_goals' in played else 0
-        xa = played['expected_assists'].astype(float).mean() if 'expected_assists' in played else 0
-        xgi = xg + xa
-
-        # Clamp to 0-10 range
-        return max(0, min(10, xgi * 10))
-
-    def _calculate_form_pts(self, player_history: pd.DataFrame) -> float:
-        """Calculate points-based form score (0-10)."""
-        if len(player_history) == 0:
-            return 0
-
-        recent = player_history.sort_values('round', ascending=False).head(5)
-        avg_points = recent['total_points'].mean()
-
-        # Clamp to 0-10 range (negative points possible from red cards, own goals)
-        return max(0, min(10, avg_points * 1.5))
-
-    def _calculate_fixture_for_player(self, team_id: int, position: str) -> float:
-        """Get fixture score for a player's team (5 GW weighted - for transfers)."""
-        base_score = self._team_fixture_scores.get(team_id, 5.0)
-
-        # Defenders benefit more from easy fixtures
-        if position in ['GKP', 'DEF']:
-            if base_score > 5:
-                return min(10, base_score * 1.1)
-            else:
-                return max(0, base_score * 0.9)
-
-        # Clamp to 0-10 range
-        return max(0, min(10, base_score))
-
-    def _calculate_fixture_now_for_player(self, team_id: int, position: str) -> float:
-        """Get fixture_now score for a player's team (next GW only - for captaincy/lineup)."""
-        base_score = self._team_fixture_now_scores.get(team_id, 5.0)
-
-        # Defenders benefit more from easy fixtures
-        if position in ['GKP', 'DEF']:
-            if base_score > 5:
-                return min(10, base_score * 1.1)
-            else:
-                return max(0, base_score * 0.9)
-
-        # Clamp to 0-10 range
-        return max(0, min(10, base_score))
-
-    def _calculate_captain_score(
-        self,
-        final_score: float,
-        is_penalty_taker: bool,
-        is_set_piece_taker: bool,
-        is_home: bool,
-        next_fdr: int,
-        position: str,
-        fixture_now_score: float = 5.0,
-        fixture_score: float = 5.0,
-    ) -> tuple[float, list[str]]:
-        """
-        Calculate captain-specific score with bonuses.
-        For captaincy, fixture_now (next GW only) is weighted more heavily than
-        the 5-GW fixture average since captain choices are single-GW decisions.
-
-        Returns:
-            tuple: (captain_score, list of applied bonuses)
-        """
-        bonuses_applied = []
-
-        # Goalkeepers shouldn't be captained (very rare hauls)
-        if position == 'GKP':
-            return round(final_score * 0.3, 2), ['GKP penalty']
-
-        # For captain score, we want to weight fixture_now more heavily
-        # Replace the fixture component in final_score with fixture_now
-        # The final_score uses fixture_score (5 GW weighted), but for captaincy
-        # we want to emphasize fixture_now (next GW only)
-        #
-        # Calculate the fixture adjustment: how much better/worse is fixture_now vs fixture_score
-        fixture_adjustment = (fixture_now_score - fixture_score) / 10  # Scale to 0-1 range
-        # Apply fixture adjustment as a multiplier (e.g., +0.2 fixture_now -> +2% boost)
-        captain_score = final_score * (1 + fixture_adjustment * 0.15)
-
-        if abs(fixture_adjustment) > 0.1:
-            if fixture_adjustment > 0:
-                bonuses_applied.append('fixture_now_boost')
-            else:
-                bonuses_applied.append('fixture_now_penalty')
-
-        # Penalty taker bonus (+15%)
-        if is_penalty_taker:
-            captain_score *= CAPTAIN_BONUSES['penalty_taker']
-            bonuses_applied.append('penalty_taker')
-
-        # Set piece taker bonus (+8%)
-        if is_set_piece_taker:
-            captain_score *= CAPTAIN_BONUSES['set_piece_taker']
-            bonuses_applied.append('set_piece_taker')
-
-        # Home game bonus (+5%)
-        if is_home:
-            captain_score *= CAPTAIN_BONUSES['home_game']
-            bonuses_applied.append('home_game')
-
-        # Easy fixture bonus (+5% for FDR 1-2)
-        if next_fdr <= 2:
-            captain_score *= CAPTAIN_BONUSES['easy_fixture']
-            bonuses_applied.append('easy_fixture')
-
-        return round(captain_score, 2), bonuses_applied
+            scores[player_id]['captain_rank'] = captain_rank
 
 
 # Need asyncio import for the async functions
@@ -12,6 +12,9 @@ from enum import Enum
 import logging
 from sqlalchemy.orm import Session
 
+from services.fixture_matrix import FDR_WINDOW_GAMEWEEKS
+from services.points_model_service import get_points_model_service
+
 logger = logging.getLogger(__name__)
 
 
@@ -58,6 +61,7 @@ class MLPrediction:
     fixture_score: float
     is_available: bool
     availability_reason: str
+    expected_points: Optional[float] = None  # Stage 2 points models
 
 
 @dataclass
@@ -973,6 +977,8 @@ SCORING FORMULA ({strategy.value}):
         # Create ML prediction from database scores
         ml_prediction = None
         if ml_data:
+            cached_points = get_points_model_service().cached()
+            expected_points = cached_points.points if cached_points else {}
             nailedness = ml_data.get('nailedness_score', 0)
             # Estimate p_plays from nailedness (0-10 scale -> 0-1)
             p_plays = min(1.0, nailedness / 10.0)
@@ -985,7 +991,8 @@ SCORING FORMULA ({strategy.value}):
                 form_score_pts=round(ml_data.get('form_pts_score', 0) * 10, 1),
                 fixture_score=round(ml_data.get('fixture_score', 0) * 10, 1),
                 is_available=player.status == 'a',
-                availability_reason="Available" if player.status == 'a' else "Doubtful"
+                availability_reason="Available" if player.status == 'a' else "Doubtful",
+                expected_points=expected_points.get(player.id),
             )
 
         return SquadPlayer(
@@ -1059,36 +1066,10 @@ SCORING FORMULA ({strategy.value}):
     async def _get_team_fdr_map(self) -> Dict[int, float]:
         """Get average FDR (next 3 GWs) for each team."""
         try:
-            fixtures = await self._fpl.get_fixtures()
+            fixture_matrix = await self._fpl.get_fixture_matrix()
             current_gw_obj = self._fpl.get_current_gameweek()
             current_gw = current_gw_obj.id if hasattr(current_gw_obj, 'id') else current_gw_obj
-
-            team_fdrs: Dict[int, List[int]] = {}
-
-            for fixture in fixtures:
-                gw = getattr(fixture, 'event', None)
-                if gw is None or gw < current_gw or gw > current_gw + 3:
-                    continue
-
-                home_team = getattr(fixture, 'team_h', None)
-                away_team = getattr(fixture, 'team_a', None)
-                home_fdr = getattr(fixture, 'team_h_difficulty', 3)
-                away_fdr = getattr(fixture, 'team_a_difficulty', 3)
-
-                if home_team:
-                    if home_team not in team_fdrs:
-                        team_fdrs[home_team] = []
-                    team_fdrs[home_team].append(home_fdr)
-
-                if away_team:
-                    if away_team not in team_fdrs:
-                        team_fdrs[away_team] = []
-                    team_fdrs[away_team].append(away_fdr)
-
-            return {
-                team_id: sum(fdrs) / len(fdrs) if fdrs else 3.0
-                for team_id, fdrs in team_fdrs.items()
-            }
+            return fixture_matrix.mean_fdr(current_gw, FDR_WINDOW_GAMEWEEKS)
         except Exception as e:
             logger.warning(f"Could not get FDR data: {e}")
             return {}
@@ -3,6 +3,7 @@
 import logging
 from typing import Optional, Dict, Any, List
 from models import Player, PlayerSummary
+from services.fixture_matrix import FixtureMatrix
 from sqlalchemy.orm import Session
 
 logger = logging.getLogger(__name__)
@@ -79,38 +80,24 @@ class TransferWorkflowService:
         squad: List[PlayerSummary],
         players_dict: Dict[int, Player],
         team_names: Dict[int, str],
+        fixture_matrix: FixtureMatrix,
     ) -> List[Dict]:
         """Build comprehensive squad data for Claude analysis."""
         ml_scores = self._load_ml_scores()
-        fixtures = self.fpl.get_fixtures()
         current_gw = self.fpl.get_current_gameweek()
 
-        # Build team fixtures lookup
+        # Next 5 fixtures per team, from the shared fixture matrix
         team_fixtures = {}
-        for f in fixtures:
-            if f.event and f.event > current_gw.id:
-                # Home team
-                if f.team_h not in team_fixtures:
-                    team_fixtures[f.team_h] = []
-                team_fixtures[f.team_h].append({
-                    'gw': f.event,
-                    'opponent': team_names.get(f.team_a, '???'),
-                    'home': True,
-                    'fdr': f.team_h_difficulty,
-                })
-                # Away team
-                if f.team_a not in team_fixtures:
-                    team_fixtures[f.team_a] = []
-                team_fixtures[f.team_a].append({
-                    'gw': f.event,
-                    'opponent': team_names.get(f.team_h, '???'),
-                    'home': False,
-                    'fdr': f.team_a_difficulty,
-                })
-
-        # Sort fixtures by gameweek
-        for team_id in team_fixtures:
-            team_fixtures[team_id].sort(key=lambda x: x['gw'])
+        for team_id in fixture_matrix.team_ids:
+            team_fixtures[team_id] = [
+                {
+                    'gw': f.gameweek,
+                    'opponent': team_names.get(f.opponent_id, '???'),
+                    'home': f.is_home,
+                    'fdr': f.fdr,
+                }
+                for f in fixture_matrix.upcoming(team_id, current_gw.id + 1, limit=5)
+            ]
 
         squad_data = []
         for idx, p in enumerate(squad):
@@ -121,7 +108,7 @@ class TransferWorkflowService:
             ml_data = ml_scores.get(p.id, {})
 
             # Get next 5 fixtures for player's team
-            player_fixtures = team_fixtures.get(player_full.team, [])[:5]
+            player_fixtures = team_fixtures.get(player_full.team, [])
 
             squad_data.append({
                 'id': p.id,
@@ -344,7 +331,8 @@ class TransferWorkflowService:
         if claude.is_available():
             try:
                 # Build comprehensive data for Claude
-                squad_data = self._build_squad_data_for_claude(squad, players_dict, team_names)
+                fixture_matrix = await self.fpl.get_fixture_matrix()
+                squad_data = self._build_squad_data_for_claude(squad, players_dict, team_names, fixture_matrix)
                 ml_scores = self._load_ml_scores()
                 market_context = self._get_market_context(players_dict, team_names)
 
@@ -455,13 +455,30 @@ export async function getPredictorStatus(): Promise<PredictorStatusResponse> {
   return response.json();
 }
 
-export async function calculatePredictorScores(): Promise<{
-  success: boolean;
-  players_scored: number;
-  gameweek: number;
-  elapsed_seconds: number;
-  last_update: string;
-}> {
+export interface PredictorJob {
+  job_id: string;
+  kind: string;
+  status: "queued" | "running" | "succeeded" | "failed" | "cancelled";
+  trigger: string;
+  deduplicated: boolean;
+  submitted_at: string;
+  started_at: string | null;
+  finished_at: string | null;
+  elapsed_seconds: number | null;
+  stage: string | null;
+  progress: { done: number; total: number } | null;
+  stages: { name: string; started_at: string; elapsed_seconds: number | null }[];
+  result: {
+    success: boolean;
+    players_scored: number;
+    gameweek: number;
+    elapsed_seconds: number;
+    last_update: string;
+  } | null;
+  error: string | null;
+}
+
+export async function calculatePredictorScores(): Promise<PredictorJob> {
   const response = await fetch(`${API_BASE}/predictor/calculate`, {
     method: "POST",
   });
@@ -473,6 +490,16 @@ export async function calculatePredictorScores(): Promise<{
   return response.json();
 }
 
+export async function getPredictorJob(jobId: string): Promise<PredictorJob> {
+  const response = await fetch(`${API_BASE}/predictor/jobs/${jobId}`);
+
+  if (!response.ok) {
+    throw new Error("Failed to fetch predictor job");
+  }
+
+  return response.json();
+}
+
 export async function getPlayerMLScore(playerId: number): Promise<MLPlayerScore> {
   const response = await fetch(`${API_BASE}/predictor/player/${playerId}`);
 